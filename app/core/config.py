@@ -3,8 +3,14 @@ from dotenv import load_dotenv
 
 load_dotenv()
 
-def get_connection_string() -> str:
-    engine = os.getenv("DB_ENGINE")
+def get_bool_env(name: str, default: bool = False) -> bool:
+    value = os.getenv(name)
+    if value is None or value == "":
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+def get_connection_string(engine: str | None = None) -> str:
+    engine = engine or os.getenv("DB_ENGINE")
     username = os.getenv("DB_USERNAME")
     password = os.getenv("DB_PASSWORD")
     dbhost = os.getenv("DB_HOST")
@@ -12,10 +18,114 @@ def get_connection_string() -> str:
     dbname = os.getenv("DB_NAME")
     return f"{engine}://{username}:{password}@{dbhost}:{dbport}/{dbname}"
 
+def get_async_connection_string() -> str:
+    # "postgresql+psycopg2" -> "postgresql+asyncpg"
+    backend = (os.getenv("DB_ENGINE") or "postgresql").split("+")[0]
+    return get_connection_string(f"{backend}+{DB_ASYNC_DRIVER}")
+
+# Async request path (AsyncEngine + async routers), off by default
+DB_ASYNC_ENABLED = get_bool_env("DB_ASYNC_ENABLED")
+DB_ASYNC_DRIVER = os.getenv("DB_ASYNC_DRIVER", "asyncpg")
+
 # Database connection string
 SQLALCHEMY_DATABASE_URL = get_connection_string()
+ASYNC_SQLALCHEMY_DATABASE_URL = get_async_connection_string()
+
+# Connection pool, applied to the sync and async engines (per worker process)
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+DB_POOL_PRE_PING = get_bool_env("DB_POOL_PRE_PING", True)
+# Behind PgBouncer in transaction mode: no server-side prepared statements
+DB_PGBOUNCER = get_bool_env("DB_PGBOUNCER")
+
+# Read replicas for GET requests (comma separated URLs, empty = primary only)
+DB_REPLICA_URLS = [url.strip() for url in os.getenv("DB_REPLICA_URLS", "").split(",") if url.strip()]
+DB_REPLICA_MAX_LAG_SECONDS = float(os.getenv("DB_REPLICA_MAX_LAG_SECONDS", "5"))
+DB_REPLICA_CHECK_INTERVAL_SECONDS = float(os.getenv("DB_REPLICA_CHECK_INTERVAL_SECONDS", "2"))
+# A client that wrote reads from the primary for this long
+DB_READ_YOUR_WRITES_SECONDS = float(os.getenv("DB_READ_YOUR_WRITES_SECONDS", "5"))
+
+# Readiness probe: per-ping time limit and how long a result is reused
+HEALTH_PROBE_TIMEOUT_SECONDS = float(os.getenv("HEALTH_PROBE_TIMEOUT_SECONDS", "1"))
+HEALTH_PROBE_CACHE_SECONDS = float(os.getenv("HEALTH_PROBE_CACHE_SECONDS", "2"))
+
+# Per-request SQL stats (Server-Timing header and "app.sql" log lines);
+# a statement repeated this many times in one request is logged as a likely N+1
+SQL_STATS_ENABLED = get_bool_env("SQL_STATS_ENABLED", True)
+SQL_REPEAT_THRESHOLD = int(os.getenv("SQL_REPEAT_THRESHOLD", "5"))
+
+# Prometheus /metrics; set METRICS_MULTIPROC_DIR (an empty, writable directory)
+# when running several uvicorn workers so every worker's counts are reported
+METRICS_ENABLED = get_bool_env("METRICS_ENABLED", True)
+METRICS_MULTIPROC_DIR = os.getenv("METRICS_MULTIPROC_DIR", "")
+METRICS_FLUSH_SECONDS = float(os.getenv("METRICS_FLUSH_SECONDS", "5"))
+
+# Task change push over WebSocket/SSE at /todos/events; needs a direct
+# Postgres connection for LISTEN (not PgBouncer in transaction mode)
+EVENTS_ENABLED = get_bool_env("EVENTS_ENABLED", True)
+EVENTS_QUEUE_SIZE = int(os.getenv("EVENTS_QUEUE_SIZE", "100"))
+EVENTS_HEARTBEAT_SECONDS = float(os.getenv("EVENTS_HEARTBEAT_SECONDS", "15"))
+# Lifetime of the single-use tickets browsers connect with instead of a bearer header
+EVENTS_TICKET_SECONDS = int(os.getenv("EVENTS_TICKET_SECONDS", "30"))
+
+# Token-bucket rate limits as "<requests>/<seconds>" per caller: the bearer
+# token's user, else the client IP. RATE_LIMIT_ROUTES gives routes their own
+# budget ("METHOD /path=<budget>", comma separated, "off" = unlimited); other
+# API routes share RATE_LIMIT_DEFAULT, health and metrics are never limited.
+# The "postgres" backend shares buckets across workers and hosts, "local"
+# keeps them per worker.
+RATE_LIMIT_ENABLED = get_bool_env("RATE_LIMIT_ENABLED", True)
+RATE_LIMIT_BACKEND = os.getenv("RATE_LIMIT_BACKEND", "local")
+RATE_LIMIT_DEFAULT = os.getenv("RATE_LIMIT_DEFAULT", "1200/60")
+RATE_LIMIT_ROUTES = os.getenv("RATE_LIMIT_ROUTES", "POST /auth/login=60/60")
+RATE_LIMIT_MAX_KEYS = int(os.getenv("RATE_LIMIT_MAX_KEYS", "100000"))
+# Failed logins per username before login is refused without checking the password
+LOGIN_FAILURE_LIMIT = os.getenv("LOGIN_FAILURE_LIMIT", "5/300")
 
 # JWT settings
 JWT_SECRET_KEY = os.getenv("JWT_SECRET_KEY")
 JWT_ALGORITHM = os.getenv("JWT_ALGORITHM")
-ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES"))
\ No newline at end of file
+ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES"))
+JWT_BACKEND = os.getenv("JWT_BACKEND", "jose")  # "jose" or "pyjwt"
+# Opaque refresh tokens, rotated on every POST /auth/refresh
+REFRESH_TOKEN_EXPIRE_DAYS = int(os.getenv("REFRESH_TOKEN_EXPIRE_DAYS", "30"))
+
+# Verified-token cache; entries never outlive the token's exp
+JWT_CACHE_TTL_SECONDS = float(os.getenv("JWT_CACHE_TTL_SECONDS", "300"))
+JWT_CACHE_MAX_SIZE = int(os.getenv("JWT_CACHE_MAX_SIZE", "10000"))
+
+# Password hashing: new hashes use PASSWORD_HASH_SCHEME ("bcrypt", or
+# "argon2" for argon2id, which needs argon2-cffi) at these costs. Hashes of
+# the other scheme or another cost are replaced at the user's next login.
+PASSWORD_HASH_SCHEME = os.getenv("PASSWORD_HASH_SCHEME", "bcrypt")
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+ARGON2_TIME_COST = int(os.getenv("ARGON2_TIME_COST", "2"))
+ARGON2_MEMORY_KIB = int(os.getenv("ARGON2_MEMORY_KIB", "19456"))
+ARGON2_PARALLELISM = int(os.getenv("ARGON2_PARALLELISM", "1"))
+
+# Password hashing pool (0 workers hashes inline)
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", "2"))
+PASSWORD_HASH_MAX_PENDING = int(os.getenv("PASSWORD_HASH_MAX_PENDING", "64"))
+
+# Authenticated principal cache (TTL 0 disables it)
+PRINCIPAL_CACHE_TTL_SECONDS = float(os.getenv("PRINCIPAL_CACHE_TTL_SECONDS", "30"))
+PRINCIPAL_CACHE_MAX_SIZE = int(os.getenv("PRINCIPAL_CACHE_MAX_SIZE", "10000"))
+
+# Pagination settings
+TASKS_PAGE_SIZE = int(os.getenv("TASKS_PAGE_SIZE", "50"))
+TASKS_PAGE_MAX_SIZE = int(os.getenv("TASKS_PAGE_MAX_SIZE", "200"))
+
+# Bulk task endpoints
+TASKS_BULK_MAX_ITEMS = int(os.getenv("TASKS_BULK_MAX_ITEMS", "1000"))
+
+# Task export, rows fetched per server-side cursor round trip
+TASKS_EXPORT_CHUNK_SIZE = int(os.getenv("TASKS_EXPORT_CHUNK_SIZE", "1000"))
+
+# Task import, rows validated and copied per batch
+TASKS_IMPORT_BATCH_SIZE = int(os.getenv("TASKS_IMPORT_BATCH_SIZE", "10000"))
+TASKS_IMPORT_MAX_ERRORS = int(os.getenv("TASKS_IMPORT_MAX_ERRORS", "100"))
+
+# Delta sync, how long deleted tasks are remembered for GET /todos/changes
+TASKS_TOMBSTONE_RETENTION_DAYS = int(os.getenv("TASKS_TOMBSTONE_RETENTION_DAYS", "30"))
\ No newline at end of file
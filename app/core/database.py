@@ -1,17 +1,371 @@
-from sqlalchemy import create_engine, MetaData
-from sqlalchemy.orm import declarative_base
+import base64
+import hashlib
+import hmac
+import itertools
+import threading
+import time
+from uuid import uuid4
+
+from fastapi import Request
+from starlette.datastructures import MutableHeaders
+from sqlalchemy import Engine, create_engine, event, exc, make_url, text, MetaData
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session, declarative_base
 from sqlalchemy.orm import sessionmaker
-from app.core.config import SQLALCHEMY_DATABASE_URL
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+from app.core.config import (
+    SQLALCHEMY_DATABASE_URL,
+    ASYNC_SQLALCHEMY_DATABASE_URL,
+    DB_ASYNC_DRIVER,
+    DB_ASYNC_ENABLED,
+    DB_POOL_SIZE,
+    DB_MAX_OVERFLOW,
+    DB_POOL_TIMEOUT,
+    DB_POOL_RECYCLE,
+    DB_POOL_PRE_PING,
+    DB_PGBOUNCER,
+    DB_REPLICA_URLS,
+    DB_REPLICA_MAX_LAG_SECONDS,
+    DB_REPLICA_CHECK_INTERVAL_SECONDS,
+    DB_READ_YOUR_WRITES_SECONDS,
+    JWT_SECRET_KEY,
+)
+from app.core.metrics import LatencyStats
+
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+
+# Read-your-writes pin: the id of the client's last writing transaction,
+# handed out by ReadYourWritesMiddleware and sent back on later requests
+PIN_COOKIE = "read_after"
+PIN_HEADER = "X-Read-After"
+PIN_STATE = "read_your_writes"
+
+def _pin_signature(xid: int) -> str:
+    digest = hmac.new(JWT_SECRET_KEY.encode(), f"{PIN_COOKIE}|{xid}".encode(), hashlib.sha256).digest()
+    return base64.urlsafe_b64encode(digest[:16]).rstrip(b"=").decode()
 
-def get_db_context():
+def encode_pin(xid: int) -> str:
+    return f"{xid}.{_pin_signature(xid)}"
+
+def decode_pin(value: str | None) -> int | None:
+    """The transaction id of a pin this app signed, else None."""
+    xid, _, signature = (value or "").partition(".")
+    if not xid.isdigit() or not hmac.compare_digest(signature, _pin_signature(int(xid))):
+        return None
+    return int(xid)
+
+def request_session_info(request: Request) -> dict:
+    """Routing hints for a request's session, see RoutingSession."""
+    info = {"read_only": request.method in SAFE_METHODS}
+    if replicas.replicas and replicas.pin_seconds > 0:
+        info["pin"] = decode_pin(request.headers.get(PIN_HEADER) or request.cookies.get(PIN_COOKIE))
+        # Filled in on commit, for ReadYourWritesMiddleware to hand back
+        info["written"] = getattr(request.state, PIN_STATE, None)
+    return info
+
+def get_db_context(request: Request):
+    try:
+        db = LocalSession(info=request_session_info(request))
+        yield db
+    finally:
+        db.close()
+
+def get_primary_db_context():
+    """A request session that never reads from a replica."""
     try:
         db = LocalSession()
         yield db
     finally:
         db.close()
 
-engine = create_engine(SQLALCHEMY_DATABASE_URL)
+async def get_async_db_context(request: Request):
+    async with AsyncLocalSession(info=request_session_info(request)) as db:
+        yield db
+
+class InstrumentedPoolMixin:
+    """Times every checkout and counts the ones that hit DB_POOL_TIMEOUT."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.wait = LatencyStats()
+        self.timeouts = 0
+
+    def connect(self):
+        started = time.monotonic()
+        try:
+            return super().connect()
+        except exc.TimeoutError:
+            self.timeouts += 1
+            raise
+        finally:
+            self.wait.record(time.monotonic() - started)
+
+    def recreate(self):
+        pool = super().recreate()
+        pool.wait, pool.timeouts = self.wait, self.timeouts
+        return pool
+
+    def snapshot(self) -> dict:
+        return {
+            "size": self.size(),
+            "max_overflow": self._max_overflow,
+            "checked_out": self.checkedout(),
+            "checked_in": self.checkedin(),
+            "overflow": max(self.overflow(), 0),
+            "timeouts": self.timeouts,
+            "wait": self.wait.snapshot(),
+        }
+
+class InstrumentedQueuePool(InstrumentedPoolMixin, QueuePool):
+    pass
+
+class InstrumentedAsyncQueuePool(InstrumentedPoolMixin, AsyncAdaptedQueuePool):
+    pass
+
+def engine_options(is_async: bool = False) -> dict:
+    options = {
+        "poolclass": InstrumentedAsyncQueuePool if is_async else InstrumentedQueuePool,
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_recycle": DB_POOL_RECYCLE,
+        "pool_pre_ping": DB_POOL_PRE_PING,
+    }
+    # psycopg2 never prepares server-side; asyncpg must not cache or reuse
+    # statement names because PgBouncer moves us between server connections
+    if DB_PGBOUNCER and is_async:
+        options["connect_args"] = {
+            "statement_cache_size": 0,
+            "prepared_statement_cache_size": 0,
+            "prepared_statement_name_func": lambda: f"__asyncpg_{uuid4()}__",
+        }
+    return options
+
+def pool_metrics() -> dict:
+    metrics = {"sync": engine.pool.snapshot()}
+    if async_engine is not None:
+        metrics["async"] = async_engine.pool.snapshot()
+    return metrics
+
+REPLICA_LAG_SQL = text("""
+SELECT CASE
+    WHEN NOT pg_is_in_recovery() THEN 0
+    WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+    ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+END, pg_current_snapshot()::text
+""")
+
+def _parse_snapshot(value: str) -> tuple[int, int, frozenset[int]]:
+    """"xmin:xmax:xip,..." -> (xmin, xmax, transaction ids still running)."""
+    xmin, xmax, running = value.split(":")
+    return int(xmin), int(xmax), frozenset(int(xid) for xid in running.split(",") if xid)
+
+class Replica:
+    def __init__(self, url: str):
+        self.engine = create_engine(url, **engine_options())
+        self.async_engine: AsyncEngine | None = None
+        if DB_ASYNC_ENABLED:
+            backend = make_url(url).get_backend_name()
+            self.async_engine = create_async_engine(
+                make_url(url).set(drivername=f"{backend}+{DB_ASYNC_DRIVER}"),
+                **engine_options(is_async=True),
+            )
+        self.healthy = False
+        self.lag: float | None = None
+        # The replica's transaction snapshot at the last check
+        self.replayed: tuple[int, int, frozenset[int]] | None = None
+        self.error: str | None = None
+
+    def check(self, max_lag: float):
+        try:
+            with self.engine.connect() as conn:
+                lag, snapshot = conn.execute(REPLICA_LAG_SQL).one()
+            self.lag, self.replayed, self.error = float(lag), _parse_snapshot(snapshot), None
+        except Exception as e:
+            self.lag, self.replayed, self.error = None, None, type(e).__name__
+        self.healthy = self.lag is not None and self.lag <= max_lag
+
+    def has_replayed(self, xid: int) -> bool:
+        """Whether transaction `xid` had finished here at the last check."""
+        if self.replayed is None:
+            return False
+        xmin, xmax, running = self.replayed
+        return xid < xmin or (xid < xmax and xid not in running)
+
+    def snapshot(self) -> dict:
+        pools = {"sync": self.engine.pool.snapshot()}
+        if self.async_engine is not None:
+            pools["async"] = self.async_engine.pool.snapshot()
+        return {
+            "host": self.engine.url.host,
+            "healthy": self.healthy,
+            "lag_seconds": self.lag,
+            "error": self.error,
+            "pool": pools,
+        }
+
+class ReplicaSet:
+    """Read replicas plus the state that decides whether a read may use them.
+
+    A background thread checks replication lag every `check_interval`
+    seconds; replicas start unhealthy and serve reads only once a check
+    finds them within `max_lag`. A read pinned to a write's transaction id
+    only goes to a replica whose last check saw that transaction finished,
+    else to the primary; deciding costs no round trip.
+    """
+
+    def __init__(self, urls: list[str], max_lag: float, check_interval: float, pin_seconds: float):
+        self.replicas = [Replica(url) for url in urls]
+        self.max_lag = max_lag
+        self.check_interval = check_interval
+        self.pin_seconds = pin_seconds
+        self._next = itertools.count()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def choose(self, pin: int | None) -> Replica | None:
+        """Round-robin over healthy replicas that replayed `pin`; None means use the primary."""
+        healthy = [
+            replica for replica in self.replicas
+            if replica.healthy and (pin is None or replica.has_replayed(pin))
+        ]
+        if not healthy:
+            return None
+        return healthy[next(self._next) % len(healthy)]
+
+    def check(self):
+        for replica in self.replicas:
+            replica.check(self.max_lag)
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.check()
+            self._stop.wait(self.check_interval)
+
+    def start(self):
+        if self.replicas and self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="replica-lag-check", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def snapshot(self) -> list[dict]:
+        return [replica.snapshot() for replica in self.replicas]
+
+class RoutingSession(Session):
+    """Sends reads of safe (GET) requests to a replica, everything else to the primary.
+
+    The replica is chosen once per session so a request never mixes
+    snapshots. Sessions created without routing info (scripts, services
+    that open their own session) always use the primary.
+    """
+
+    def _primary(self) -> Engine:
+        return engine
+
+    def _replica_bind(self, replica: Replica) -> Engine:
+        return replica.engine
+
+    def get_bind(self, mapper=None, clause=None, **kw):
+        if not self.info.get("read_only") or self._flushing:
+            return self._primary()
+        if "replica" not in self.info:
+            self.info["replica"] = replicas.choose(self.info.get("pin"))
+        replica = self.info["replica"]
+        return self._replica_bind(replica) if replica is not None else self._primary()
+
+class AsyncRoutingSession(RoutingSession):
+    def _primary(self) -> Engine:
+        return async_engine.sync_engine
+
+    def _replica_bind(self, replica: Replica) -> Engine:
+        return replica.async_engine.sync_engine
+
+XACT_ID_SQL = text("SELECT pg_current_xact_id_if_assigned()::text")
+
+# Only a transaction that wrote has an id; it is what later reads wait for
+@event.listens_for(RoutingSession, "before_commit")
+def _note_writer_xact(session: Session):
+    if session.info.get("written") is not None and not session.info.get("read_only"):
+        # Pending ORM changes are only flushed after this hook otherwise
+        session.flush()
+        xid = session.execute(XACT_ID_SQL).scalar()
+        session.info["committing_xid"] = int(xid) if xid is not None else None
+
+@event.listens_for(RoutingSession, "after_commit")
+def _pin_writer(session: Session):
+    xid = session.info.pop("committing_xid", None)
+    if xid is not None:
+        written = session.info["written"]
+        written["xid"] = max(written.get("xid", 0), xid)
+
+class ReadYourWritesMiddleware:
+    """Hands a request's committed write back to the client as a signed pin.
+
+    The response carries the pin as the read_after cookie and the
+    X-Read-After header; sent back on later requests (either one), it keeps
+    their reads off replicas that have not replayed the write yet, on every
+    worker and across token refreshes.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        written = scope.setdefault("state", {})[PIN_STATE] = {}
+
+        async def send_with_pin(message):
+            if message["type"] == "http.response.start" and "xid" in written:
+                pin = encode_pin(written["xid"])
+                headers = MutableHeaders(scope=message)
+                headers.append(PIN_HEADER, pin)
+                headers.append(
+                    "Set-Cookie",
+                    f"{PIN_COOKIE}={pin}; Max-Age={max(1, int(replicas.pin_seconds))}; Path=/; HttpOnly; SameSite=Lax",
+                )
+            await send(message)
+
+        await self.app(scope, receive, send_with_pin)
+
+engine = create_engine(SQLALCHEMY_DATABASE_URL, **engine_options())
 metadata = MetaData()
 
-LocalSession = sessionmaker(autocommit=False, autoflush=False, bind=engine)
-Base = declarative_base()
\ No newline at end of file
+# Objects stay loaded after commit so responses don't re-SELECT what RETURNING already read
+LocalSession = sessionmaker(
+    class_=RoutingSession, autocommit=False, autoflush=False, expire_on_commit=False, bind=engine,
+)
+Base = declarative_base()
+
+# The async driver is only imported when the async path is switched on
+async_engine = (
+    create_async_engine(ASYNC_SQLALCHEMY_DATABASE_URL, **engine_options(is_async=True))
+    if DB_ASYNC_ENABLED else None
+)
+AsyncLocalSession = async_sessionmaker(
+    sync_session_class=AsyncRoutingSession, autoflush=False, expire_on_commit=False, bind=async_engine,
+)
+
+replicas = ReplicaSet(
+    DB_REPLICA_URLS,
+    max_lag=DB_REPLICA_MAX_LAG_SECONDS,
+    check_interval=DB_REPLICA_CHECK_INTERVAL_SECONDS,
+    pin_seconds=DB_READ_YOUR_WRITES_SECONDS,
+)
+
+async def dispose_async_engines():
+    """Close the async pools on the event loop that opened their connections.
+
+    asyncpg connections belong to one event loop, so they must not outlive
+    the app that created them (each TestClient runs its own loop).
+    """
+    for async_pool_engine in (async_engine, *(replica.async_engine for replica in replicas.replicas)):
+        if async_pool_engine is not None:
+            await async_pool_engine.dispose()
@@ -0,0 +1,56 @@
+import hashlib
+from datetime import timezone
+from typing import Iterable
+
+from fastapi import Request, Response
+from sqlalchemy import Select, select
+
+def _digest(parts: Iterable) -> str:
+    h = hashlib.blake2b(digest_size=16)
+    for entity_id, updated_at in parts:
+        # Normalize to UTC: psycopg2 and asyncpg may return different offsets
+        h.update(f"{entity_id}:{updated_at.astimezone(timezone.utc).isoformat()};".encode())
+    return f'"{h.hexdigest()}"'
+
+def entity_etag(entity) -> str:
+    """Strong ETag of one row; every write bumps updated_at."""
+    return _digest([(entity.id, entity.updated_at)])
+
+def list_etag(rows: Iterable) -> str:
+    """Aggregate ETag of an ordered list; changes on any update, insert or delete."""
+    return _digest((row.id, row.updated_at) for row in rows)
+
+def version_query(model, entity_id, *columns) -> Select:
+    """The id and updated_at of one row (plus `columns` for access checks)."""
+    return select(model.id, model.updated_at, *columns).where(model.id == entity_id)
+
+def _matches(if_none_match: str, etag: str) -> bool:
+    if if_none_match.strip() == "*":
+        return True
+    # If-None-Match uses weak comparison
+    return etag in (tag.strip().removeprefix("W/") for tag in if_none_match.split(","))
+
+class Conditional:
+    """If-None-Match handling for one GET request, used as a dependency.
+
+    Handlers run a version-only query when `if_none_match` is set and return
+    `not_modified(...)` when it matches, so a 304 never loads or serializes
+    the full row. Otherwise they `tag` the response with the ETag.
+    """
+
+    def __init__(self, request: Request, response: Response):
+        self.if_none_match = request.headers.get("if-none-match")
+        self.response = response
+
+    def not_modified(self, etag: str) -> Response | None:
+        if self.if_none_match is None or not _matches(self.if_none_match, etag):
+            return None
+        self.response.headers["ETag"] = etag
+        result = Response(status_code=304)
+        for key, value in self.response.headers.items():
+            if key != "content-length":
+                result.headers.append(key, value)
+        return result
+
+    def tag(self, etag: str):
+        self.response.headers["ETag"] = etag
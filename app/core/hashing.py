@@ -0,0 +1,146 @@
+import asyncio
+import multiprocessing
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Any, Callable
+
+from app.core.config import PASSWORD_HASH_WORKERS, PASSWORD_HASH_MAX_PENDING
+from app.core.metrics import LatencyStats
+from app.core.security import get_password_hash, verify_and_update_password, verify_password
+
+class HashingBusyError(Exception):
+    """Raised when the hashing queue is full; surfaced to clients as 429."""
+
+def _run_timed(fn: Callable, args: tuple, submitted_at: float) -> tuple[Any, float, float]:
+    # Runs in the worker process; CLOCK_MONOTONIC is shared across processes on Linux
+    started_at = time.monotonic()
+    result = fn(*args)
+    return result, started_at - submitted_at, time.monotonic() - started_at
+
+class PasswordHasher:
+    """Runs bcrypt on a process pool so it never holds the API worker's GIL.
+
+    At most `max_pending` operations may be queued or running; beyond that
+    HashingBusyError is raised instead of letting the queue grow. With
+    `workers=0` hashing runs inline in the calling thread.
+    """
+
+    def __init__(self, workers: int, max_pending: int):
+        self.workers = workers
+        self.max_pending = max_pending
+        self._executor: ProcessPoolExecutor | None = None
+        self._lock = threading.Lock()
+        self._pending = 0
+        self.rejected = 0
+        self.rehashed = 0
+        self.hash_latency = LatencyStats()
+        self.verify_latency = LatencyStats()
+        self.queue_wait = LatencyStats()
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            return self._executor
+
+    def _acquire(self):
+        with self._lock:
+            if self._pending >= self.max_pending:
+                self.rejected += 1
+                raise HashingBusyError()
+            self._pending += 1
+
+    def _release(self, *_):
+        with self._lock:
+            self._pending -= 1
+
+    def _submit(self, fn: Callable, *args) -> Future:
+        self._acquire()
+        try:
+            future = self._get_executor().submit(_run_timed, fn, args, time.monotonic())
+        except Exception:
+            self._release()
+            raise
+        future.add_done_callback(self._release)
+        return future
+
+    def _run(self, fn: Callable, args: tuple, stats: LatencyStats):
+        if self.workers <= 0:
+            self._acquire()
+            try:
+                result, _, elapsed = _run_timed(fn, args, time.monotonic())
+            finally:
+                self._release()
+        else:
+            result, waited, elapsed = self._submit(fn, *args).result()
+            self.queue_wait.record(waited)
+        stats.record(elapsed)
+        return result
+
+    async def _run_async(self, fn: Callable, args: tuple, stats: LatencyStats):
+        if self.workers <= 0:
+            return await asyncio.to_thread(self._run, fn, args, stats)
+        result, waited, elapsed = await asyncio.wrap_future(self._submit(fn, *args))
+        self.queue_wait.record(waited)
+        stats.record(elapsed)
+        return result
+
+    def hash(self, password: str) -> str:
+        return self._run(get_password_hash, (password,), self.hash_latency)
+
+    def verify(self, plain_password: str, hashed_password: str) -> bool:
+        return self._run(verify_password, (plain_password, hashed_password), self.verify_latency)
+
+    def verify_and_update(self, plain_password: str, hashed_password: str) -> tuple[bool, str | None]:
+        """verify, plus the upgraded hash to store when the stored one is outdated."""
+        verified, new_hash = self._run(
+            verify_and_update_password, (plain_password, hashed_password), self.verify_latency
+        )
+        self._count_rehash(new_hash)
+        return verified, new_hash
+
+    async def hash_async(self, password: str) -> str:
+        return await self._run_async(get_password_hash, (password,), self.hash_latency)
+
+    async def verify_async(self, plain_password: str, hashed_password: str) -> bool:
+        return await self._run_async(
+            verify_password, (plain_password, hashed_password), self.verify_latency
+        )
+
+    async def verify_and_update_async(self, plain_password: str, hashed_password: str) -> tuple[bool, str | None]:
+        verified, new_hash = await self._run_async(
+            verify_and_update_password, (plain_password, hashed_password), self.verify_latency
+        )
+        self._count_rehash(new_hash)
+        return verified, new_hash
+
+    def _count_rehash(self, new_hash: str | None):
+        if new_hash:
+            with self._lock:
+                self.rehashed += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            pending, rejected, rehashed = self._pending, self.rejected, self.rehashed
+        return {
+            "workers": self.workers,
+            "max_pending": self.max_pending,
+            "pending": pending,
+            "rejected": rejected,
+            "rehashed": rehashed,
+            "hash": self.hash_latency.snapshot(),
+            "verify": self.verify_latency.snapshot(),
+            "queue_wait": self.queue_wait.snapshot(),
+        }
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+password_hasher = PasswordHasher(PASSWORD_HASH_WORKERS, PASSWORD_HASH_MAX_PENDING)
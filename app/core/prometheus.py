@@ -0,0 +1,308 @@
+import bisect
+import fcntl
+import json
+import os
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from contextlib import suppress
+from typing import Callable
+
+from app.core.config import METRICS_MULTIPROC_DIR, METRICS_FLUSH_SECONDS
+from app.core.metrics import LatencyStats
+
+# Request latency buckets in seconds
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Unmatched paths share one label so 404 scans can't grow the series count
+UNMATCHED_ROUTE = "unmatched"
+
+# Counts of exited workers, summed into one file
+ARCHIVE_FILE = "metrics_archive.json"
+
+class Family:
+    """One metric family: samples are (suffix, labels, value)."""
+
+    def __init__(self, name: str, kind: str, help: str):
+        self.name = name
+        self.kind = kind
+        self.help = help
+        self.samples: list[tuple[str, dict, float]] = []
+
+    def add(self, value: float, suffix: str = "", **labels):
+        self.samples.append((suffix, labels, float(value)))
+        return self
+
+    def to_dict(self) -> dict:
+        return {"name": self.name, "kind": self.kind, "help": self.help, "samples": self.samples}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "Family":
+        family = cls(data["name"], data["kind"], data["help"])
+        family.samples = [(suffix, labels, value) for suffix, labels, value in data["samples"]]
+        return family
+
+def latency_family(name: str, help: str, stats: dict[str, LatencyStats], label: str) -> Family:
+    """Expose LatencyStats as a Prometheus summary (count and sum only)."""
+    family = Family(name, "summary", help)
+    for value, latency in stats.items():
+        family.add(latency.count, "_count", **{label: value})
+        family.add(latency.total, "_sum", **{label: value})
+    return family
+
+class HttpMetrics:
+    """Per-route request counters and latency histograms for this worker.
+
+    Only the event loop thread records, from the ASGI middleware, so plain
+    dict and list updates are safe without a lock.
+    """
+
+    def __init__(self, buckets: tuple[float, ...] = BUCKETS):
+        self.buckets = buckets
+        self.requests: defaultdict[tuple[str, str, str], int] = defaultdict(int)
+        # (method, route) -> per-bucket counts (last one is +Inf), sum
+        self.durations: dict[tuple[str, str], list] = {}
+        self.in_progress: defaultdict[str, int] = defaultdict(int)
+
+    def observe(self, method: str, route: str, status: int, seconds: float):
+        self.requests[(method, route, str(status))] += 1
+        entry = self.durations.get((method, route))
+        if entry is None:
+            entry = self.durations[(method, route)] = [[0] * (len(self.buckets) + 1), 0.0]
+        entry[0][bisect.bisect_left(self.buckets, seconds)] += 1
+        entry[1] += seconds
+
+    def families(self) -> list[Family]:
+        requests = Family("http_requests_total", "counter", "HTTP requests by route template and status.")
+        for (method, route, status), count in list(self.requests.items()):
+            requests.add(count, method=method, route=route, status=status)
+
+        durations = Family(
+            "http_request_duration_seconds", "histogram", "HTTP request latency by route template."
+        )
+        for (method, route), (counts, total) in list(self.durations.items()):
+            cumulative = 0
+            for bound, count in zip((*self.buckets, "+Inf"), counts):
+                cumulative += count
+                durations.add(cumulative, "_bucket", method=method, route=route, le=str(bound))
+            durations.add(cumulative, "_count", method=method, route=route)
+            durations.add(total, "_sum", method=method, route=route)
+
+        in_progress = Family("http_requests_in_progress", "gauge", "HTTP requests being served.")
+        for method, count in list(self.in_progress.items()):
+            in_progress.add(count, method=method)
+        return [requests, durations, in_progress]
+
+class Registry:
+    """Collects families from registered callables, optionally across workers.
+
+    With `multiproc_dir` set, every worker writes its families to
+    `<dir>/metrics_<pid>_<start>.json`; `collect_all` sums them. The start
+    time keeps a reused pid from overwriting an exited worker's file.
+    Counters, histograms and summaries of exited workers (gone, or silent
+    for `stale_flushes` flushes) are folded into `metrics_archive.json` and
+    keep counting; gauges only come from workers that are still alive.
+    """
+
+    def __init__(self, multiproc_dir: str = "", flush_seconds: float = 5.0, stale_flushes: int = 12):
+        self.collectors: list[Callable[[], list[Family]]] = []
+        self.multiproc_dir = multiproc_dir
+        self.flush_seconds = flush_seconds
+        self.stale_flushes = stale_flushes
+        self._pid: int | None = None
+        self._file = ""
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def register(self, collector: Callable[[], list[Family]]):
+        self.collectors.append(collector)
+
+    def collect(self) -> list[Family]:
+        return [family for collector in self.collectors for family in collector()]
+
+    def _path(self) -> str:
+        # Picked again after a fork, so every worker gets its own file
+        if self._pid != os.getpid():
+            self._pid = os.getpid()
+            self._file = os.path.join(self.multiproc_dir, f"metrics_{self._pid}_{time.time_ns()}.json")
+        return self._file
+
+    def _dump(self, data: dict, path: str):
+        # Write then rename so readers never see a partial file
+        fd, tmp = tempfile.mkstemp(dir=self.multiproc_dir, prefix=".metrics_")
+        with os.fdopen(fd, "w") as f:
+            json.dump(data, f)
+        os.replace(tmp, path)
+
+    def write(self):
+        families = [family.to_dict() for family in self.collect()]
+        self._dump({"pid": os.getpid(), "families": families}, self._path())
+
+    def _worker_files(self) -> list[tuple[str, dict, bool]]:
+        """(name, data, alive) for every worker file that could be read."""
+        files = []
+        stale_before = time.time() - self.flush_seconds * self.stale_flushes
+        for name in sorted(os.listdir(self.multiproc_dir)):
+            if not (name.startswith("metrics_") and name.endswith(".json")) or name == ARCHIVE_FILE:
+                continue
+            path = os.path.join(self.multiproc_dir, name)
+            try:
+                with open(path) as f:
+                    data = json.load(f)
+                fresh = path == self._file or os.path.getmtime(path) >= stale_before
+            except (OSError, ValueError):
+                continue
+            files.append((name, data, fresh and _pid_alive(data["pid"])))
+        return files
+
+    def _read_archive(self) -> dict:
+        try:
+            with open(os.path.join(self.multiproc_dir, ARCHIVE_FILE)) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {"folded": [], "families": []}
+
+    def _archive_exited(self, files: list[tuple[str, dict, bool]]) -> dict:
+        """Fold exited workers' files into the archive and delete them."""
+        archive = self._read_archive()
+        exited = [(name, data) for name, data, alive in files if not alive]
+        if not exited:
+            return archive
+
+        # One worker at a time, or two could fold the same file twice
+        with open(os.path.join(self.multiproc_dir, ".metrics_archive.lock"), "w") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            archive = self._read_archive()
+            folded = set(archive["folded"])
+            # A file another worker already folded is gone by now
+            unfolded = [
+                data["families"] for name, data in exited
+                if name not in folded and os.path.exists(os.path.join(self.multiproc_dir, name))
+            ]
+            if unfolded:
+                families = _merge([archive["families"], *unfolded], gauges=False)
+                # Names are kept until the files are gone, in case removing them fails
+                archive = {"folded": [name for name, _ in exited], "families": [f.to_dict() for f in families]}
+                self._dump(archive, os.path.join(self.multiproc_dir, ARCHIVE_FILE))
+            for name, _ in exited:
+                with suppress(FileNotFoundError):
+                    os.remove(os.path.join(self.multiproc_dir, name))
+        return archive
+
+    def collect_all(self) -> list[Family]:
+        if not self.multiproc_dir:
+            return self.collect()
+        self.write()
+
+        files = self._worker_files()
+        archive = self._archive_exited(files)
+        live = [data["families"] for _, data, alive in files if alive]
+        return _merge([archive["families"], *live], gauges=True)
+
+    def _run(self):
+        while not self._stop.wait(self.flush_seconds):
+            self.write()
+
+    def start(self):
+        if self.multiproc_dir and self._thread is None:
+            os.makedirs(self.multiproc_dir, exist_ok=True)
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="metrics-flush", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+            # Keep this worker's final counts for the others to fold in
+            self.write()
+
+def _merge(sources: list[list[dict]], gauges: bool) -> list[Family]:
+    """Sum samples with the same name, suffix and labels across family lists."""
+    merged: dict[str, Family] = {}
+    values: dict[tuple, float] = {}
+    for families in sources:
+        for raw in families:
+            family = Family.from_dict(raw)
+            if family.kind == "gauge" and not gauges:
+                continue
+            target = merged.setdefault(family.name, Family(family.name, family.kind, family.help))
+            for suffix, labels, value in family.samples:
+                key = (family.name, suffix, tuple(sorted(labels.items())))
+                if key not in values:
+                    target.samples.append((suffix, labels, 0.0))
+                values[key] = values.get(key, 0.0) + value
+
+    for family in merged.values():
+        family.samples = [
+            (suffix, labels, values[(family.name, suffix, tuple(sorted(labels.items())))])
+            for suffix, labels, _ in family.samples
+        ]
+    return list(merged.values())
+
+def _pid_alive(pid: int) -> bool:
+    if pid == os.getpid():
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def render(families: list[Family]) -> str:
+    """Prometheus text exposition format 0.0.4."""
+    lines = []
+    for family in families:
+        lines.append(f"# HELP {family.name} {family.help}")
+        lines.append(f"# TYPE {family.name} {family.kind}")
+        for suffix, labels, value in family.samples:
+            label_text = ",".join(f'{key}="{_escape(str(val))}"' for key, val in labels.items())
+            sample = f"{family.name}{suffix}" + (f"{{{label_text}}}" if label_text else "")
+            lines.append(f"{sample} {int(value) if value.is_integer() else value!r}")
+    return "\n".join(lines) + "\n"
+
+class MetricsMiddleware:
+    """Records every HTTP request into `metrics`, labelled by route template."""
+
+    def __init__(self, app, metrics: HttpMetrics):
+        self.app = app
+        self.metrics = metrics
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        method = scope["method"]
+        started = time.perf_counter()
+        status_code = 500
+        self.metrics.in_progress[method] += 1
+
+        async def send_with_status(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            self.metrics.in_progress[method] -= 1
+            # The router stores the matched route in the scope
+            route = scope.get("route")
+            self.metrics.observe(
+                method,
+                getattr(route, "path", UNMATCHED_ROUTE),
+                status_code,
+                time.perf_counter() - started,
+            )
+
+http_metrics = HttpMetrics()
+registry = Registry(METRICS_MULTIPROC_DIR, METRICS_FLUSH_SECONDS)
+registry.register(http_metrics.families)
@@ -0,0 +1,113 @@
+import json
+import logging
+import re
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from sqlalchemy import Engine, event
+
+logger = logging.getLogger("app.sql")
+
+_current: ContextVar["QueryStats | None"] = ContextVar("query_stats", default=None)
+_WHITESPACE = re.compile(r"\s+")
+
+class QueryStats:
+    """SQL statements issued while handling one request."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.count = 0
+        self.seconds = 0.0
+        self.shapes: Counter[str] = Counter()
+
+    def record(self, statement: str, seconds: float):
+        # Statements are already parameterized, so the text is the shape
+        shape = _WHITESPACE.sub(" ", statement).strip()
+        with self._lock:
+            self.count += 1
+            self.seconds += seconds
+            self.shapes[shape] += 1
+
+    def repeated(self, threshold: int) -> dict[str, int]:
+        """Shapes run at least `threshold` times: likely N+1 loops."""
+        with self._lock:
+            return {shape: n for shape, n in self.shapes.items() if n >= threshold}
+
+    def server_timing(self) -> str:
+        return f'db;dur={self.seconds * 1000:.3f};desc="queries={self.count}"'
+
+@contextmanager
+def track_queries():
+    """Collect the statements issued in this context (and threads it spawns)."""
+    stats = QueryStats()
+    token = _current.set(stats)
+    try:
+        yield stats
+    finally:
+        _current.reset(token)
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current.get() is not None:
+        conn.info["query_started"] = time.perf_counter()
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _current.get()
+    started = conn.info.pop("query_started", None)
+    if stats is not None and started is not None:
+        stats.record(statement, time.perf_counter() - started)
+
+class QueryStatsMiddleware:
+    """Counts SQL per request, adds a Server-Timing header and logs a JSON line.
+
+    Repeated statement shapes at or above `repeat_threshold` are logged as a
+    warning. Statements run while a streaming body is sent are logged but
+    can't be in the header, which has already gone out.
+    """
+
+    def __init__(self, app, repeat_threshold: int):
+        self.app = app
+        self.repeat_threshold = repeat_threshold
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        started = time.perf_counter()
+        status_code = 500
+
+        with track_queries() as stats:
+            async def send_with_timing(message):
+                nonlocal status_code
+                if message["type"] == "http.response.start":
+                    status_code = message["status"]
+                    total = f"total;dur={(time.perf_counter() - started) * 1000:.3f}"
+                    message.setdefault("headers", []).append(
+                        (b"server-timing", f"{stats.server_timing()}, {total}".encode())
+                    )
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_with_timing)
+            finally:
+                self._log(scope, status_code, stats, time.perf_counter() - started)
+
+    def _log(self, scope, status_code: int, stats: QueryStats, seconds: float):
+        repeated = stats.repeated(self.repeat_threshold)
+        record = {
+            "method": scope["method"],
+            "path": scope["path"],
+            "status": status_code,
+            "queries": stats.count,
+            "db_ms": round(stats.seconds * 1000, 3),
+            "total_ms": round(seconds * 1000, 3),
+        }
+        if repeated:
+            record["repeated"] = repeated
+            logger.warning(json.dumps(record))
+        elif logger.isEnabledFor(logging.INFO):
+            logger.info(json.dumps(record))
@@ -0,0 +1,226 @@
+import math
+import threading
+import time
+from dataclasses import dataclass
+
+from fastapi import HTTPException, status
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import Engine, text
+
+from app.core.config import (
+    LOGIN_FAILURE_LIMIT,
+    RATE_LIMIT_BACKEND,
+    RATE_LIMIT_DEFAULT,
+    RATE_LIMIT_MAX_KEYS,
+    RATE_LIMIT_ROUTES,
+)
+from app.core.database import engine
+
+@dataclass(frozen=True, slots=True)
+class Budget:
+    """`burst` requests at once, refilled evenly over `period` seconds."""
+    burst: int
+    period: float
+
+    @property
+    def interval(self) -> float:
+        return self.period / self.burst
+
+    @classmethod
+    def parse(cls, value: str) -> "Budget | None":
+        """"<requests>/<seconds>", or "off" for no limit."""
+        value = value.strip()
+        if value.lower() == "off":
+            return None
+        count, _, seconds = value.partition("/")
+        try:
+            budget = cls(int(count), float(seconds or 1))
+        except ValueError:
+            budget = None
+        if budget is None or budget.burst <= 0 or budget.period <= 0:
+            raise ValueError(f"invalid rate limit {value!r}, expected '<requests>/<seconds>' or 'off'")
+        return budget
+
+def parse_route_budgets(value: str) -> dict[str, Budget | None]:
+    """"POST /auth/login=60/60,GET /metrics=off" -> {"POST /auth/login": Budget(60, 60.0), ...}"""
+    budgets = {}
+    for item in value.split(","):
+        if item.strip():
+            route, _, budget = item.rpartition("=")
+            method, _, path = route.strip().partition(" ")
+            budgets[f"{method.upper()} {path.strip()}"] = Budget.parse(budget)
+    return budgets
+
+class LocalBuckets:
+    """Token buckets of this worker process.
+
+    Each bucket is stored as one float, the time it will be full again (the
+    GCRA form of a token bucket): taking `cost` tokens moves it `cost *
+    interval` later and is refused if that is more than `period` ahead. Full
+    buckets carry no state, so they are dropped first once there are more
+    than `max_keys`.
+    """
+
+    blocking = False
+
+    def __init__(self, max_keys: int):
+        self.max_keys = max_keys
+        self._full_at: dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def take(self, key: str, budget: Budget, cost: float = 1) -> float:
+        """Spend `cost` tokens; returns 0, or the seconds to wait when refused."""
+        now = time.monotonic()
+        with self._lock:
+            full_at = max(self._full_at.get(key, now), now) + cost * budget.interval
+            if full_at - now > budget.period:
+                return full_at - now - budget.period
+            self._full_at[key] = full_at
+            if len(self._full_at) > self.max_keys:
+                self._evict(now)
+        return 0.0
+
+    def wait(self, key: str, budget: Budget) -> float:
+        """Seconds until one token is available, without spending it."""
+        now = time.monotonic()
+        with self._lock:
+            full_at = max(self._full_at.get(key, now), now)
+        return max(0.0, full_at + budget.interval - now - budget.period)
+
+    def reset(self, key: str):
+        with self._lock:
+            self._full_at.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._full_at.clear()
+
+    def _evict(self, now: float):
+        # Evict down to 90% so the scan is amortized over many inserts
+        target = int(self.max_keys * 0.9)
+        for key in [key for key, full_at in self._full_at.items() if full_at <= now]:
+            del self._full_at[key]
+        while len(self._full_at) > target:
+            del self._full_at[next(iter(self._full_at))]
+
+class PostgresBuckets:
+    """The same buckets in the rate_limit_buckets table, shared by every worker.
+
+    One round trip per check on a primary connection; times come from the
+    database clock so hosts agree. Full buckets are pruned every
+    `prune_every` checks.
+    """
+
+    blocking = True
+
+    def __init__(self, engine: Engine, prune_every: int = 1000):
+        self.engine = engine
+        self.prune_every = prune_every
+        self._calls = 0
+
+    def take(self, key: str, budget: Budget, cost: float = 1) -> float:
+        self._calls += 1
+        with self.engine.begin() as conn:
+            retry_after = conn.execute(
+                text("SELECT rate_limit_take(:key, :cost, :interval, :period)"),
+                {"key": key, "cost": cost, "interval": budget.interval, "period": budget.period},
+            ).scalar_one()
+            if self._calls % self.prune_every == 0:
+                conn.execute(text("DELETE FROM rate_limit_buckets WHERE full_at < extract(epoch FROM clock_timestamp())"))
+        return retry_after
+
+    def wait(self, key: str, budget: Budget) -> float:
+        with self.engine.connect() as conn:
+            retry_after = conn.execute(
+                text(
+                    "SELECT greatest(full_at - extract(epoch FROM clock_timestamp()) + :interval - :period, 0) "
+                    "FROM rate_limit_buckets WHERE key = :key"
+                ),
+                {"key": key, "interval": budget.interval, "period": budget.period},
+            ).scalar()
+        return retry_after or 0.0
+
+    def reset(self, key: str):
+        with self.engine.begin() as conn:
+            conn.execute(text("DELETE FROM rate_limit_buckets WHERE key = :key"), {"key": key})
+
+    def clear(self):
+        with self.engine.begin() as conn:
+            conn.execute(text("DELETE FROM rate_limit_buckets"))
+
+def too_many_requests(retry_after: float, detail: str = "Too many requests") -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+        detail=detail,
+        headers={"Retry-After": str(max(1, math.ceil(retry_after)))},
+    )
+
+class RateLimiter:
+    """Per-caller request budgets: a budget per route, or a shared default."""
+
+    def __init__(self, store, default: Budget | None, routes: dict[str, Budget | None]):
+        self.store = store
+        self.default = default
+        self.routes = routes
+        self.rejected = 0
+
+    def budget(self, route: str) -> tuple[str, Budget | None]:
+        """The bucket name and budget for "METHOD /path/template"."""
+        if route in self.routes:
+            return route, self.routes[route]
+        return "*", self.default
+
+    async def take(self, key: str, budget: Budget) -> float:
+        if self.store.blocking:
+            retry_after = await run_in_threadpool(self.store.take, key, budget)
+        else:
+            retry_after = self.store.take(key, budget)
+        if retry_after:
+            self.rejected += 1
+        return retry_after
+
+class LoginGuard:
+    """Failed-login budget per username, spent before the password is checked.
+
+    Every login attempt takes a token up front, in one atomic step, so
+    parallel attempts cannot all slip past a lockout; a failed attempt keeps
+    its token spent. Once a username has used up its failures, logins for it
+    are refused with 429 without a user lookup or bcrypt verify, until a
+    token refills. A successful login resets the bucket, refunding its token.
+    """
+
+    def __init__(self, store, budget: Budget | None):
+        self.store = store
+        self.budget = budget
+        self.locked = 0
+
+    @staticmethod
+    def _key(username: str) -> str:
+        return f"login|{username.strip().lower()}"
+
+    def check(self, username: str):
+        if self.budget is None:
+            return
+        retry_after = self.store.take(self._key(username), self.budget)
+        if retry_after:
+            self.locked += 1
+            raise too_many_requests(retry_after, "Too many failed logins, try again later")
+
+    def succeeded(self, username: str):
+        if self.budget is not None:
+            self.store.reset(self._key(username))
+
+    async def _call(self, fn, username: str):
+        if self.store.blocking:
+            return await run_in_threadpool(fn, username)
+        return fn(username)
+
+    async def check_async(self, username: str):
+        await self._call(self.check, username)
+
+    async def succeeded_async(self, username: str):
+        await self._call(self.succeeded, username)
+
+buckets = PostgresBuckets(engine) if RATE_LIMIT_BACKEND == "postgres" else LocalBuckets(RATE_LIMIT_MAX_KEYS)
+limiter = RateLimiter(buckets, Budget.parse(RATE_LIMIT_DEFAULT), parse_route_budgets(RATE_LIMIT_ROUTES))
+login_guard = LoginGuard(buckets, Budget.parse(LOGIN_FAILURE_LIMIT))
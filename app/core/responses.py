@@ -0,0 +1,33 @@
+from functools import cache
+
+from fastapi import Response
+from pydantic import BaseModel, TypeAdapter
+from sqlalchemy import Row
+
+@cache
+def _list_adapter(model: type[BaseModel]) -> TypeAdapter:
+    return TypeAdapter(list[model])
+
+def _plain(items: list) -> list:
+    # pydantic reads dicts much faster than Row attributes
+    if items and isinstance(items[0], Row):
+        keys = items[0]._fields
+        return [dict(zip(keys, row)) for row in items]
+    return items
+
+def json_list_response(model: type[BaseModel], items: list, response: Response | None = None) -> Response:
+    """Serialize ORM entities or column rows as a JSON list of `model` in one pass.
+
+    Returning a Response skips FastAPI's response_model handling (validate,
+    jsonable_encoder, json.dumps): the items are validated once and encoded by
+    pydantic-core. The body is byte-identical and the route keeps its
+    response_model for the OpenAPI schema. Headers set on `response` are copied.
+    """
+    adapter = _list_adapter(model)
+    body = adapter.dump_json(adapter.validate_python(_plain(items), from_attributes=True))
+    result = Response(body, media_type="application/json")
+    if response is not None:
+        for key, value in response.headers.items():
+            if key != "content-length":
+                result.headers.append(key, value)
+    return result
@@ -1,10 +1,88 @@
 from datetime import datetime, timedelta, timezone
 from typing import Any, Optional
-from jose import jwt
+from jose import JWTError, jwt
 from passlib.context import CryptContext
-from app.core.config import JWT_SECRET_KEY, JWT_ALGORITHM, ACCESS_TOKEN_EXPIRE_MINUTES
+from app.core.config import (
+    JWT_SECRET_KEY, JWT_ALGORITHM, JWT_BACKEND, ACCESS_TOKEN_EXPIRE_MINUTES,
+    PASSWORD_HASH_SCHEME, BCRYPT_ROUNDS, ARGON2_TIME_COST, ARGON2_MEMORY_KIB, ARGON2_PARALLELISM,
+)
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+class InvalidTokenError(Exception):
+    """Token failed signature, expiry or format checks, whatever the backend."""
+
+class JoseBackend:
+    name = "jose"
+
+    def encode(self, claims: dict) -> str:
+        return jwt.encode(claims, JWT_SECRET_KEY, algorithm=JWT_ALGORITHM)
+
+    def decode(self, token: str) -> dict:
+        try:
+            return jwt.decode(token, JWT_SECRET_KEY, algorithms=[JWT_ALGORITHM])
+        except JWTError as exc:
+            raise InvalidTokenError(str(exc)) from exc
+
+class PyJWTBackend:
+    """PyJWT (optional dependency): same tokens, less per-call overhead."""
+    name = "pyjwt"
+
+    def __init__(self):
+        import jwt as pyjwt
+        self._jwt = pyjwt
+
+    def encode(self, claims: dict) -> str:
+        return self._jwt.encode(claims, JWT_SECRET_KEY, algorithm=JWT_ALGORITHM)
+
+    def decode(self, token: str) -> dict:
+        try:
+            return self._jwt.decode(token, JWT_SECRET_KEY, algorithms=[JWT_ALGORITHM])
+        except self._jwt.PyJWTError as exc:
+            raise InvalidTokenError(str(exc)) from exc
+
+JWT_BACKENDS = {"jose": JoseBackend, "pyjwt": PyJWTBackend}
+
+def get_jwt_backend(name: str = JWT_BACKEND):
+    try:
+        return JWT_BACKENDS[name]()
+    except KeyError:
+        raise ValueError(f"Unknown JWT_BACKEND {name!r}, expected one of {sorted(JWT_BACKENDS)}")
+
+jwt_backend = get_jwt_backend()
+
+PASSWORD_SCHEMES = ("bcrypt", "argon2")
+
+def get_password_context(
+    scheme: str = PASSWORD_HASH_SCHEME,
+    *,
+    bcrypt_rounds: int = BCRYPT_ROUNDS,
+    argon2_time_cost: int = ARGON2_TIME_COST,
+    argon2_memory_kib: int = ARGON2_MEMORY_KIB,
+    argon2_parallelism: int = ARGON2_PARALLELISM,
+) -> CryptContext:
+    """Hashes new passwords with `scheme`; verifies both schemes at any cost.
+
+    needs_update is true for the other scheme and for any other cost (min,
+    max and default rounds are pinned together), so raising or lowering the
+    cost takes effect as users log in.
+    """
+    if scheme not in PASSWORD_SCHEMES:
+        raise ValueError(f"Unknown PASSWORD_HASH_SCHEME {scheme!r}, expected one of {list(PASSWORD_SCHEMES)}")
+    context = CryptContext(
+        schemes=[scheme, *(other for other in PASSWORD_SCHEMES if other != scheme)],
+        deprecated="auto",
+        bcrypt__default_rounds=bcrypt_rounds,
+        bcrypt__min_rounds=bcrypt_rounds,
+        bcrypt__max_rounds=bcrypt_rounds,
+        argon2__type="ID",
+        argon2__time_cost=argon2_time_cost,
+        argon2__memory_cost=argon2_memory_kib,
+        argon2__parallelism=argon2_parallelism,
+    )
+    # Fail at startup, not at the first login, when argon2-cffi is missing
+    context.handler(scheme).get_backend()
+    return context
+
+pwd_context = get_password_context()
 
 def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
@@ -12,6 +90,10 @@ def get_password_hash(password: str) -> str:
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
+def verify_and_update_password(plain_password: str, hashed_password: str) -> tuple[bool, str | None]:
+    """verify_password, plus a new hash when `hashed_password` uses another scheme or cost."""
+    return pwd_context.verify_and_update(plain_password, hashed_password)
+
 def create_access_token(
     subject: str | Any,
     *,
@@ -26,5 +108,8 @@ def create_access_token(
         expires_delta or timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     )
     to_encode.update({"exp": expire, "type": "access"})
-    encoded_jwt = jwt.encode(to_encode, JWT_SECRET_KEY, algorithm=JWT_ALGORITHM)
-    return encoded_jwt
\ No newline at end of file
+    encoded_jwt = jwt_backend.encode(to_encode)
+    return encoded_jwt
+
+def decode_access_token(token: str) -> dict:
+    return jwt_backend.decode(token)
\ No newline at end of file
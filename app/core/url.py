@@ -3,7 +3,9 @@ auth = {
   "prefix": "/auth",
   "tags": ["Auth"],
   "urls": {
-    "login": "/login"
+    "login": "/login",
+    "refresh": "/refresh",
+    "revoke": "/revoke"
   }
 }
 
@@ -39,6 +41,17 @@ todo = {
     "create_task": "",
     "update_task": "/{task_id}",
     "delete_task": "/{task_id}",
-    "list_tasks": ""
+    "list_tasks": "",
+    "export_tasks": "/export",
+    "task_changes": "/changes",
+    "task_events": "/events",
+    "task_event_tickets": "/events/tickets",
+    "search_tasks": "/search",
+    "task_stats": "/stats",
+    "import_tasks": "/import",
+    "bulk_create_tasks": "/bulk",
+    "bulk_update_tasks": "/bulk",
+    "bulk_complete_tasks": "/bulk/complete",
+    "bulk_delete_tasks": "/bulk/delete"
   }
 }
\ No newline at end of file
@@ -1,6 +1,48 @@
-from fastapi import FastAPI
-from app.routers import router
+from contextlib import asynccontextmanager
+from fastapi import Depends, FastAPI, Request
+from fastapi.responses import JSONResponse
+from app.core.config import (
+    SQL_STATS_ENABLED, SQL_REPEAT_THRESHOLD, METRICS_ENABLED, EVENTS_ENABLED, RATE_LIMIT_ENABLED,
+)
+from app.core.database import ReadYourWritesMiddleware, dispose_async_engines, replicas
+from app.core.hashing import HashingBusyError, password_hasher
+from app.core.prometheus import MetricsMiddleware, http_metrics, registry
+from app.core.query_stats import QueryStatsMiddleware
+from app.routers import ops_router, router
+from app.services.auth import rate_limit
+from app.services.events import listener
+from app.services.health import readiness
 
-app = FastAPI(title="Todo API")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    replicas.start()
+    registry.start()
+    if EVENTS_ENABLED:
+        await listener.start()
+    yield
+    await listener.stop()
+    await dispose_async_engines()
+    registry.stop()
+    replicas.stop()
+    readiness.shutdown()
+    password_hasher.shutdown()
 
-app.include_router(router)
\ No newline at end of file
+app = FastAPI(title="Todo API", lifespan=lifespan)
+
+@app.exception_handler(HashingBusyError)
+async def hashing_busy_handler(request: Request, exc: HashingBusyError):
+    return JSONResponse(
+        status_code=429,
+        content={"detail": "Too many requests"},
+        headers={"Retry-After": "1"},
+    )
+
+if SQL_STATS_ENABLED:
+    app.add_middleware(QueryStatsMiddleware, repeat_threshold=SQL_REPEAT_THRESHOLD)
+if METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware, metrics=http_metrics)
+if replicas.replicas:
+    app.add_middleware(ReadYourWritesMiddleware)
+
+app.include_router(router, dependencies=[Depends(rate_limit)] if RATE_LIMIT_ENABLED else None)
+app.include_router(ops_router)
@@ -1,6 +1,6 @@
 from .base import Base
 from .company import Company
-from .user import User
-from .task import Task
+from .user import EventTicket, RefreshToken, User
+from .task import Task, TaskCounter, TaskTombstone
 
-__all__ = ["Base", "Company", "User", "Task"]
\ No newline at end of file
+__all__ = ["Base", "Company", "User", "RefreshToken", "EventTicket", "Task", "TaskCounter", "TaskTombstone"]
\ No newline at end of file
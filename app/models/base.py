@@ -9,11 +9,14 @@ class Base(DeclarativeBase):
     pass
 
 class IdTimestampMixin:
+    # Fetch server-generated timestamps with RETURNING on INSERT and UPDATE
+    # instead of a follow-up SELECT
+    __mapper_args__ = {"eager_defaults": True}
+
     id: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True),
         primary_key=True,
         default=uuid.uuid4,
-        index=True,
     )
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), server_default=func.now(), nullable=False
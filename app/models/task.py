@@ -1,17 +1,56 @@
 from __future__ import annotations
-from sqlalchemy import Column, String, Boolean, ForeignKey
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy import BigInteger, Column, Computed, DateTime, String, Boolean, ForeignKey, Index, func
+from sqlalchemy.dialects.postgresql import TSVECTOR, UUID
 from sqlalchemy.orm import relationship
 from app.models.base import IdTimestampMixin, Base
 
 class Task(IdTimestampMixin, Base):
     __tablename__ = "tasks"
+    __table_args__ = (
+        # Keyset pagination on (created_at, id) scoped to company / owner
+        Index("ix_tasks_company_created_id", "company_id", "created_at", "id"),
+        Index("ix_tasks_company_user_created_id", "company_id", "user_id", "created_at", "id"),
+        # Delta sync (GET /todos/changes) walks (updated_at, id) per company
+        Index("ix_tasks_company_updated_id", "company_id", "updated_at", "id"),
+        # Full-text search (GET /todos/search); the pg_trgm index for substring
+        # search is created by the migration only where the extension exists
+        Index("ix_tasks_search", "search", postgresql_using="gin"),
+    )
+    __mapper_args__ = {**IdTimestampMixin.__mapper_args__, "exclude_properties": ["search"]}
 
     title = Column(String, nullable=False)
     content = Column(String, nullable=False)
     is_completed = Column(Boolean, default=False)
+    # Table-only (Task.__table__.c.search): unmapped so inserts and updates
+    # don't RETURN it
+    search = Column(TSVECTOR, Computed(
+        "setweight(to_tsvector('english'::regconfig, title), 'A') || "
+        "setweight(to_tsvector('english'::regconfig, content), 'B')",
+        persisted=True,
+    ))
 
     user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
     company_id = Column(UUID(as_uuid=True), ForeignKey("companies.id", ondelete="RESTRICT"), nullable=False)
 
-    owner = relationship("User", back_populates="tasks")
\ No newline at end of file
+    owner = relationship("User", back_populates="tasks")
+
+class TaskTombstone(Base):
+    """A deleted task, written by the tasks_tombstone trigger on every delete path."""
+    __tablename__ = "task_tombstones"
+    __table_args__ = (
+        Index("ix_task_tombstones_company_deleted_id", "company_id", "deleted_at", "id"),
+    )
+
+    id = Column(UUID(as_uuid=True), primary_key=True)
+    user_id = Column(UUID(as_uuid=True), nullable=False)
+    company_id = Column(UUID(as_uuid=True), nullable=False)
+    deleted_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+class TaskCounter(Base):
+    """Task totals per owner, kept current by the tasks_count trigger."""
+    __tablename__ = "task_counters"
+
+    company_id = Column(UUID(as_uuid=True), primary_key=True)
+    user_id = Column(UUID(as_uuid=True), primary_key=True)
+    total = Column(BigInteger, nullable=False, server_default="0")
+    completed = Column(BigInteger, nullable=False, server_default="0")
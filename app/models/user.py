@@ -1,5 +1,5 @@
 from __future__ import annotations
-from sqlalchemy import Boolean, Column, String, ForeignKey
+from sqlalchemy import Boolean, Column, DateTime, String, ForeignKey, LargeBinary, func
 from sqlalchemy.orm import relationship
 from sqlalchemy.dialects.postgresql import UUID
 from app.models.base import IdTimestampMixin, Base
@@ -19,3 +19,33 @@ class User(IdTimestampMixin, Base):
 
     company = relationship("Company", back_populates="users")
     tasks = relationship("Task", back_populates="owner")
+
+class RefreshToken(Base):
+    """An opaque refresh token, stored only as its SHA-256 digest.
+
+    Every refresh revokes the presented token and issues the next one in the
+    same family (one login session); presenting a revoked token again revokes
+    the whole family.
+    """
+    __tablename__ = "refresh_tokens"
+
+    token_hash = Column(LargeBinary, primary_key=True)
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    family_id = Column(UUID(as_uuid=True), nullable=False, index=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    expires_at = Column(DateTime(timezone=True), nullable=False)
+    revoked_at = Column(DateTime(timezone=True))
+
+class EventTicket(Base):
+    """A single-use ticket for opening a task event stream, stored as its SHA-256 digest.
+
+    Browsers cannot send an Authorization header on WebSocket/EventSource, and
+    a bearer token in the URL would end up in access logs.
+    """
+    __tablename__ = "event_tickets"
+
+    ticket_hash = Column(LargeBinary, primary_key=True)
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    expires_at = Column(DateTime(timezone=True), nullable=False)
+    # Expiry of the access token the ticket was issued for; the stream ends then
+    session_expires_at = Column(DateTime(timezone=True), nullable=False)
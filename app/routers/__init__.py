@@ -1,9 +1,44 @@
 from fastapi import APIRouter
-from app.routers import health, todos, users, companies, auth
+from fastapi.routing import APIRoute
+from app.core.config import DB_ASYNC_ENABLED, EVENTS_ENABLED, METRICS_ENABLED
+from app.routers import health, metrics, events, todos, users, companies, auth
+
+def _mount_with_async(target: APIRouter, sync_router: APIRouter, async_router: APIRouter):
+    """Serve every route the async router defines; keep the remaining sync routes.
+
+    Sync-only routes are registered first so a static path such as "/todos/x"
+    is not swallowed by an async "/todos/{task_id}".
+    """
+    served = {
+        (route.path, frozenset(route.methods))
+        for route in async_router.routes
+        if isinstance(route, APIRoute)
+    }
+    for route in sync_router.routes:
+        if not isinstance(route, APIRoute) or (route.path, frozenset(route.methods)) not in served:
+            target.routes.append(route)
+    target.include_router(async_router)
 
 router = APIRouter()
-router.include_router(auth.router)
-router.include_router(users.router)
-router.include_router(companies.router)
-router.include_router(todos.router)
-router.include_router(health.router)
\ No newline at end of file
+if EVENTS_ENABLED:
+    router.include_router(events.router)
+if DB_ASYNC_ENABLED:
+    from app.routers import aio
+
+    sync_router = APIRouter()
+    sync_router.include_router(auth.router)
+    sync_router.include_router(users.router)
+    sync_router.include_router(companies.router)
+    sync_router.include_router(todos.router)
+    _mount_with_async(router, sync_router, aio.router)
+else:
+    router.include_router(auth.router)
+    router.include_router(users.router)
+    router.include_router(companies.router)
+    router.include_router(todos.router)
+
+# Health checks and scrapes, kept out of the API's rate limits
+ops_router = APIRouter()
+ops_router.include_router(health.router)
+if METRICS_ENABLED:
+    ops_router.include_router(metrics.router)
@@ -0,0 +1,10 @@
+from fastapi import APIRouter
+from app.routers.aio import todos, users, companies, auth
+
+# Async (AsyncSession) variants of the auth, users, companies and todos routes,
+# mounted in place of the sync ones when DB_ASYNC_ENABLED is set
+router = APIRouter()
+router.include_router(auth.router)
+router.include_router(users.router)
+router.include_router(companies.router)
+router.include_router(todos.router)
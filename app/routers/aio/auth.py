@@ -0,0 +1,49 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.security import OAuth2PasswordRequestForm
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.url import auth
+from app.core.database import get_async_db_context
+from app.core.hashing import password_hasher
+from app.core.rate_limit import login_guard
+from app.models.user import User
+from app.schemas.auth import RefreshTokenIn
+from app.services.auth import refresh_session_async, revoke_refresh_family, start_session_async
+
+router = APIRouter(prefix=auth["prefix"], tags=auth["tags"])
+
+# Login by username (or email)
+@router.post(auth["urls"]["login"])
+async def login(
+    form: OAuth2PasswordRequestForm = Depends(),  # fields: username, password
+    db: AsyncSession = Depends(get_async_db_context),
+):
+    # Spends a failure up front, refused before the lookup and bcrypt once they
+    # are used up; only a successful login gives it back
+    await login_guard.check_async(form.username)
+    user = await db.scalar(select(User).where(User.username == form.username).limit(1))
+    verified, new_hash = (
+        await password_hasher.verify_and_update_async(form.password, user.hashed_password) if user else (False, None)
+    )
+    if not verified:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Incorrect credentials")
+
+    await login_guard.succeeded_async(form.username)
+    # Saved by the session's commit: the outdated hash is replaced while the
+    # plain password is at hand
+    if new_hash:
+        user.hashed_password = new_hash
+    return await start_session_async(db, user)
+
+# New access and refresh tokens for a refresh token, which is used up
+@router.post(auth["urls"]["refresh"])
+async def refresh(payload: RefreshTokenIn, db: AsyncSession = Depends(get_async_db_context)):
+    return await refresh_session_async(db, payload.refresh_token)
+
+# Logout: end the refresh token's session; unknown tokens are ignored.
+# Access tokens already issued stay valid until they expire
+@router.post(auth["urls"]["revoke"], status_code=status.HTTP_204_NO_CONTENT)
+async def revoke(payload: RefreshTokenIn, db: AsyncSession = Depends(get_async_db_context)):
+    await db.execute(revoke_refresh_family(payload.refresh_token))
+    await db.commit()
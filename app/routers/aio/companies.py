@@ -0,0 +1,84 @@
+from uuid import UUID
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.url import company
+from app.core.etag import Conditional, entity_etag, version_query
+from app.core.database import get_async_db_context
+from app.models.company import Company
+from app.schemas.company import CompanyCreate, CompanyUpdate, CompanyOut
+from app.services.auth import Principal, get_current_user_async
+
+router = APIRouter(prefix=company["prefix"], tags=company["tags"])
+
+# Get current user's company
+@router.get(company["urls"]["get_my_company"], response_model=CompanyOut)
+async def get_my_company(
+    conditional: Conditional = Depends(),
+    db: AsyncSession = Depends(get_async_db_context),
+    current_user: Principal = Depends(get_current_user_async),
+):
+    if conditional.if_none_match:
+        version = (await db.execute(version_query(Company, current_user.company_id))).first()
+        if version and (not_modified := conditional.not_modified(entity_etag(version))):
+            return not_modified
+
+    comp = await db.get(Company, current_user.company_id)
+    if not comp:
+        raise HTTPException(status_code=404, detail="Company not found")
+    conditional.tag(entity_etag(comp))
+    return comp
+
+# Get company by id
+@router.get(company["urls"]["get_company_by_id"], response_model=CompanyOut)
+async def get_company(
+    company_id: UUID,
+    conditional: Conditional = Depends(),
+    db: AsyncSession = Depends(get_async_db_context),
+):
+    if conditional.if_none_match:
+        version = (await db.execute(version_query(Company, company_id))).first()
+        if version and (not_modified := conditional.not_modified(entity_etag(version))):
+            return not_modified
+
+    comp = await db.get(Company, company_id)
+    if not comp:
+        raise HTTPException(status_code=404, detail="Company not found")
+    conditional.tag(entity_etag(comp))
+    return comp
+
+# Update company profile by id
+@router.put(company["urls"]["update_company"], response_model=CompanyOut)
+async def update_company(
+    company_id: UUID,
+    payload: CompanyUpdate,
+    db: AsyncSession = Depends(get_async_db_context),
+    current_user: Principal = Depends(get_current_user_async),
+):
+    if company_id != current_user.company_id:
+        raise HTTPException(status_code=403, detail="Not allowed across companies")
+    if not current_user.is_admin:
+        raise HTTPException(status_code=403, detail="Admin only")
+
+    comp = await db.get(Company, company_id)
+    if not comp:
+        raise HTTPException(status_code=404, detail="Company not found")
+
+    for k, v in payload.model_dump(exclude_unset=True).items():
+        setattr(comp, k, v)
+    await db.commit()
+    return comp
+
+# Create company (admin only)
+@router.post(company["urls"]["create_company"], response_model=CompanyOut, status_code=status.HTTP_201_CREATED)
+async def create_company(
+    payload: CompanyCreate,
+    db: AsyncSession = Depends(get_async_db_context),
+    current_user: Principal = Depends(get_current_user_async),
+):
+    if not current_user.is_admin:
+        raise HTTPException(status_code=403, detail="Admin only")
+    comp = Company(**payload.model_dump())
+    db.add(comp)
+    await db.commit()
+    return comp
@@ -0,0 +1,106 @@
+from typing import Annotated
+from uuid import UUID
+from fastapi import APIRouter, Depends, HTTPException, Response, status, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.url import todo
+from app.core.etag import Conditional, entity_etag, list_etag, version_query
+from app.core.responses import json_list_response
+from app.core.database import get_async_db_context
+from app.models.task import Task
+from app.schemas.task import TaskCreate, TaskUpdate, TaskOut, TaskListParams
+from app.services.auth import Principal, get_current_user_async
+from app.services.task import ensure_access, task_page, task_page_query
+
+router = APIRouter(prefix=todo["prefix"], tags=todo["tags"])
+
+# Get task list (keyset paginated on created_at, id; newest first)
+@router.get(todo["urls"]["list_tasks"], response_model=list[TaskOut])
+async def list_tasks(
+    response: Response,
+    params: Annotated[TaskListParams, Query()],
+    conditional: Conditional = Depends(),
+    db: AsyncSession = Depends(get_async_db_context),
+    current_user: Principal = Depends(get_current_user_async),
+):
+    stmt, backward = task_page_query(current_user, params)
+    if conditional.if_none_match:
+        versions = (await db.execute(stmt.with_only_columns(Task.id, Task.created_at, Task.updated_at))).all()
+        task_page(versions, params, backward, response)
+        if not_modified := conditional.not_modified(list_etag(versions)):
+            return not_modified
+
+    rows = (await db.execute(stmt)).all()
+    conditional.tag(list_etag(rows))
+    tasks = task_page(rows, params, backward, response)
+    return json_list_response(TaskOut, tasks, response)
+
+# Get task detail
+@router.get(todo["urls"]["get_task_by_id"], response_model=TaskOut)
+async def get_task(
+    task_id: UUID,
+    conditional: Conditional = Depends(),
+    db: AsyncSession = Depends(get_async_db_context),
+    current_user: Principal = Depends(get_current_user_async),
+):
+    if conditional.if_none_match:
+        version = (await db.execute(version_query(Task, task_id, Task.company_id, Task.user_id))).first()
+        if version:
+            ensure_access(version, current_user)
+            if not_modified := conditional.not_modified(entity_etag(version)):
+                return not_modified
+
+    task = await db.get(Task, task_id)
+    if not task:
+        raise HTTPException(status_code=404, detail="Task not found")
+    ensure_access(task, current_user)
+    conditional.tag(entity_etag(task))
+    return task
+
+# Create task
+@router.post(todo["urls"]["create_task"], response_model=TaskOut, status_code=status.HTTP_201_CREATED)
+async def create_task(
+    payload: TaskCreate,
+    db: AsyncSession = Depends(get_async_db_context),
+    current_user: Principal = Depends(get_current_user_async),
+):
+    task = Task(
+        **payload.model_dump(),
+        user_id=current_user.id,
+        company_id=current_user.company_id,
+    )
+    db.add(task)
+    await db.commit()
+    return task
+
+# Update task
+@router.put(todo["urls"]["update_task"], response_model=TaskOut)
+async def update_task(
+    task_id: UUID,
+    payload: TaskUpdate,
+    db: AsyncSession = Depends(get_async_db_context),
+    current_user: Principal = Depends(get_current_user_async),
+):
+    task = await db.get(Task, task_id)
+    if not task:
+        raise HTTPException(status_code=404, detail="Task not found")
+    ensure_access(task, current_user)
+
+    for k, v in payload.model_dump(exclude_unset=True).items():
+        setattr(task, k, v)
+    await db.commit()
+    return task
+
+# Delete task
+@router.delete(todo["urls"]["delete_task"], status_code=status.HTTP_204_NO_CONTENT)
+async def delete_task(
+    task_id: UUID,
+    db: AsyncSession = Depends(get_async_db_context),
+    current_user: Principal = Depends(get_current_user_async),
+):
+    task = await db.get(Task, task_id)
+    if not task:
+        raise HTTPException(status_code=404, detail="Task not found")
+    ensure_access(task, current_user)
+    await db.delete(task)
+    await db.commit()
@@ -0,0 +1,152 @@
+from uuid import UUID
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.url import user
+from app.core.etag import Conditional, entity_etag, list_etag, version_query
+from app.core.responses import json_list_response
+from app.core.database import get_async_db_context
+from app.core.hashing import password_hasher
+from app.models.user import User
+from app.schemas.user import UserCreate, UserUpdate, UserOut
+from app.services.auth import Principal, get_current_user_async, principal_cache, revoke_user_refresh_tokens
+from app.services.user import company_users_query
+
+router = APIRouter(prefix=user["prefix"], tags=user["tags"])
+
+# Get user profile
+@router.get(user["urls"]["get_me"], response_model=UserOut)
+async def get_me(
+    conditional: Conditional = Depends(),
+    db: AsyncSession = Depends(get_async_db_context),
+    current_user: Principal = Depends(get_current_user_async),
+):
+    if conditional.if_none_match:
+        version = (await db.execute(version_query(User, current_user.id))).first()
+        if version and (not_modified := conditional.not_modified(entity_etag(version))):
+            return not_modified
+
+    user = await db.get(User, current_user.id)
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
+    conditional.tag(entity_etag(user))
+    return user
+
+# Get user list
+@router.get(user["urls"]["list_users"], response_model=list[UserOut])
+async def list_users_in_company(
+    conditional: Conditional = Depends(),
+    db: AsyncSession = Depends(get_async_db_context),
+    current_user: Principal = Depends(get_current_user_async),
+):
+    if not current_user.is_admin:
+        raise HTTPException(status_code=403, detail="Admin only")
+    if conditional.if_none_match:
+        versions = (await db.execute(company_users_query(current_user, User.id, User.updated_at))).all()
+        if not_modified := conditional.not_modified(list_etag(versions)):
+            return not_modified
+
+    rows = (await db.execute(company_users_query(current_user))).all()
+    conditional.tag(list_etag(rows))
+    return json_list_response(UserOut, rows, conditional.response)
+
+# Get user profile by id
+@router.get(user["urls"]["get_user_by_id"], response_model=UserOut)
+async def get_user(
+    user_id: UUID,
+    conditional: Conditional = Depends(),
+    db: AsyncSession = Depends(get_async_db_context),
+    current_user: Principal = Depends(get_current_user_async),
+):
+    if conditional.if_none_match:
+        version = (await db.execute(version_query(User, user_id, User.company_id))).first()
+        if version and version.company_id == current_user.company_id:
+            if not_modified := conditional.not_modified(entity_etag(version)):
+                return not_modified
+
+    user = await db.get(User, user_id)
+    if not user or user.company_id != current_user.company_id:
+        raise HTTPException(status_code=404, detail="User not found")
+    conditional.tag(entity_etag(user))
+    return user
+
+# Create user (admin only)
+@router.post(user["urls"]["create_user"], response_model=UserOut, status_code=status.HTTP_201_CREATED)
+async def create_user_in_company(
+    payload: UserCreate,
+    db: AsyncSession = Depends(get_async_db_context),
+    current_user: Principal = Depends(get_current_user_async),
+):
+    if not current_user.is_admin:
+        raise HTTPException(status_code=403, detail="Admin only")
+
+    hashed = await password_hasher.hash_async(payload.password)
+    user = User(
+        email=payload.email,
+        username=payload.username,
+        first_name=payload.first_name,
+        last_name=payload.last_name,
+        hashed_password=hashed,
+        is_active=payload.is_active,
+        is_admin=payload.is_admin,
+        company_id=current_user.company_id,
+    )
+    db.add(user)
+    await db.commit()
+    return user
+
+# Update user profile by id
+@router.put(user["urls"]["update_user"], response_model=UserOut)
+async def update_user(
+    user_id: UUID,
+    payload: UserUpdate,
+    db: AsyncSession = Depends(get_async_db_context),
+    current_user: Principal = Depends(get_current_user_async),
+):
+    user = await db.get(User, user_id)
+    if not user or user.company_id != current_user.company_id:
+        raise HTTPException(status_code=404, detail="User not found")
+
+    # User only update basic information, except is_admin/is_active
+    if not current_user.is_admin and user.id != current_user.id:
+        raise HTTPException(status_code=403, detail="Not allowed")
+
+    data = payload.model_dump(exclude_unset=True)
+
+    # Prevent unauthorized access
+    if not current_user.is_admin:
+        data.pop("is_admin", None)
+        data.pop("is_active", None)
+
+    # Change pasword
+    if "password" in data and data["password"]:
+        user.hashed_password = await password_hasher.hash_async(data.pop("password"))
+
+    for k, v in data.items():
+        setattr(user, k, v)
+
+    # A new password or deactivation ends every login session
+    if payload.password or data.get("is_active") is False:
+        await db.execute(revoke_user_refresh_tokens(user.id))
+    await db.commit()
+    # Deactivation and role changes must apply to the next request
+    principal_cache.invalidate(user.id)
+    return user
+
+# Delete user (admin only)
+@router.delete(user["urls"]["delete_user"], status_code=status.HTTP_204_NO_CONTENT)
+async def delete_user(
+    user_id: UUID,
+    db: AsyncSession = Depends(get_async_db_context),
+    current_user: Principal = Depends(get_current_user_async),
+):
+    if not current_user.is_admin:
+        raise HTTPException(status_code=403, detail="Admin only")
+
+    user = await db.get(User, user_id)
+    if not user or user.company_id != current_user.company_id:
+        raise HTTPException(status_code=404, detail="User not found")
+
+    await db.delete(user)
+    await db.commit()
+    principal_cache.invalidate(user_id)
@@ -1,12 +1,14 @@
-from datetime import timedelta
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.orm import Session
 
 from app.core.url import auth
 from app.core.database import get_db_context
-from app.core.security import verify_password, create_access_token, ACCESS_TOKEN_EXPIRE_MINUTES
+from app.core.hashing import password_hasher
+from app.core.rate_limit import login_guard
 from app.models.user import User
+from app.schemas.auth import RefreshTokenIn
+from app.services.auth import refresh_session, revoke_refresh_family, start_session
 
 router = APIRouter(prefix=auth["prefix"], tags=auth["tags"])
 
@@ -16,17 +18,31 @@ def login(
     form: OAuth2PasswordRequestForm = Depends(),  # fields: username, password
     db: Session = Depends(get_db_context),
 ):
+    # Spends a failure up front, refused before the lookup and bcrypt once they
+    # are used up; only a successful login gives it back
+    login_guard.check(form.username)
     user = db.query(User).filter(User.username == form.username).first()
-    if not user or not verify_password(form.password, user.hashed_password):
+    verified, new_hash = (
+        password_hasher.verify_and_update(form.password, user.hashed_password) if user else (False, None)
+    )
+    if not verified:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Incorrect credentials")
 
-    access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
-    token = create_access_token(
-        subject=str(user.id),
-        expires_delta=access_token_expires,
-        extra_claims={
-            "company_id": str(user.company_id),
-            "is_admin": user.is_admin,
-        },
-    )
-    return {"access_token": token, "token_type": "bearer"}
+    login_guard.succeeded(form.username)
+    # Saved by the session's commit: the outdated hash is replaced while the
+    # plain password is at hand
+    if new_hash:
+        user.hashed_password = new_hash
+    return start_session(db, user)
+
+# New access and refresh tokens for a refresh token, which is used up
+@router.post(auth["urls"]["refresh"])
+def refresh(payload: RefreshTokenIn, db: Session = Depends(get_db_context)):
+    return refresh_session(db, payload.refresh_token)
+
+# Logout: end the refresh token's session; unknown tokens are ignored.
+# Access tokens already issued stay valid until they expire
+@router.post(auth["urls"]["revoke"], status_code=status.HTTP_204_NO_CONTENT)
+def revoke(payload: RefreshTokenIn, db: Session = Depends(get_db_context)):
+    db.execute(revoke_refresh_family(payload.refresh_token))
+    db.commit()
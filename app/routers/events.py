@@ -0,0 +1,140 @@
+import asyncio
+import time
+from contextlib import suppress
+from typing import Annotated
+
+from fastapi import APIRouter, Depends, HTTPException, Request, WebSocket, WebSocketDisconnect, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+from starlette.requests import HTTPConnection
+
+from app.core.config import EVENTS_HEARTBEAT_SECONDS
+from app.core.database import get_db_context
+from app.core.url import todo
+from app.services.auth import (
+    Principal,
+    bearer_token,
+    get_current_user,
+    issue_event_ticket,
+    oauth2_scheme,
+    principal_for_user,
+    redeem_event_ticket,
+    session_for_token,
+)
+from app.services.events import Subscriber, task_events
+
+# Registered ahead of the todos routers so "/todos/events" is not taken for a
+# task id
+router = APIRouter(prefix=todo["prefix"], tags=todo["tags"])
+
+async def _session(connection: HTTPConnection) -> tuple[Principal, float]:
+    """The caller and their access token's expiry, from a ticket or a bearer header."""
+    ticket = connection.query_params.get("ticket")
+    if ticket:
+        return await run_in_threadpool(redeem_event_ticket, ticket)
+    return await run_in_threadpool(session_for_token, bearer_token(connection))
+
+def _until_check(checked_at: float, expires_at: float) -> float:
+    # Access is re-checked every heartbeat and when the access token expires
+    return max(0.0, min(checked_at + EVENTS_HEARTBEAT_SECONDS - time.monotonic(), expires_at - time.time()))
+
+async def _still_allowed(current_user: Principal, expires_at: float) -> bool:
+    """False once the token expired or the user was deactivated, moved or changed role."""
+    if time.time() >= expires_at:
+        return False
+    try:
+        return await run_in_threadpool(principal_for_user, current_user.id) == current_user
+    except HTTPException:
+        return False
+
+async def _until_revoked(current_user: Principal, expires_at: float):
+    checked_at = time.monotonic()
+    while True:
+        await asyncio.sleep(_until_check(checked_at, expires_at))
+        if not await _still_allowed(current_user, expires_at):
+            return
+        checked_at = time.monotonic()
+
+async def _until_disconnected(websocket: WebSocket):
+    # Clients only listen; reading is how a disconnect shows up
+    while (await websocket.receive())["type"] != "websocket.disconnect":
+        pass
+
+async def _forward(websocket: WebSocket, subscriber: Subscriber):
+    with suppress(WebSocketDisconnect):
+        while True:
+            await websocket.send_text(await subscriber.get())
+
+# A single-use ticket for browsers, which cannot send an Authorization header
+# on WebSocket/EventSource: connect with ?ticket= within expires_in seconds.
+# Keeps bearer tokens out of URLs and access logs
+@router.post(todo["urls"]["task_event_tickets"], status_code=status.HTTP_201_CREATED)
+def create_event_ticket(
+    token: Annotated[str, Depends(oauth2_scheme)],
+    db: Session = Depends(get_db_context),
+    current_user: Principal = Depends(get_current_user),
+):
+    return issue_event_ticket(db, current_user, token)
+
+# Task change events as WebSocket text frames: {"type": "tasks.created" |
+# "tasks.updated" | "tasks.deleted", "company_id", "user_id", "count", "ids"}
+# (ids is null above 50 tasks), or {"type": "resync"} after events were
+# dropped. Events carry no task data: fetch it with GET /todos/changes.
+# Closed with 1008 when the access token expires or the user loses access.
+@router.websocket(todo["urls"]["task_events"])
+async def task_events_socket(websocket: WebSocket):
+    try:
+        current_user, expires_at = await _session(websocket)
+    except HTTPException:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+
+    await websocket.accept()
+    subscriber = task_events.subscribe(current_user)
+    forward = asyncio.create_task(_forward(websocket, subscriber))
+    disconnected = asyncio.create_task(_until_disconnected(websocket))
+    revoked = asyncio.create_task(_until_revoked(current_user, expires_at))
+    try:
+        await asyncio.wait((disconnected, revoked), return_when=asyncio.FIRST_COMPLETED)
+        if revoked.done():
+            forward.cancel()
+            disconnected.cancel()
+            with suppress(Exception):
+                await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+    finally:
+        for task in (forward, disconnected, revoked):
+            task.cancel()
+        task_events.unsubscribe(subscriber)
+
+async def _event_stream(current_user: Principal, expires_at: float):
+    subscriber = task_events.subscribe(current_user)
+    try:
+        # Sent right away so the subscription is live once headers arrive
+        yield ": connected\n\n"
+        checked_at = time.monotonic()
+        while True:
+            try:
+                data = await asyncio.wait_for(subscriber.get(), _until_check(checked_at, expires_at))
+                frame = f"data: {data}\n\n"
+            except TimeoutError:
+                # Keeps proxies from closing an idle stream and detects gone clients
+                frame = ": heartbeat\n\n"
+            if _until_check(checked_at, expires_at) == 0:
+                if not await _still_allowed(current_user, expires_at):
+                    return
+                checked_at = time.monotonic()
+            yield frame
+    finally:
+        task_events.unsubscribe(subscriber)
+
+# Server-Sent Events fallback with the same events as the WebSocket; the
+# stream ends when the access token expires or the user loses access
+@router.get(todo["urls"]["task_events"], response_class=StreamingResponse)
+async def task_events_stream(request: Request):
+    current_user, expires_at = await _session(request)
+    return StreamingResponse(
+        _event_stream(current_user, expires_at),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -1,8 +1,38 @@
-from fastapi import APIRouter, Response
+from fastapi import APIRouter, Response, status
+from fastapi.responses import JSONResponse
+from app.core.database import pool_metrics, replicas
+from app.core.hashing import password_hasher
+from app.services.auth import principal_cache, token_cache
+from app.services.health import readiness
 
 router = APIRouter(prefix='/health', tags=["Health"])
 
 # Check application health
 @router.get("")
 async def health_check() -> Response:
-  return Response(status_code=200)
\ No newline at end of file
+  return Response(status_code=200)
+
+# Liveness: the process is serving requests, dependencies are not checked
+@router.get("/live")
+async def liveness() -> dict:
+  return {"status": "alive"}
+
+# Readiness: database reachable within the probe timeout (503 otherwise)
+@router.get("/ready")
+async def readiness_check() -> JSONResponse:
+  ready, report = await readiness.check()
+  return JSONResponse(
+    report,
+    status_code=status.HTTP_200_OK if ready else status.HTTP_503_SERVICE_UNAVAILABLE,
+  )
+
+# In-process runtime metrics
+@router.get("/metrics")
+async def runtime_metrics() -> dict:
+  return {
+    "password_hashing": password_hasher.snapshot(),
+    "principal_cache": principal_cache.snapshot(),
+    "jwt_cache": token_cache.snapshot(),
+    "db_pool": pool_metrics(),
+    "db_replicas": replicas.snapshot(),
+  }
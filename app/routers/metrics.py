@@ -0,0 +1,77 @@
+from fastapi import APIRouter, Response
+from app.core import database
+from app.core.hashing import password_hasher
+from app.core.prometheus import Family, latency_family, registry, render
+from app.core.rate_limit import limiter, login_guard
+from app.services.auth import jwt_decode_latency, principal_cache, token_cache
+from app.services.events import task_events
+
+router = APIRouter(tags=["Metrics"])
+
+def _pools() -> dict:
+    pools = {"primary": database.engine.pool}
+    if database.async_engine is not None:
+        pools["primary_async"] = database.async_engine.pool
+    for i, replica in enumerate(database.replicas.replicas):
+        pools[f"replica{i}"] = replica.engine.pool
+        if replica.async_engine is not None:
+            pools[f"replica{i}_async"] = replica.async_engine.pool
+    return pools
+
+def collect_app_metrics() -> list[Family]:
+    pools = _pools()
+    connections = Family("db_pool_connections", "gauge", "Pooled connections by state.")
+    size = Family("db_pool_size", "gauge", "Configured persistent connections per pool.")
+    timeouts = Family("db_pool_timeouts_total", "counter", "Checkouts that hit the pool timeout.")
+    for name, pool in pools.items():
+        connections.add(pool.checkedout(), engine=name, state="checked_out")
+        connections.add(pool.checkedin(), engine=name, state="checked_in")
+        connections.add(max(pool.overflow(), 0), engine=name, state="overflow")
+        size.add(pool.size(), engine=name)
+        timeouts.add(pool.timeouts, engine=name)
+    wait = latency_family(
+        "db_pool_checkout_seconds", "Time to check a connection out of the pool.",
+        {name: pool.wait for name, pool in pools.items()}, "engine",
+    )
+
+    hashing = password_hasher.snapshot()
+    caches = Family("cache_lookups_total", "counter", "Cache lookups by cache and result.")
+    for name, cache in (("jwt", token_cache), ("principal", principal_cache)):
+        caches.add(cache.hits, cache=name, result="hit")
+        caches.add(cache.misses, cache=name, result="miss")
+    return [
+        connections, size, timeouts, wait,
+        latency_family(
+            "password_hash_seconds", "bcrypt time per operation, excluding queueing.",
+            {"hash": password_hasher.hash_latency, "verify": password_hasher.verify_latency}, "op",
+        ),
+        latency_family(
+            "password_hash_queue_seconds", "Time bcrypt operations waited for a worker.",
+            {"all": password_hasher.queue_wait}, "op",
+        ),
+        Family("password_hash_pending", "gauge", "bcrypt operations queued or running.").add(hashing["pending"]),
+        Family("password_hash_rejected_total", "counter", "bcrypt operations rejected with 429.").add(hashing["rejected"]),
+        Family(
+            "password_rehashed_total", "counter", "Logins that replaced a hash of an outdated scheme or cost.",
+        ).add(hashing["rehashed"]),
+        latency_family(
+            "jwt_decode_seconds", "JWT signature verification time on cache misses.",
+            {"access": jwt_decode_latency}, "token",
+        ),
+        caches,
+        Family("task_event_subscribers", "gauge", "Open WebSocket/SSE task event connections.").add(task_events.count()),
+        Family("task_events_published_total", "counter", "Task events received over LISTEN.").add(task_events.published),
+        Family(
+            "task_events_coalesced_total", "counter", "Times a slow subscriber's queued events were replaced by a resync.",
+        ).add(task_events.coalesced),
+        Family("rate_limited_total", "counter", "Requests refused with 429 by rate limits.")
+        .add(limiter.rejected, limit="request")
+        .add(login_guard.locked, limit="login"),
+    ]
+
+registry.register(collect_app_metrics)
+
+# Prometheus scrape target; sums all workers when METRICS_MULTIPROC_DIR is set
+@router.get("/metrics", include_in_schema=False)
+def prometheus_metrics() -> Response:
+    return Response(render(registry.collect_all()), media_type="text/plain; version=0.0.4; charset=utf-8")
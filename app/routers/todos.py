@@ -1,44 +1,285 @@
+from typing import Annotated
 from uuid import UUID
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from anyio import from_thread
+from fastapi import APIRouter, Body, Depends, HTTPException, Request, Response, status, Query
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from sqlalchemy import Boolean, String, column, delete, insert, update, values
+from sqlalchemy.dialects.postgresql import UUID as PG_UUID
 from sqlalchemy.orm import Session
 
 from app.core.url import todo
-from app.core.database import get_db_context
+from app.core.etag import Conditional, entity_etag, list_etag, version_query
+from app.core.responses import json_list_response
+from app.core.database import get_db_context, get_primary_db_context
 from app.models.task import Task
-from app.models.user import User
-from app.schemas.task import TaskCreate, TaskUpdate, TaskOut
-from app.services.auth import get_current_user
+from app.schemas.task import (
+    TaskChanges,
+    TaskChangesParams,
+    TaskSearchParams,
+    TaskStats,
+    TaskCreate,
+    TaskUpdate,
+    TaskOut,
+    TaskListParams,
+    TaskExportParams,
+    TaskImportParams,
+    TaskImportResult,
+    TaskBulkComplete,
+    TaskBulkCreateList,
+    TaskBulkIds,
+    TaskBulkResult,
+    TaskBulkUpdateList,
+)
+from app.services.auth import Principal, get_current_user
+from app.services.task import (
+    any_id,
+    authorize_task_ids,
+    ensure_access,
+    export_tasks,
+    import_tasks,
+    search_tasks,
+    task_changes,
+    task_page,
+    task_page_query,
+    task_stats,
+)
 
 router = APIRouter(prefix=todo["prefix"], tags=todo["tags"])
 
-def _ensure_access(task: Task, current_user: User):
-    if task.company_id != current_user.company_id:
-        raise HTTPException(status_code=403, detail="Cross-company access denied")
-    if not current_user.is_admin and task.user_id != current_user.id:
-        raise HTTPException(status_code=403, detail="Not allowed")
-
-# Get task list
+# Get task list (keyset paginated on created_at, id; newest first)
 @router.get(todo["urls"]["list_tasks"], response_model=list[TaskOut])
 def list_tasks(
+    response: Response,
+    params: Annotated[TaskListParams, Query()],
+    conditional: Conditional = Depends(),
+    db: Session = Depends(get_db_context),
+    current_user: Principal = Depends(get_current_user),
+):
+    stmt, backward = task_page_query(current_user, params)
+    if conditional.if_none_match:
+        versions = db.execute(stmt.with_only_columns(Task.id, Task.created_at, Task.updated_at)).all()
+        task_page(versions, params, backward, response)
+        if not_modified := conditional.not_modified(list_etag(versions)):
+            return not_modified
+
+    rows = db.execute(stmt).all()
+    conditional.tag(list_etag(rows))
+    tasks = task_page(rows, params, backward, response)
+    return json_list_response(TaskOut, tasks, response)
+
+# Tasks created, updated or deleted since a watermark token (delta sync).
+# Only a long open transaction that has written delays new changes; readers
+# such as a streamed export do not
+@router.get(todo["urls"]["task_changes"], response_model=TaskChanges)
+def list_task_changes(
+    params: Annotated[TaskChangesParams, Query()],
+    db: Session = Depends(get_primary_db_context),
+    current_user: Principal = Depends(get_current_user),
+):
+    return task_changes(db, current_user, params)
+
+# Open/completed counts for dashboards, from per-user counters
+@router.get(todo["urls"]["task_stats"], response_model=TaskStats)
+def get_task_stats(
+    db: Session = Depends(get_db_context),
+    current_user: Principal = Depends(get_current_user),
+):
+    return task_stats(db, current_user)
+
+# Search title and content; ranked full-text with a substring fallback
+@router.get(todo["urls"]["search_tasks"], response_model=list[TaskOut])
+def search_task_list(
+    response: Response,
+    params: Annotated[TaskSearchParams, Query()],
     db: Session = Depends(get_db_context),
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
 ):
-    q = db.query(Task).filter(Task.company_id == current_user.company_id)
-    if not current_user.is_admin:
-        q = q.filter(Task.user_id == current_user.id)
-    return q.all()
+    tasks = search_tasks(db, current_user, params, response)
+    return json_list_response(TaskOut, tasks, response)
+
+EXPORT_MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+# Export every visible task (oldest first) as a streamed NDJSON or CSV file
+@router.get(todo["urls"]["export_tasks"])
+def export_task_list(
+    params: Annotated[TaskExportParams, Query()],
+    current_user: Principal = Depends(get_current_user),
+):
+    return StreamingResponse(
+        export_tasks(current_user, params),
+        media_type=EXPORT_MEDIA_TYPES[params.format],
+        headers={"Content-Disposition": f'attachment; filename="tasks.{params.format}"'},
+    )
+
+# Import NDJSON or CSV rows from the raw request body as the caller's tasks
+@router.post(todo["urls"]["import_tasks"], response_model=TaskImportResult)
+async def import_task_file(
+    request: Request,
+    params: Annotated[TaskImportParams, Query()],
+    current_user: Principal = Depends(get_current_user),
+):
+    body = request.stream()
+
+    # The import runs in a worker thread and pulls the body from the event loop
+    # chunk by chunk, so the upload is never buffered whole
+    def chunks():
+        while True:
+            try:
+                yield from_thread.run(body.__anext__)
+            except StopAsyncIteration:
+                return
+
+    return await run_in_threadpool(import_tasks, current_user, chunks(), params.format)
+
+def _bulk_results(
+    ids: list[UUID],
+    tasks: dict[UUID, Task],
+    errors: dict[UUID, HTTPException],
+    ok_status: int,
+) -> list[TaskBulkResult]:
+    results = []
+    for task_id in ids:
+        error = errors.get(task_id)
+        if error:
+            results.append(TaskBulkResult(id=task_id, status=error.status_code, detail=error.detail))
+        else:
+            task = tasks.get(task_id)
+            results.append(TaskBulkResult(
+                id=task_id,
+                status=ok_status,
+                task=TaskOut.model_validate(task) if task is not None else None,
+            ))
+    return results
+
+# Every bulk endpoint returns one result per id, so repeated ids are refused
+def _unique_ids(ids: list[UUID]) -> list[UUID]:
+    if len(set(ids)) != len(ids):
+        raise HTTPException(status_code=422, detail="Duplicate task ids")
+    return ids
+
+# Bulk create tasks: one multi-row INSERT ... RETURNING
+@router.post(todo["urls"]["bulk_create_tasks"], response_model=list[TaskBulkResult], status_code=status.HTTP_201_CREATED)
+def bulk_create_tasks(
+    payload: Annotated[TaskBulkCreateList, Body()],
+    db: Session = Depends(get_db_context),
+    current_user: Principal = Depends(get_current_user),
+):
+    rows = [
+        {**item.model_dump(), "user_id": current_user.id, "company_id": current_user.company_id}
+        for item in payload
+    ]
+    tasks = db.scalars(
+        insert(Task).returning(Task, sort_by_parameter_order=True),
+        rows,
+    )
+    results = [
+        TaskBulkResult(id=task.id, status=status.HTTP_201_CREATED, task=TaskOut.model_validate(task))
+        for task in tasks
+    ]
+    db.commit()
+    return results
+
+# Bulk update tasks: one UPDATE ... FROM (VALUES ...) RETURNING
+@router.put(todo["urls"]["bulk_update_tasks"], response_model=list[TaskBulkResult])
+def bulk_update_tasks(
+    payload: Annotated[TaskBulkUpdateList, Body()],
+    db: Session = Depends(get_db_context),
+    current_user: Principal = Depends(get_current_user),
+):
+    ids = _unique_ids([item.id for item in payload])
+
+    allowed, errors = authorize_task_ids(db, ids, current_user)
+    tasks = {}
+    if allowed:
+        permitted = set(allowed)
+        changes = values(
+            column("id", PG_UUID(as_uuid=True)),
+            column("title", String),
+            column("content", String),
+            column("is_completed", Boolean),
+            name="changes",
+        ).data([
+            (item.id, item.title, item.content, item.is_completed)
+            for item in payload if item.id in permitted
+        ])
+        stmt = (
+            update(Task)
+            .where(Task.id == changes.c.id)
+            .values(
+                title=changes.c.title,
+                content=changes.c.content,
+                is_completed=changes.c.is_completed,
+            )
+            .returning(Task)
+            .execution_options(synchronize_session=False)
+        )
+        tasks = {task.id: task for task in db.scalars(stmt)}
+    results = _bulk_results(ids, tasks, errors, status.HTTP_200_OK)
+    db.commit()
+    return results
+
+# Bulk complete (or reopen) tasks
+@router.post(todo["urls"]["bulk_complete_tasks"], response_model=list[TaskBulkResult])
+def bulk_complete_tasks(
+    payload: TaskBulkComplete,
+    db: Session = Depends(get_db_context),
+    current_user: Principal = Depends(get_current_user),
+):
+    ids = _unique_ids(payload.ids)
+    allowed, errors = authorize_task_ids(db, ids, current_user)
+    tasks = {}
+    if allowed:
+        stmt = (
+            update(Task)
+            .where(Task.id == any_id(allowed))
+            .values(is_completed=payload.is_completed)
+            .returning(Task)
+            .execution_options(synchronize_session=False)
+        )
+        tasks = {task.id: task for task in db.scalars(stmt)}
+    results = _bulk_results(ids, tasks, errors, status.HTTP_200_OK)
+    db.commit()
+    return results
+
+# Bulk delete tasks
+@router.post(todo["urls"]["bulk_delete_tasks"], response_model=list[TaskBulkResult])
+def bulk_delete_tasks(
+    payload: TaskBulkIds,
+    db: Session = Depends(get_db_context),
+    current_user: Principal = Depends(get_current_user),
+):
+    ids = _unique_ids(payload.ids)
+    allowed, errors = authorize_task_ids(db, ids, current_user)
+    if allowed:
+        db.execute(
+            delete(Task)
+            .where(Task.id == any_id(allowed))
+            .execution_options(synchronize_session=False)
+        )
+    db.commit()
+    return _bulk_results(ids, {}, errors, status.HTTP_204_NO_CONTENT)
 
 # Get task detail
 @router.get(todo["urls"]["get_task_by_id"], response_model=TaskOut)
 def get_task(
     task_id: UUID,
+    conditional: Conditional = Depends(),
     db: Session = Depends(get_db_context),
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
 ):
+    if conditional.if_none_match:
+        version = db.execute(version_query(Task, task_id, Task.company_id, Task.user_id)).first()
+        if version:
+            ensure_access(version, current_user)
+            if not_modified := conditional.not_modified(entity_etag(version)):
+                return not_modified
+
     task = db.get(Task, task_id)
     if not task:
         raise HTTPException(status_code=404, detail="Task not found")
-    _ensure_access(task, current_user)
+    ensure_access(task, current_user)
+    conditional.tag(entity_etag(task))
     return task
 
 # Create task
@@ -46,7 +287,7 @@ def get_task(
 def create_task(
     payload: TaskCreate,
     db: Session = Depends(get_db_context),
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
 ):
     task = Task(
         **payload.model_dump(),
@@ -55,7 +296,6 @@ def create_task(
     )
     db.add(task)
     db.commit()
-    db.refresh(task)
     return task
 
 # Update task
@@ -64,17 +304,16 @@ def update_task(
     task_id: UUID,
     payload: TaskUpdate,
     db: Session = Depends(get_db_context),
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
 ):
     task = db.get(Task, task_id)
     if not task:
         raise HTTPException(status_code=404, detail="Task not found")
-    _ensure_access(task, current_user)
+    ensure_access(task, current_user)
 
     for k, v in payload.model_dump(exclude_unset=True).items():
         setattr(task, k, v)
     db.commit()
-    db.refresh(task)
     return task
 
 # Delete task
@@ -82,11 +321,11 @@ def update_task(
 def delete_task(
     task_id: UUID,
     db: Session = Depends(get_db_context),
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
 ):
     task = db.get(Task, task_id)
     if not task:
         raise HTTPException(status_code=404, detail="Task not found")
-    _ensure_access(task, current_user)
+    ensure_access(task, current_user)
     db.delete(task)
     db.commit()
@@ -3,45 +3,71 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 
 from app.core.url import user
+from app.core.etag import Conditional, entity_etag, list_etag, version_query
+from app.core.responses import json_list_response
 from app.core.database import get_db_context
-from app.core.security import get_password_hash
+from app.core.hashing import password_hasher
 from app.models.user import User
 from app.schemas.user import UserCreate, UserUpdate, UserOut
-from app.services.auth import get_current_user
+from app.services.auth import Principal, get_current_user, principal_cache, revoke_user_refresh_tokens
+from app.services.user import company_users_query
 
 router = APIRouter(prefix=user["prefix"], tags=user["tags"])
 
 # Get user profile
 @router.get(user["urls"]["get_me"], response_model=UserOut)
 def get_me(
-    current_user: User = Depends(get_current_user),
+    conditional: Conditional = Depends(),
+    db: Session = Depends(get_db_context),
+    current_user: Principal = Depends(get_current_user),
 ):
-    return current_user
+    if conditional.if_none_match:
+        version = db.execute(version_query(User, current_user.id)).first()
+        if version and (not_modified := conditional.not_modified(entity_etag(version))):
+            return not_modified
+
+    user = db.get(User, current_user.id)
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
+    conditional.tag(entity_etag(user))
+    return user
 
 # Get user list
 @router.get(user["urls"]["list_users"], response_model=list[UserOut])
 def list_users_in_company(
+    conditional: Conditional = Depends(),
     db: Session = Depends(get_db_context),
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
 ):
     if not current_user.is_admin:
         raise HTTPException(status_code=403, detail="Admin only")
-    return (
-        db.query(User)
-        .filter(User.company_id == current_user.company_id)
-        .all()
-    )
+    if conditional.if_none_match:
+        versions = db.execute(company_users_query(current_user, User.id, User.updated_at)).all()
+        if not_modified := conditional.not_modified(list_etag(versions)):
+            return not_modified
+
+    rows = db.execute(company_users_query(current_user)).all()
+    conditional.tag(list_etag(rows))
+    return json_list_response(UserOut, rows, conditional.response)
 
 # Get user profile by id
 @router.get(user["urls"]["get_user_by_id"], response_model=UserOut)
 def get_user(
     user_id: UUID,
+    conditional: Conditional = Depends(),
     db: Session = Depends(get_db_context),
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
 ):
+    if conditional.if_none_match:
+        version = db.execute(version_query(User, user_id, User.company_id)).first()
+        if version and version.company_id == current_user.company_id:
+            if not_modified := conditional.not_modified(entity_etag(version)):
+                return not_modified
+
     user = db.get(User, user_id)
     if not user or user.company_id != current_user.company_id:
         raise HTTPException(status_code=404, detail="User not found")
+    conditional.tag(entity_etag(user))
     return user
 
 # Create user (admin only)
@@ -49,12 +75,12 @@ def get_user(
 def create_user_in_company(
     payload: UserCreate,
     db: Session = Depends(get_db_context),
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
 ):
     if not current_user.is_admin:
         raise HTTPException(status_code=403, detail="Admin only")
 
-    hashed = get_password_hash(payload.password)
+    hashed = password_hasher.hash(payload.password)
     user = User(
         email=payload.email,
         username=payload.username,
@@ -67,7 +93,6 @@ def create_user_in_company(
     )
     db.add(user)
     db.commit()
-    db.refresh(user)
     return user
 
 # Update user profile by id
@@ -76,7 +101,7 @@ def update_user(
     user_id: UUID,
     payload: UserUpdate,
     db: Session = Depends(get_db_context),
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
 ):
     user = db.get(User, user_id)
     if not user or user.company_id != current_user.company_id:
@@ -95,13 +120,17 @@ def update_user(
 
     # Change pasword
     if "password" in data and data["password"]:
-        user.hashed_password = get_password_hash(data.pop("password"))
+        user.hashed_password = password_hasher.hash(data.pop("password"))
 
     for k, v in data.items():
         setattr(user, k, v)
 
+    # A new password or deactivation ends every login session
+    if payload.password or data.get("is_active") is False:
+        db.execute(revoke_user_refresh_tokens(user.id))
     db.commit()
-    db.refresh(user)
+    # Deactivation and role changes must apply to the next request
+    principal_cache.invalidate(user.id)
     return user
 
 # Delete user (admin only)
@@ -109,7 +138,7 @@ def update_user(
 def delete_user(
     user_id: UUID,
     db: Session = Depends(get_db_context),
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
 ):
     if not current_user.is_admin:
         raise HTTPException(status_code=403, detail="Admin only")
@@ -120,3 +149,4 @@ def delete_user(
 
     db.delete(user)
     db.commit()
+    principal_cache.invalidate(user_id)
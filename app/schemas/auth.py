@@ -0,0 +1,4 @@
+from pydantic import BaseModel, Field
+
+class RefreshTokenIn(BaseModel):
+    refresh_token: str = Field(min_length=1, max_length=256)
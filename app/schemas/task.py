@@ -1,14 +1,16 @@
+from typing import Annotated, Literal
 from uuid import UUID
 from datetime import datetime
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, field_validator
+
+from app.core.config import TASKS_PAGE_SIZE, TASKS_PAGE_MAX_SIZE, TASKS_BULK_MAX_ITEMS
 
 class Task(BaseModel):
   title: str = Field(min_length=1)
   content: str = Field(min_length=1)
   is_completed: bool = Field(default=False)
-  created_at: datetime | None = None
-  updated_at: datetime | None = None
 
+# Timestamps are set by the server: GET /todos/changes relies on updated_at
 class TaskCreate(Task):
   pass
 
@@ -18,9 +20,102 @@ class TaskUpdate(BaseModel):
   is_completed: bool
 
 class TaskOut(Task):
+    created_at: datetime | None = None
+    updated_at: datetime | None = None
     id: UUID
     user_id: UUID
     company_id: UUID
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+class TaskFilterParams(BaseModel):
+    is_completed: bool | None = None
+    user_id: UUID | None = None
+    created_after: datetime | None = None
+    created_before: datetime | None = None
+    updated_after: datetime | None = None
+    updated_before: datetime | None = None
+
+class TaskListParams(TaskFilterParams):
+    limit: int = Field(default=TASKS_PAGE_SIZE, ge=1, le=TASKS_PAGE_MAX_SIZE)
+    cursor: str | None = None
+
+class TaskSearchParams(TaskFilterParams):
+    q: str = Field(min_length=1, max_length=200)
+    # "words": full-text on stems, ranked; "substring": plain text match;
+    # "auto": words, falling back to substring when nothing matches
+    mode: Literal["auto", "words", "substring"] = "auto"
+    limit: int = Field(default=TASKS_PAGE_SIZE, ge=1, le=TASKS_PAGE_MAX_SIZE)
+    cursor: str | None = None
+
+class TaskExportParams(TaskFilterParams):
+    format: Literal["ndjson", "csv"] = "ndjson"
+
+class TaskChangesParams(BaseModel):
+    since: str | None = None
+    limit: int = Field(default=TASKS_PAGE_SIZE, ge=1, le=TASKS_PAGE_MAX_SIZE)
+
+class TaskChanges(BaseModel):
+    changed: list[TaskOut]
+    deleted: list[UUID]
+    # Pass back as `since`; with has_more, call again right away
+    next: str
+    has_more: bool
+
+class TaskCounts(BaseModel):
+    total: int
+    open: int
+    completed: int
+
+class UserTaskCounts(TaskCounts):
+    user_id: UUID
+
+class TaskStats(TaskCounts):
+    users: list[UserTaskCounts]
+
+# Imports may keep a task's original creation date; updated_at is always the
+# import time so GET /todos/changes reports the imported tasks
+class TaskImportRow(TaskCreate):
+    created_at: datetime | None = None
+
+    # Postgres text cannot hold NUL; caught here the row is reported, not the
+    # whole COPY failed
+    @field_validator("title", "content")
+    @classmethod
+    def _no_nul(cls, value: str) -> str:
+        if "\x00" in value:
+            raise ValueError("must not contain NUL characters")
+        return value
+
+class TaskImportParams(BaseModel):
+    format: Literal["ndjson", "csv"] = "ndjson"
+
+class TaskImportError(BaseModel):
+    line: int
+    detail: str
+
+class TaskImportResult(BaseModel):
+    rows: int
+    imported: int
+    failed: int
+    errors: list[TaskImportError]
+    seconds: float
+
+class TaskBulkUpdate(TaskUpdate):
+    id: UUID
+
+class TaskBulkIds(BaseModel):
+    ids: list[UUID] = Field(min_length=1, max_length=TASKS_BULK_MAX_ITEMS)
+
+class TaskBulkComplete(TaskBulkIds):
+    is_completed: bool = True
+
+class TaskBulkResult(BaseModel):
+    id: UUID
+    status: int
+    detail: str | None = None
+    task: TaskOut | None = None
+
+TaskBulkCreateList = Annotated[list[TaskCreate], Field(min_length=1, max_length=TASKS_BULK_MAX_ITEMS)]
+TaskBulkUpdateList = Annotated[list[TaskBulkUpdate], Field(min_length=1, max_length=TASKS_BULK_MAX_ITEMS)]
@@ -1,17 +1,66 @@
+import hashlib
+import secrets
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
 from typing import Annotated
-from uuid import UUID
+from uuid import UUID, uuid4
 
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, WebSocketException, status
 from fastapi.security import OAuth2PasswordBearer
-from jose import JWTError, jwt
+from starlette.requests import HTTPConnection
+from sqlalchemy import Insert, Update, delete, func, insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from app.core.database import get_db_context
-from app.core.security import JWT_SECRET_KEY, JWT_ALGORITHM
-from app.models.user import User
+from app.core.cache import TTLCache
+from app.core.metrics import LatencyStats
+from app.core.rate_limit import limiter, too_many_requests
+from app.core.config import (
+    PRINCIPAL_CACHE_TTL_SECONDS,
+    PRINCIPAL_CACHE_MAX_SIZE,
+    JWT_CACHE_TTL_SECONDS,
+    JWT_CACHE_MAX_SIZE,
+    REFRESH_TOKEN_EXPIRE_DAYS,
+    EVENTS_TICKET_SECONDS,
+)
+from app.core.database import LocalSession, get_db_context, get_async_db_context
+from app.core.security import (
+    ACCESS_TOKEN_EXPIRE_MINUTES,
+    InvalidTokenError,
+    create_access_token,
+    decode_access_token,
+)
+from app.models.user import EventTicket, RefreshToken, User
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
 
+@dataclass(frozen=True)
+class Principal:
+    """The authenticated caller: just what auth checks and handlers need."""
+    id: UUID
+    company_id: UUID
+    is_active: bool
+    is_admin: bool
+
+    @classmethod
+    def from_user(cls, user: User) -> "Principal":
+        return cls(
+            id=user.id,
+            company_id=user.company_id,
+            is_active=bool(user.is_active),
+            is_admin=bool(user.is_admin),
+        )
+
+# Per-process; users.py invalidates on update/delete, the TTL bounds staleness
+# in the other workers
+principal_cache = TTLCache(maxsize=PRINCIPAL_CACHE_MAX_SIZE, ttl=PRINCIPAL_CACHE_TTL_SECONDS)
+
+# Verified claims keyed by token digest; clients resend the same bearer token
+# for its whole lifetime, so the signature only needs checking once
+token_cache = TTLCache(maxsize=JWT_CACHE_MAX_SIZE, ttl=JWT_CACHE_TTL_SECONDS)
+jwt_decode_latency = LatencyStats()
+
 CredentialsEx = HTTPException(
     status_code=status.HTTP_401_UNAUTHORIZED,
     detail="Could not validate credentials",
@@ -19,42 +68,285 @@ CredentialsEx = HTTPException(
 )
 
 def _decode_token(token: str) -> dict:
-    try:
-        payload = jwt.decode(token, JWT_SECRET_KEY, algorithms=[JWT_ALGORITHM])
+    key = hashlib.sha256(token.encode()).digest()
+    payload = token_cache.get(key)
+    if payload is not None:
         return payload
-    except JWTError:
+
+    started = time.perf_counter()
+    try:
+        payload = decode_access_token(token)
+    except InvalidTokenError:
         raise CredentialsEx
+    finally:
+        jwt_decode_latency.record(time.perf_counter() - started)
+
+    # Tokens without a numeric exp are never cached
+    exp = payload.get("exp")
+    if isinstance(exp, (int, float)):
+        token_cache.set(key, payload, ttl=exp - time.time())
+    return payload
+
+def issue_token(user: User | Principal, refresh_token: str | None = None) -> dict:
+    access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
+    token = create_access_token(
+        subject=str(user.id),
+        expires_delta=access_token_expires,
+        extra_claims={
+            "company_id": str(user.company_id),
+            "is_admin": user.is_admin,
+        },
+    )
+    tokens = {"access_token": token, "token_type": "bearer", "expires_in": int(access_token_expires.total_seconds())}
+    if refresh_token:
+        tokens["refresh_token"] = refresh_token
+    return tokens
 
 def _get_user_by_id(db: Session, user_id: UUID) -> User | None:
     return db.get(User, user_id)
 
-def ensure_same_company(user: User, token_company_id: str | None):
+def ensure_same_company(user: Principal, token_company_id: str | None):
     if token_company_id and str(user.company_id) != str(token_company_id):
         raise CredentialsEx
 
-def ensure_active(user: User):
+def ensure_active(user: Principal):
     if not user.is_active:
         raise HTTPException(status_code=403, detail="Inactive user")
 
-def get_current_user(
-    token: Annotated[str, Depends(oauth2_scheme)],
-    db: Session = Depends(get_db_context),
-) -> User:
-    payload = _decode_token(token)
+def _subject_user_id(payload: dict) -> UUID:
     sub = payload.get("sub")
     if not sub:
         raise CredentialsEx
 
     try:
-        user_id = UUID(str(sub))
+        return UUID(str(sub))
     except Exception:
         raise CredentialsEx
 
-    user = _get_user_by_id(db, user_id)
-    if not user:
+def _authorize(principal: Principal, payload: dict) -> Principal:
+    ensure_active(principal)
+    ensure_same_company(principal, payload.get("company_id"))
+    return principal
+
+def get_current_user(
+    token: Annotated[str, Depends(oauth2_scheme)],
+    db: Session = Depends(get_db_context),
+) -> Principal:
+    payload = _decode_token(token)
+    user_id = _subject_user_id(payload)
+
+    principal = principal_cache.get(user_id)
+    if principal is None:
+        user = _get_user_by_id(db, user_id)
+        if not user:
+            raise CredentialsEx
+        principal = Principal.from_user(user)
+        principal_cache.set(user_id, principal)
+
+    return _authorize(principal, payload)
+
+def bearer_token(connection: HTTPConnection) -> str | None:
+    scheme, _, token = connection.headers.get("authorization", "").partition(" ")
+    if scheme.lower() == "bearer" and token:
+        return token
+    return None
+
+def principal_for_user(user_id: UUID) -> Principal:
+    """The user's current principal, cached like get_current_user's; raises if inactive."""
+    principal = principal_cache.get(user_id)
+    if principal is None:
+        with LocalSession() as db:
+            user = _get_user_by_id(db, user_id)
+        if not user:
+            raise CredentialsEx
+        principal = Principal.from_user(user)
+        principal_cache.set(user_id, principal)
+    ensure_active(principal)
+    return principal
+
+def session_for_token(token: str | None) -> tuple[Principal, float]:
+    """get_current_user outside a request (event streams), plus the token's exp."""
+    if not token:
+        raise CredentialsEx
+    with LocalSession() as db:
+        principal = get_current_user(token, db)
+    return principal, float(_decode_token(token).get("exp", 0))
+
+async def get_current_user_async(
+    token: Annotated[str, Depends(oauth2_scheme)],
+    db: AsyncSession = Depends(get_async_db_context),
+) -> Principal:
+    payload = _decode_token(token)
+    user_id = _subject_user_id(payload)
+
+    principal = principal_cache.get(user_id)
+    if principal is None:
+        user = await db.get(User, user_id)
+        if not user:
+            raise CredentialsEx
+        principal = Principal.from_user(user)
+        principal_cache.set(user_id, principal)
+
+    return _authorize(principal, payload)
+
+RefreshEx = HTTPException(
+    status_code=status.HTTP_401_UNAUTHORIZED,
+    detail="Invalid refresh token",
+    headers={"WWW-Authenticate": "Bearer"},
+)
+
+# Refresh tokens and event tickets are 256 random bits, so an unsalted
+# SHA-256 digest is as safe to store as a bcrypt hash and can be looked up by
+# primary key
+def _secret_digest(token: str) -> bytes:
+    return hashlib.sha256(token.encode()).digest()
+
+def _new_refresh_token(user_id: UUID, family_id: UUID | None = None) -> tuple[str, Insert]:
+    token = secrets.token_urlsafe(32)
+    return token, insert(RefreshToken).values(
+        token_hash=_secret_digest(token),
+        user_id=user_id,
+        family_id=family_id or uuid4(),
+        expires_at=datetime.now(timezone.utc) + timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS),
+    )
+
+def _revoke(*criteria) -> Update:
+    return (
+        update(RefreshToken)
+        .where(*criteria, RefreshToken.revoked_at.is_(None))
+        .values(revoked_at=func.now())
+        .execution_options(synchronize_session=False)
+    )
+
+def _claim_refresh_token(token: str) -> Update:
+    # Concurrent refreshes with one token serialize on its row; only the
+    # first gets the owner back
+    return _revoke(
+        RefreshToken.token_hash == _secret_digest(token), RefreshToken.expires_at > func.now()
+    ).returning(RefreshToken.user_id, RefreshToken.family_id)
+
+def revoke_refresh_family(token: str) -> Update:
+    """Statement revoking the login session `token` belongs to."""
+    family_id = select(RefreshToken.family_id).where(RefreshToken.token_hash == _secret_digest(token))
+    return _revoke(RefreshToken.family_id == family_id.scalar_subquery())
+
+def revoke_user_refresh_tokens(user_id: UUID) -> Update:
+    """Statement revoking every login session of a user."""
+    return _revoke(RefreshToken.user_id == user_id)
+
+def start_session(db: Session, user: User) -> dict:
+    """Tokens for a verified login: an access token and a new refresh token family."""
+    refresh_token, stmt = _new_refresh_token(user.id)
+    db.execute(stmt)
+    db.commit()
+    return issue_token(user, refresh_token)
+
+def refresh_session(db: Session, token: str) -> dict:
+    """Rotate a refresh token for new tokens; no password hash is involved.
+
+    A revoked token coming back means it was copied (the owner already
+    rotated it, or the other way round), so its whole family is revoked and
+    both sides must log in again.
+    """
+    claimed = db.execute(_claim_refresh_token(token)).first()
+    if claimed is None:
+        db.execute(revoke_refresh_family(token))
+        db.commit()
+        raise RefreshEx
+
+    principal = principal_cache.get(claimed.user_id)
+    if principal is None:
+        principal = Principal.from_user(_get_user_by_id(db, claimed.user_id))
+        principal_cache.set(claimed.user_id, principal)
+    refresh_token = None
+    if principal.is_active:
+        refresh_token, stmt = _new_refresh_token(principal.id, claimed.family_id)
+        db.execute(stmt)
+    db.commit()
+    ensure_active(principal)
+    return issue_token(principal, refresh_token)
+
+async def start_session_async(db: AsyncSession, user: User) -> dict:
+    refresh_token, stmt = _new_refresh_token(user.id)
+    await db.execute(stmt)
+    await db.commit()
+    return issue_token(user, refresh_token)
+
+async def refresh_session_async(db: AsyncSession, token: str) -> dict:
+    claimed = (await db.execute(_claim_refresh_token(token))).first()
+    if claimed is None:
+        await db.execute(revoke_refresh_family(token))
+        await db.commit()
+        raise RefreshEx
+
+    principal = principal_cache.get(claimed.user_id)
+    if principal is None:
+        principal = Principal.from_user(await db.get(User, claimed.user_id))
+        principal_cache.set(claimed.user_id, principal)
+    refresh_token = None
+    if principal.is_active:
+        refresh_token, stmt = _new_refresh_token(principal.id, claimed.family_id)
+        await db.execute(stmt)
+    await db.commit()
+    ensure_active(principal)
+    return issue_token(principal, refresh_token)
+
+def prune_refresh_tokens(db: Session) -> int:
+    """Drop expired refresh tokens; revoked ones are kept until then to catch reuse."""
+    result = db.execute(delete(RefreshToken).where(RefreshToken.expires_at < func.now()))
+    db.commit()
+    return result.rowcount
+
+def issue_event_ticket(db: Session, current_user: Principal, token: str) -> dict:
+    """A single-use ticket for /todos/events?ticket=, valid EVENTS_TICKET_SECONDS."""
+    ticket = secrets.token_urlsafe(32)
+    now = datetime.now(timezone.utc)
+    db.execute(delete(EventTicket).where(EventTicket.expires_at < func.now()))
+    db.execute(insert(EventTicket).values(
+        ticket_hash=_secret_digest(ticket),
+        user_id=current_user.id,
+        expires_at=now + timedelta(seconds=EVENTS_TICKET_SECONDS),
+        session_expires_at=datetime.fromtimestamp(float(_decode_token(token).get("exp", 0)), timezone.utc),
+    ))
+    db.commit()
+    return {"ticket": ticket, "expires_in": EVENTS_TICKET_SECONDS}
+
+def redeem_event_ticket(ticket: str) -> tuple[Principal, float]:
+    """Use up a ticket; returns its user and when their access token expires."""
+    with LocalSession() as db:
+        redeemed = db.execute(
+            delete(EventTicket)
+            .where(EventTicket.ticket_hash == _secret_digest(ticket), EventTicket.expires_at > func.now())
+            .returning(EventTicket.user_id, EventTicket.session_expires_at)
+        ).first()
+        db.commit()
+    if redeemed is None:
         raise CredentialsEx
+    return principal_for_user(redeemed.user_id), redeemed.session_expires_at.timestamp()
+
+def _rate_limit_identity(connection: HTTPConnection) -> str:
+    # The user get_current_user would resolve, from the (cached) verified
+    # token alone; anonymous and invalid tokens count against the client IP
+    token = bearer_token(connection)
+    if token:
+        try:
+            return f"user:{_subject_user_id(_decode_token(token))}"
+        except HTTPException:
+            pass
+    return f"ip:{connection.client.host if connection.client else 'unknown'}"
 
-    ensure_active(user)
-    ensure_same_company(user, payload.get("company_id"))
+async def rate_limit(connection: HTTPConnection):
+    """App-wide dependency: spend a token from the caller's bucket for this route.
 
-    return user
+    Runs before the route's other dependencies, so a throttled caller costs
+    no database work.
+    """
+    method = connection.scope.get("method", "WS")
+    bucket, budget = limiter.budget(f"{method} {getattr(connection.scope.get('route'), 'path', '')}")
+    if budget is None:
+        return
+    retry_after = await limiter.take(f"{bucket}|{_rate_limit_identity(connection)}", budget)
+    if retry_after:
+        if connection.scope["type"] == "websocket":
+            raise WebSocketException(code=status.WS_1013_TRY_AGAIN_LATER)
+        raise too_many_requests(retry_after)
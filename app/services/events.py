@@ -0,0 +1,194 @@
+import asyncio
+import json
+import logging
+from collections import defaultdict
+from dataclasses import dataclass
+
+from app.core.config import EVENTS_QUEUE_SIZE
+from app.core.database import engine
+
+logger = logging.getLogger("app.events")
+
+# Sent by the tasks_notify trigger when a write commits
+CHANNEL = "task_events"
+RECONNECT_SECONDS = (0.5, 1, 2, 5)
+
+@dataclass(frozen=True, slots=True)
+class TaskEvent:
+    company_id: str
+    user_id: str
+    data: str  # the JSON text sent to clients as-is
+
+# A subscriber missed events: refetch through GET /todos/changes
+RESYNC = TaskEvent("", "", '{"type": "resync"}')
+
+class Subscriber:
+    """One WebSocket/SSE connection; `user_id` None sees the whole company."""
+
+    __slots__ = ("company_id", "user_id", "queue")
+
+    def __init__(self, company_id: str, user_id: str | None, queue_size: int):
+        self.company_id = company_id
+        self.user_id = user_id
+        self.queue: asyncio.Queue[TaskEvent] = asyncio.Queue(maxsize=queue_size)
+
+    def push(self, event: TaskEvent) -> bool:
+        """Queue `event`; False when the queue was full and got coalesced."""
+        try:
+            self.queue.put_nowait(event)
+            return True
+        except asyncio.QueueFull:
+            # A slow consumer never holds more than `queue_size` events: the
+            # backlog collapses into one resync
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(RESYNC)
+            return False
+
+    async def get(self) -> str:
+        return (await self.queue.get()).data
+
+class TaskEventHub:
+    """Fans task events out to this worker's subscribers by company.
+
+    Publishing is a dict lookup plus one put_nowait per matching subscriber;
+    idle connections cost a queue and no task wakeups. Events of every worker
+    arrive over one LISTEN connection (see NotificationListener).
+    """
+
+    def __init__(self, queue_size: int):
+        self.queue_size = queue_size
+        self.subscribers: defaultdict[str, set[Subscriber]] = defaultdict(set)
+        self.published = 0
+        self.coalesced = 0
+
+    def subscribe(self, principal) -> Subscriber:
+        subscriber = Subscriber(
+            str(principal.company_id),
+            None if principal.is_admin else str(principal.id),
+            self.queue_size,
+        )
+        self.subscribers[subscriber.company_id].add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber: Subscriber):
+        company = self.subscribers.get(subscriber.company_id)
+        if company is None:
+            return
+        company.discard(subscriber)
+        if not company:
+            del self.subscribers[subscriber.company_id]
+
+    def count(self) -> int:
+        return sum(len(company) for company in self.subscribers.values())
+
+    def publish(self, event: TaskEvent):
+        self.published += 1
+        for subscriber in self.subscribers.get(event.company_id, ()):
+            if subscriber.user_id is None or subscriber.user_id == event.user_id:
+                if not subscriber.push(event):
+                    self.coalesced += 1
+
+    def publish_payload(self, payload: str):
+        try:
+            fields = json.loads(payload)
+            event = TaskEvent(fields["company_id"], fields["user_id"], payload)
+        except (ValueError, KeyError, TypeError):
+            logger.warning("ignoring malformed %s payload: %.200s", CHANNEL, payload)
+            return
+        self.publish(event)
+
+    def resync_all(self):
+        for company in self.subscribers.values():
+            for subscriber in company:
+                subscriber.push(RESYNC)
+
+class NotificationListener:
+    """LISTEN on a dedicated primary connection, read from the event loop.
+
+    The psycopg2 connection is detached from the pool and its socket is
+    watched with loop.add_reader, so there is no thread and no polling. When
+    the connection drops it reconnects with backoff and tells subscribers to
+    resync, since notifications sent meanwhile are lost. Needs a direct (or
+    session-pooled) connection: PgBouncer in transaction mode cannot LISTEN.
+    """
+
+    def __init__(self, channel: str, hub: TaskEventHub):
+        self.channel = channel
+        self.hub = hub
+        self.loop: asyncio.AbstractEventLoop | None = None
+        self.conn = None
+        self.connecting: asyncio.Task | None = None
+
+    def _open(self):
+        fairy = engine.raw_connection()
+        conn = fairy.driver_connection
+        fairy.detach()
+        try:
+            conn.autocommit = True
+            with conn.cursor() as cursor:
+                cursor.execute(f"LISTEN {self.channel}")
+        except Exception:
+            conn.close()
+            raise
+        return conn
+
+    def _attach(self, conn):
+        self.conn = conn
+        self.loop.add_reader(conn.fileno(), self._read)
+
+    async def _reconnect(self):
+        attempt = 0
+        while True:
+            delay = RECONNECT_SECONDS[min(attempt, len(RECONNECT_SECONDS) - 1)]
+            await asyncio.sleep(delay)
+            try:
+                conn = await asyncio.to_thread(self._open)
+            except Exception as exc:
+                logger.warning("LISTEN %s failed (%s), retrying", self.channel, exc)
+                attempt += 1
+                continue
+            self._attach(conn)
+            self.connecting = None
+            self.hub.resync_all()
+            return
+
+    def _read(self):
+        try:
+            self.conn.poll()
+        except Exception as exc:
+            logger.warning("LISTEN %s connection lost: %s", self.channel, exc)
+            self._close()
+            self.connecting = self.loop.create_task(self._reconnect())
+            return
+        notifies = self.conn.notifies
+        while notifies:
+            self.hub.publish_payload(notifies.pop(0).payload)
+
+    def _close(self):
+        if self.conn is None:
+            return
+        try:
+            self.loop.remove_reader(self.conn.fileno())
+        except Exception:
+            pass  # the socket is already gone
+        self.conn.close()
+        self.conn = None
+
+    async def start(self):
+        self.loop = asyncio.get_running_loop()
+        try:
+            self._attach(await asyncio.to_thread(self._open))
+        except Exception as exc:
+            # Serve requests anyway; events start flowing once Postgres is back
+            logger.warning("LISTEN %s failed (%s), retrying", self.channel, exc)
+            self.connecting = self.loop.create_task(self._reconnect())
+
+    async def stop(self):
+        if self.connecting is not None:
+            self.connecting.cancel()
+            self.connecting = None
+        self._close()
+
+task_events = TaskEventHub(EVENTS_QUEUE_SIZE)
+listener = NotificationListener(CHANNEL, task_events)
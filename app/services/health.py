@@ -0,0 +1,126 @@
+import asyncio
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime, timezone
+
+from sqlalchemy import text
+
+from app.core.config import HEALTH_PROBE_TIMEOUT_SECONDS, HEALTH_PROBE_CACHE_SECONDS
+from app.core.database import async_engine, engine
+
+class ProbeStats:
+    def __init__(self, keep: int = 10):
+        self.ok = False
+        self.latency_ms: float | None = None
+        self.error: str | None = None
+        self.recent_ms: deque[float] = deque(maxlen=keep)
+
+    def record(self, ok: bool, seconds: float, error: str | None = None):
+        self.ok = ok
+        self.latency_ms = round(seconds * 1000, 3)
+        self.error = error
+        self.recent_ms.append(self.latency_ms)
+
+    def snapshot(self) -> dict:
+        return {
+            "ok": self.ok,
+            "latency_ms": self.latency_ms,
+            "error": self.error,
+            "recent_ms": list(self.recent_ms),
+        }
+
+def _ping_sync(timeout: float):
+    with engine.connect() as conn:
+        conn.exec_driver_sql(f"SET LOCAL statement_timeout = {int(timeout * 1000)}")
+        conn.execute(text("SELECT 1"))
+
+async def _ping_async():
+    async with async_engine.connect() as conn:
+        await conn.execute(text("SELECT 1"))
+
+def _pool_saturation(pool) -> dict:
+    capacity = pool.size() + max(pool._max_overflow, 0)
+    checked_out = pool.checkedout()
+    return {
+        "checked_out": checked_out,
+        "capacity": capacity,
+        "saturation": round(checked_out / capacity, 3) if capacity else 0.0,
+    }
+
+class ReadinessProbe:
+    """Bounded-time database pings whose result is reused for `cache_seconds`.
+
+    The sync ping runs on a single dedicated thread: when the pool is wedged
+    the next probe waits on the same stuck ping instead of piling up threads.
+    """
+
+    def __init__(self, timeout: float, cache_seconds: float):
+        self.timeout = timeout
+        self.cache_seconds = cache_seconds
+        self.database = ProbeStats()
+        self.database_async = ProbeStats()
+        self._executor: ThreadPoolExecutor | None = None
+        self._sync_ping: Future | None = None
+        self._lock: asyncio.Lock | None = None
+        self._checked_at = 0.0
+        self._checked_at_wall: datetime | None = None
+
+    async def _timed(self, stats: ProbeStats, ping):
+        started = time.monotonic()
+        try:
+            await asyncio.wait_for(ping, self.timeout)
+        except asyncio.TimeoutError:
+            stats.record(False, time.monotonic() - started, f"timed out after {self.timeout}s")
+        except Exception as e:
+            stats.record(False, time.monotonic() - started, type(e).__name__)
+        else:
+            stats.record(True, time.monotonic() - started)
+
+    async def _probe(self):
+        if self._sync_ping is None or self._sync_ping.done():
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="readiness-probe")
+            self._sync_ping = self._executor.submit(_ping_sync, self.timeout)
+        # shield: a timeout must not cancel the ping that later probes reuse
+        checks = [self._timed(self.database, asyncio.shield(asyncio.wrap_future(self._sync_ping)))]
+        if async_engine is not None:
+            checks.append(self._timed(self.database_async, _ping_async()))
+        await asyncio.gather(*checks)
+        self._checked_at = time.monotonic()
+        self._checked_at_wall = datetime.now(timezone.utc)
+
+    @property
+    def ready(self) -> bool:
+        return self.database.ok and (async_engine is None or self.database_async.ok)
+
+    async def check(self) -> tuple[bool, dict]:
+        cached = time.monotonic() - self._checked_at < self.cache_seconds
+        if not cached:
+            self._lock = self._lock or asyncio.Lock()
+            async with self._lock:
+                # Another request may have probed while we waited
+                cached = time.monotonic() - self._checked_at < self.cache_seconds
+                if not cached:
+                    await self._probe()
+
+        checks = {"database": self.database.snapshot()}
+        pool = {"sync": _pool_saturation(engine.pool)}
+        if async_engine is not None:
+            checks["database_async"] = self.database_async.snapshot()
+            pool["async"] = _pool_saturation(async_engine.pool)
+        return self.ready, {
+            "status": "ready" if self.ready else "unavailable",
+            "checked_at": self._checked_at_wall.isoformat() if self._checked_at_wall else None,
+            "cached": cached,
+            "checks": checks,
+            "pool": pool,
+        }
+
+    def shutdown(self):
+        executor, self._executor = self._executor, None
+        self._sync_ping = None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+readiness = ReadinessProbe(HEALTH_PROBE_TIMEOUT_SECONDS, HEALTH_PROBE_CACHE_SECONDS)
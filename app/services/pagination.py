@@ -0,0 +1,24 @@
+import base64
+import binascii
+import json
+
+from fastapi import HTTPException, status
+
+InvalidCursorEx = HTTPException(
+    status_code=status.HTTP_400_BAD_REQUEST,
+    detail="Invalid cursor",
+)
+
+def encode_cursor(payload: dict) -> str:
+    raw = json.dumps(payload, separators=(",", ":"), default=str).encode()
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+def decode_cursor(cursor: str) -> dict:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (binascii.Error, ValueError, UnicodeDecodeError):
+        raise InvalidCursorEx
+    if not isinstance(payload, dict):
+        raise InvalidCursorEx
+    return payload
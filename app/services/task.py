@@ -0,0 +1,539 @@
+import csv
+import io
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Iterable, Iterator
+from uuid import UUID
+
+from fastapi import HTTPException, Response
+from pydantic import ValidationError
+from sqlalchemy import (
+    Select, any_, bindparam, cast, delete, false, func, literal_column, null, select, text, true, tuple_, union_all,
+)
+from sqlalchemy.dialects.postgresql import ARRAY, DOUBLE_PRECISION, UUID as PG_UUID
+from sqlalchemy.orm import Session
+
+from app.core.config import (
+    TASKS_EXPORT_CHUNK_SIZE,
+    TASKS_TOMBSTONE_RETENTION_DAYS,
+    TASKS_IMPORT_BATCH_SIZE,
+    TASKS_IMPORT_MAX_ERRORS,
+)
+from app.core.database import LocalSession
+from app.models.task import Task, TaskCounter, TaskTombstone
+from app.schemas.task import (
+    TaskChanges,
+    TaskChangesParams,
+    TaskExportParams,
+    TaskFilterParams,
+    TaskImportError,
+    TaskImportResult,
+    TaskImportRow,
+    TaskListParams,
+    TaskOut,
+    TaskSearchParams,
+    TaskStats,
+    UserTaskCounts,
+)
+from app.services.auth import Principal
+from app.services.pagination import InvalidCursorEx, decode_cursor, encode_cursor
+
+TaskNotFoundEx = HTTPException(status_code=404, detail="Task not found")
+
+def access_error(task, current_user: Principal) -> HTTPException | None:
+    if task.company_id != current_user.company_id:
+        return HTTPException(status_code=403, detail="Cross-company access denied")
+    if not current_user.is_admin and task.user_id != current_user.id:
+        return HTTPException(status_code=403, detail="Not allowed")
+    return None
+
+def ensure_access(task: Task, current_user: Principal):
+    error = access_error(task, current_user)
+    if error:
+        raise error
+
+def any_id(ids):
+    """`= ANY(:ids::uuid[])`, one bound array instead of an IN list per id."""
+    return any_(bindparam(None, list(ids), type_=ARRAY(PG_UUID(as_uuid=True))))
+
+def authorize_task_ids(
+    db: Session, ids: list[UUID], current_user: Principal
+) -> tuple[list[UUID], dict[UUID, HTTPException]]:
+    """Apply the ensure_access rules to a set of ids with a single query.
+
+    Returns the ids the caller may modify and the error for every other id.
+    """
+    rows = db.execute(
+        select(Task.id, Task.company_id, Task.user_id).where(Task.id == any_id(ids))
+    ).all()
+    found = {row.id: row for row in rows}
+
+    allowed, errors = [], {}
+    for task_id in ids:
+        row = found.get(task_id)
+        error = TaskNotFoundEx if row is None else access_error(row, current_user)
+        if error:
+            errors[task_id] = error
+        else:
+            allowed.append(task_id)
+    return allowed, errors
+
+def _task_cursor(task: Task, direction: str) -> str:
+    return encode_cursor({"c": task.created_at.isoformat(), "i": str(task.id), "d": direction})
+
+def _parse_task_cursor(cursor: str) -> tuple[datetime, UUID, bool]:
+    payload = decode_cursor(cursor)
+    try:
+        created_at = datetime.fromisoformat(payload["c"])
+        task_id = UUID(payload["i"])
+        direction = payload["d"]
+    except (KeyError, TypeError, ValueError):
+        raise InvalidCursorEx
+    if direction not in ("next", "prev"):
+        raise InvalidCursorEx
+    return created_at, task_id, direction == "prev"
+
+# Columns backing TaskOut: read-only lists select these as plain rows instead
+# of loading identity-mapped, change-tracked Task entities
+TASK_OUT_COLUMNS = [getattr(Task, name) for name in TaskOut.model_fields]
+
+def scoped_tasks(current_user: Principal, *columns) -> Select:
+    """Tasks visible to the caller: the whole company for admins, own tasks otherwise."""
+    stmt = select(*columns) if columns else select(Task)
+    stmt = stmt.where(Task.company_id == current_user.company_id)
+    if not current_user.is_admin:
+        stmt = stmt.where(Task.user_id == current_user.id)
+    return stmt
+
+def filter_tasks(stmt: Select, params: TaskFilterParams) -> Select:
+    if params.user_id is not None:
+        stmt = stmt.where(Task.user_id == params.user_id)
+    if params.is_completed is not None:
+        stmt = stmt.where(Task.is_completed == params.is_completed)
+    if params.created_after is not None:
+        stmt = stmt.where(Task.created_at >= params.created_after)
+    if params.created_before is not None:
+        stmt = stmt.where(Task.created_at < params.created_before)
+    if params.updated_after is not None:
+        stmt = stmt.where(Task.updated_at >= params.updated_after)
+    if params.updated_before is not None:
+        stmt = stmt.where(Task.updated_at < params.updated_before)
+    return stmt
+
+def task_page_query(current_user: Principal, params: TaskListParams) -> tuple[Select, bool]:
+    """Build one keyset page (newest first on created_at, id).
+
+    Returns the statement, which selects TASK_OUT_COLUMNS rows and fetches one
+    extra row to detect another page, and whether the cursor walks backwards.
+    """
+    stmt = filter_tasks(scoped_tasks(current_user, *TASK_OUT_COLUMNS), params)
+
+    key = tuple_(Task.created_at, Task.id)
+    backward = False
+    if params.cursor:
+        created_at, task_id, backward = _parse_task_cursor(params.cursor)
+        if backward:
+            stmt = stmt.where(key > tuple_(created_at, task_id))
+        else:
+            stmt = stmt.where(key < tuple_(created_at, task_id))
+
+    if backward:
+        stmt = stmt.order_by(Task.created_at.asc(), Task.id.asc())
+    else:
+        stmt = stmt.order_by(Task.created_at.desc(), Task.id.desc())
+    return stmt.limit(params.limit + 1), backward
+
+def task_page(tasks: list, params: TaskListParams, backward: bool, response: Response) -> list:
+    """Trim the extra row, restore newest-first order and set the cursor headers."""
+    has_more = len(tasks) > params.limit
+    tasks = tasks[:params.limit]
+    if backward:
+        tasks.reverse()
+        has_next, has_prev = True, has_more
+    else:
+        has_next, has_prev = has_more, params.cursor is not None
+
+    if tasks and has_next:
+        response.headers["X-Next-Cursor"] = _task_cursor(tasks[-1], "next")
+    if tasks and has_prev:
+        response.headers["X-Prev-Cursor"] = _task_cursor(tasks[0], "prev")
+    return tasks
+
+# Stored tsvector over title and content, see Task.search
+TASK_SEARCH = Task.__table__.c.search
+# Spelled like the ix_tasks_text_trgm expression so the planner can use it
+TASK_TEXT = Task.title + literal_column("' '") + Task.content
+
+def _escape_like(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+def _search_cursor(mode: str, row) -> str:
+    key = row.rank if mode == "words" else row.created_at.isoformat()
+    return encode_cursor({"m": mode, "k": key, "i": str(row.id)})
+
+def _parse_search_cursor(cursor: str) -> tuple[str, float | datetime, UUID]:
+    payload = decode_cursor(cursor)
+    try:
+        mode = payload["m"]
+        key = float(payload["k"]) if mode == "words" else datetime.fromisoformat(payload["k"])
+        return mode, key, UUID(payload["i"])
+    except (KeyError, TypeError, ValueError):
+        raise InvalidCursorEx
+
+def task_search_query(current_user: Principal, params: TaskSearchParams, mode: str, after=None) -> Select:
+    """One page of matches for `params.q` among the caller's tasks.
+
+    "words" matches stems through the GIN index on Task.search and ranks
+    title hits above content hits (best first, then id). "substring" is a
+    case-insensitive ILIKE on title and content, newest first, served by the
+    pg_trgm index where it exists. `after` is the parsed cursor key and id.
+    """
+    stmt = filter_tasks(scoped_tasks(current_user, *TASK_OUT_COLUMNS), params)
+    if mode == "words":
+        query = func.websearch_to_tsquery(literal_column("'english'::regconfig"), params.q)
+        # float8: a real comes back from its shortest text form, which is not
+        # the exact value the cursor must compare against
+        rank = cast(func.ts_rank(TASK_SEARCH, query), DOUBLE_PRECISION)
+        stmt = stmt.add_columns(rank.label("rank")).where(TASK_SEARCH.op("@@", is_comparison=True)(query))
+        key = tuple_(rank, Task.id)
+        order = (rank.desc(), Task.id.desc())
+    else:
+        stmt = stmt.where(TASK_TEXT.ilike(f"%{_escape_like(params.q)}%", escape="\\"))
+        key = tuple_(Task.created_at, Task.id)
+        order = (Task.created_at.desc(), Task.id.desc())
+    if after is not None:
+        stmt = stmt.where(key < tuple_(*after))
+    return stmt.order_by(*order).limit(params.limit + 1)
+
+def search_tasks(db: Session, current_user: Principal, params: TaskSearchParams, response: Response) -> list:
+    """Run a task search page; sets X-Search-Mode and X-Next-Cursor.
+
+    In "auto" mode a first page with no word matches (including queries made
+    only of stop words or punctuation) falls back to substring matching. The
+    cursor remembers the mode, so later pages continue the same search.
+    """
+    mode, after = params.mode, None
+    if params.cursor:
+        cursor_mode, key, task_id = _parse_search_cursor(params.cursor)
+        if mode not in ("auto", cursor_mode):
+            raise InvalidCursorEx
+        mode, after = cursor_mode, (key, task_id)
+
+    for mode in ("words", "substring") if mode == "auto" else (mode,):
+        rows = db.execute(task_search_query(current_user, params, mode, after)).all()
+        if rows:
+            break
+
+    response.headers["X-Search-Mode"] = mode
+    if len(rows) > params.limit:
+        rows = rows[:params.limit]
+        response.headers["X-Next-Cursor"] = _search_cursor(mode, rows[-1])
+    return rows
+
+# Start of the oldest open transaction that has written (holds a transaction
+# id); readers, however long, are ignored. The tasks_touch and
+# tasks_tombstone triggers stamp rows with clock_timestamp() after the
+# writing transaction got its id, so every row older than this is already
+# committed and visible, while transactions without an id yet stamp theirs
+# after this statement started.
+CHANGES_WATERMARK_SQL = """
+SELECT LEAST(statement_timestamp(), COALESCE(min(xact_start), statement_timestamp()))
+FROM pg_stat_activity
+WHERE datname = current_database() AND backend_type = 'client backend' AND backend_xid IS NOT NULL
+"""
+
+ZERO_UUID = UUID(int=0)
+
+InvalidSinceEx = HTTPException(status_code=400, detail="Invalid since token")
+ExpiredSinceEx = HTTPException(
+    status_code=410,
+    detail="since token is older than the tombstone retention, reload the full task list",
+)
+
+def _changes_token(ts: datetime, task_id: UUID, horizon: datetime) -> str:
+    return encode_cursor({"t": ts.isoformat(), "i": str(task_id), "h": horizon.isoformat()})
+
+def _parse_changes_token(since: str) -> tuple[datetime, UUID, datetime]:
+    try:
+        payload = decode_cursor(since)
+        return datetime.fromisoformat(payload["t"]), UUID(payload["i"]), datetime.fromisoformat(payload["h"])
+    except (HTTPException, KeyError, TypeError, ValueError):
+        raise InvalidSinceEx
+
+def _tombstone_view(current_user: Principal):
+    """Tombstones shaped like the task side of the changes union."""
+    known = {"id": TaskTombstone.id, "user_id": TaskTombstone.user_id, "company_id": TaskTombstone.company_id}
+    stmt = select(
+        TaskTombstone.deleted_at.label("ts"),
+        true().label("deleted"),
+        *(known.get(column.key, cast(null(), column.type)).label(column.key) for column in TASK_OUT_COLUMNS),
+    ).where(TaskTombstone.company_id == current_user.company_id)
+    if not current_user.is_admin:
+        stmt = stmt.where(TaskTombstone.user_id == current_user.id)
+    return stmt
+
+def task_changes(db: Session, current_user: Principal, params: TaskChangesParams) -> TaskChanges:
+    """Tasks created, updated or deleted after the `since` token, oldest change first.
+
+    Both sides of the union are keyset scans on (company_id, ts, id) bounded
+    above by the watermark, so a poll costs O(changes). Without `since` every
+    visible task is returned, page by page. Must run on the primary: the
+    watermark only holds for the database whose transactions it looked at.
+    """
+    watermark = db.execute(text(CHANGES_WATERMARK_SQL)).scalar_one()
+    if params.since:
+        ts, task_id, horizon = _parse_changes_token(params.since)
+        if horizon < datetime.now(timezone.utc) - timedelta(days=TASKS_TOMBSTONE_RETENTION_DAYS):
+            raise ExpiredSinceEx
+    else:
+        ts, task_id, horizon = None, None, watermark
+
+    tasks = scoped_tasks(current_user, Task.updated_at.label("ts"), false().label("deleted"), *TASK_OUT_COLUMNS)
+    tasks = tasks.where(Task.updated_at < watermark)
+    tombstones = _tombstone_view(current_user).where(TaskTombstone.deleted_at < watermark)
+    if ts is not None:
+        tasks = tasks.where(tuple_(Task.updated_at, Task.id) > tuple_(ts, task_id))
+        tombstones = tombstones.where(tuple_(TaskTombstone.deleted_at, TaskTombstone.id) > tuple_(ts, task_id))
+    # Limit each side too, so a page never sorts more than 2 * (limit + 1) rows
+    tasks = tasks.order_by(Task.updated_at, Task.id).limit(params.limit + 1)
+    tombstones = tombstones.order_by(TaskTombstone.deleted_at, TaskTombstone.id).limit(params.limit + 1)
+    changes = union_all(tasks, tombstones).subquery()
+    rows = db.execute(select(changes).order_by(changes.c.ts, changes.c.id).limit(params.limit + 1)).all()
+
+    has_more = len(rows) > params.limit
+    rows = rows[:params.limit]
+    if has_more:
+        last = rows[-1]
+        next_token = _changes_token(last.ts, last.id, max(horizon, last.ts))
+    else:
+        # Everything before the watermark has been returned
+        next_token = _changes_token(watermark, ZERO_UUID, max(horizon, watermark))
+    return TaskChanges(
+        changed=[TaskOut.model_validate(row._asdict()) for row in rows if not row.deleted],
+        deleted=[row.id for row in rows if row.deleted],
+        next=next_token,
+        has_more=has_more,
+    )
+
+def prune_tombstones(db: Session, retention_days: int = TASKS_TOMBSTONE_RETENTION_DAYS) -> int:
+    """Drop tombstones older than the retention; older since tokens get 410."""
+    result = db.execute(
+        delete(TaskTombstone).where(
+            TaskTombstone.deleted_at < datetime.now(timezone.utc) - timedelta(days=retention_days)
+        )
+    )
+    db.commit()
+    return result.rowcount
+
+def task_stats(db: Session, current_user: Principal) -> TaskStats:
+    """Open/completed counts for the company (own tasks for non-admins).
+
+    Reads one task_counters row per user with tasks, whatever the number of
+    tasks; the tasks_count trigger keeps them current on every write path.
+    """
+    stmt = select(TaskCounter.user_id, TaskCounter.total, TaskCounter.completed).where(
+        TaskCounter.company_id == current_user.company_id, TaskCounter.total > 0
+    )
+    if not current_user.is_admin:
+        stmt = stmt.where(TaskCounter.user_id == current_user.id)
+    users = [
+        UserTaskCounts(user_id=row.user_id, total=row.total, open=row.total - row.completed, completed=row.completed)
+        for row in db.execute(stmt.order_by(TaskCounter.user_id))
+    ]
+    total = sum(user.total for user in users)
+    completed = sum(user.completed for user in users)
+    return TaskStats(total=total, open=total - completed, completed=completed, users=users)
+
+# Blocks task writes in every company until commit (their trigger waits for
+# the lock), so the count and the counters describe the same snapshot
+COUNTERS_LOCK_SQL = "LOCK TABLE task_counters IN SHARE ROW EXCLUSIVE MODE"
+RECONCILE_COUNTERS_SQL = """
+WITH actual AS (
+    SELECT company_id, user_id, count(*) AS total, count(*) FILTER (WHERE is_completed) AS completed
+    FROM tasks
+    WHERE company_id = :company_id
+    GROUP BY company_id, user_id
+), stored AS (
+    SELECT company_id, user_id, total, completed FROM task_counters WHERE company_id = :company_id
+), fixed AS (
+    INSERT INTO task_counters (company_id, user_id, total, completed)
+    SELECT company_id, user_id, COALESCE(actual.total, 0), COALESCE(actual.completed, 0)
+    FROM actual FULL JOIN stored USING (company_id, user_id)
+    WHERE (actual.total, actual.completed) IS DISTINCT FROM (stored.total, stored.completed)
+    ON CONFLICT (company_id, user_id) DO UPDATE
+    SET total = excluded.total, completed = excluded.completed
+    RETURNING 1
+)
+SELECT count(*) FROM fixed
+"""
+COUNTER_COMPANIES_SQL = "SELECT id FROM companies UNION SELECT company_id FROM task_counters"
+
+def reconcile_task_counters(db: Session, company_id: UUID | None = None) -> int:
+    """Recount tasks and repair drifted task_counters rows; returns rows fixed.
+
+    One short transaction per company. Drift only comes from writes that
+    skip triggers, e.g. TRUNCATE or a restore with session_replication_role.
+    """
+    company_ids = [company_id] if company_id else db.execute(text(COUNTER_COMPANIES_SQL)).scalars().all()
+    db.commit()
+    fixed = 0
+    for company in company_ids:
+        db.execute(text(COUNTERS_LOCK_SQL))
+        fixed += db.execute(text(RECONCILE_COUNTERS_SQL), {"company_id": company}).scalar_one()
+        db.commit()
+    return fixed
+
+EXPORT_FIELDS = list(TaskOut.model_fields)
+
+def _csv_chunk(rows: list[dict]) -> str:
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=EXPORT_FIELDS)
+    writer.writerows(rows)
+    return buffer.getvalue()
+
+def export_tasks(current_user: Principal, params: TaskExportParams) -> Iterator[str]:
+    """Yield the caller's tasks as NDJSON or CSV, one chunk per cursor fetch.
+
+    Rows come from a server-side cursor in TASKS_EXPORT_CHUNK_SIZE batches,
+    so memory stays flat however many tasks are exported. The generator owns
+    its session: request dependencies are closed before the body streams.
+    """
+    stmt = filter_tasks(scoped_tasks(current_user, *TASK_OUT_COLUMNS), params).order_by(
+        Task.created_at, Task.id
+    )
+
+    if params.format == "csv":
+        yield _csv_chunk([dict(zip(EXPORT_FIELDS, EXPORT_FIELDS))])
+
+    with LocalSession() as db:
+        result = db.execute(stmt.execution_options(yield_per=TASKS_EXPORT_CHUNK_SIZE))
+        for rows in result.partitions():
+            tasks = [TaskOut.model_validate(row) for row in rows]
+            if params.format == "csv":
+                yield _csv_chunk([task.model_dump(mode="json") for task in tasks])
+            else:
+                yield "".join(task.model_dump_json() + "\n" for task in tasks)
+
+IMPORT_STAGING_DDL = """
+CREATE TEMP TABLE task_import (
+    id uuid,
+    title text,
+    content text,
+    is_completed boolean,
+    created_at timestamptz
+) ON COMMIT DROP
+"""
+IMPORT_COPY_SQL = (
+    "COPY task_import (id, title, content, is_completed, created_at) "
+    "FROM STDIN WITH (FORMAT csv)"
+)
+IMPORT_MERGE_SQL = """
+INSERT INTO tasks (id, title, content, is_completed, created_at, updated_at, user_id, company_id)
+SELECT id, title, content, is_completed,
+       COALESCE(created_at, now()), now(),
+       :user_id, :company_id
+FROM task_import
+ORDER BY id
+"""
+
+def _decode_line(line: bytes, line_no: int) -> str:
+    try:
+        # utf-8-sig drops the byte order mark Excel puts before the CSV header
+        return line.decode("utf-8-sig" if line_no == 1 else "utf-8")
+    except UnicodeDecodeError:
+        # Nothing is committed: the whole file is refused
+        raise HTTPException(status_code=400, detail=f"Line {line_no} is not valid UTF-8")
+
+def _iter_lines(chunks: Iterable[bytes]) -> Iterator[str]:
+    """Split a streamed body into decoded lines, keeping the newline for csv."""
+    pending = b""
+    line_no = 0
+    for chunk in chunks:
+        lines = (pending + chunk).split(b"\n")
+        pending = lines.pop()
+        for line in lines:
+            line_no += 1
+            yield _decode_line(line, line_no) + "\n"
+    if pending:
+        yield _decode_line(pending, line_no + 1)
+
+def _parse_rows(lines: Iterator[str], fmt: str) -> Iterator[tuple[int, TaskImportRow | ValidationError]]:
+    """Yield (line number, validated task or its error) for every input row."""
+    if fmt == "csv":
+        reader = csv.DictReader(lines)
+        for row in reader:
+            # Empty cells fall back to the schema defaults, unknown columns are ignored
+            values = {key: value for key, value in row.items() if key and value}
+            try:
+                yield reader.line_num, TaskImportRow.model_validate(values)
+            except ValidationError as e:
+                yield reader.line_num, e
+    else:
+        for line_no, line in enumerate(lines, start=1):
+            if not line.strip():
+                continue
+            try:
+                yield line_no, TaskImportRow.model_validate_json(line)
+            except ValidationError as e:
+                yield line_no, e
+
+def _error_detail(error: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(part) for part in err['loc'])}: {err['msg']}" if err["loc"] else err["msg"]
+        for err in error.errors(include_url=False)
+    )
+
+def _copy_batch(cursor, batch: list[TaskImportRow]):
+    buffer = io.StringIO()
+    # None is written as an unquoted empty field, which COPY reads as NULL
+    csv.writer(buffer).writerows(
+        (uuid.uuid4(), task.title, task.content, task.is_completed, task.created_at)
+        for task in batch
+    )
+    buffer.seek(0)
+    cursor.copy_expert(IMPORT_COPY_SQL, buffer)
+
+def import_tasks(current_user: Principal, chunks: Iterable[bytes], fmt: str) -> TaskImportResult:
+    """Load NDJSON or CSV rows as tasks owned by the caller.
+
+    Rows are validated against TaskImportRow as they stream in and COPYed into a
+    temp staging table every TASKS_IMPORT_BATCH_SIZE rows; one INSERT ... SELECT
+    then merges the staged rows into tasks. Invalid rows are skipped and
+    reported by line number, valid rows are committed together.
+    """
+    started = time.perf_counter()
+    rows = failed = 0
+    errors: list[TaskImportError] = []
+    batch: list[TaskImportRow] = []
+
+    with LocalSession() as db:
+        db.execute(text(IMPORT_STAGING_DDL))
+        cursor = db.connection().connection.cursor()
+        for line, parsed in _parse_rows(_iter_lines(chunks), fmt):
+            rows += 1
+            if isinstance(parsed, ValidationError):
+                failed += 1
+                if len(errors) < TASKS_IMPORT_MAX_ERRORS:
+                    errors.append(TaskImportError(line=line, detail=_error_detail(parsed)))
+                continue
+            batch.append(parsed)
+            if len(batch) >= TASKS_IMPORT_BATCH_SIZE:
+                _copy_batch(cursor, batch)
+                batch = []
+        if batch:
+            _copy_batch(cursor, batch)
+
+        imported = db.execute(
+            text(IMPORT_MERGE_SQL),
+            {"user_id": current_user.id, "company_id": current_user.company_id},
+        ).rowcount
+        db.commit()
+
+    return TaskImportResult(
+        rows=rows,
+        imported=imported,
+        failed=failed,
+        errors=errors,
+        seconds=round(time.perf_counter() - started, 3),
+    )
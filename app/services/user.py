@@ -0,0 +1,17 @@
+from sqlalchemy import Select, select
+
+from app.models.user import User
+from app.schemas.user import UserOut
+from app.services.auth import Principal
+
+# Columns backing UserOut, selected as plain rows for read-only lists, plus
+# updated_at for the list ETag
+USER_OUT_COLUMNS = [getattr(User, name) for name in UserOut.model_fields] + [User.updated_at]
+
+def company_users_query(current_user: Principal, *columns) -> Select:
+    """The caller's company users, oldest first so list ETags are stable."""
+    return (
+        select(*(columns or USER_OUT_COLUMNS))
+        .where(User.company_id == current_user.company_id)
+        .order_by(User.created_at, User.id)
+    )
@@ -0,0 +1,71 @@
+"""Compare two benchmarks.suite results and flag regressions.
+
+    python -m benchmarks.compare bench-base.json bench-head.json --threshold 10
+
+Exits with status 1 when any operation's p95 or p99 latency grew, or its
+RPS dropped, by more than --threshold percent.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+
+# (metric, True when higher is better)
+METRICS = (("rps", True), ("p50_ms", False), ("p95_ms", False), ("p99_ms", False))
+GATED = {"rps", "p95_ms", "p99_ms"}
+
+
+def change_pct(base: float, head: float) -> float | None:
+    if not base:
+        return None
+    return (head - base) / base * 100
+
+
+def compare(base: dict, head: dict, threshold: float) -> tuple[list[dict], bool]:
+    rows, regressed = [], False
+    for name in [*base["endpoints"], "total"]:
+        before = base["total"] if name == "total" else base["endpoints"][name]
+        after = head["total"] if name == "total" else head["endpoints"].get(name)
+        if after is None:
+            continue
+        for metric, higher_is_better in METRICS:
+            change = change_pct(before[metric], after[metric])
+            worse = change is not None and (-change if higher_is_better else change) > threshold
+            regressed |= worse and metric in GATED
+            rows.append({
+                "operation": name,
+                "metric": metric,
+                "base": before[metric],
+                "head": after[metric],
+                "change_pct": None if change is None else round(change, 1),
+                "regression": worse and metric in GATED,
+            })
+    return rows, regressed
+
+
+def main(args: argparse.Namespace) -> int:
+    with open(args.base) as f:
+        base = json.load(f)
+    with open(args.head) as f:
+        head = json.load(f)
+    rows, regressed = compare(base, head, args.threshold)
+
+    if args.json:
+        print(json.dumps({"base": base["meta"].get("commit"), "head": head["meta"].get("commit"), "rows": rows}))
+    else:
+        print(f"{'operation':>9} {'metric':>7} {'base':>10} {'head':>10} {'change':>8}")
+        for row in rows:
+            change = "n/a" if row["change_pct"] is None else f"{row['change_pct']:+.1f}%"
+            flag = "  REGRESSION" if row["regression"] else ""
+            print(f"{row['operation']:>9} {row['metric']:>7} {row['base']:>10} {row['head']:>10} {change:>8}{flag}")
+    return 1 if regressed else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("base")
+    parser.add_argument("head")
+    parser.add_argument("--threshold", type=float, default=10.0, help="allowed change in percent")
+    parser.add_argument("--json", action="store_true", help="print the comparison as JSON")
+    sys.exit(main(parser.parse_args()))
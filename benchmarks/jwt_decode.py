@@ -0,0 +1,45 @@
+"""Per-request cost of bearer token verification.
+
+Compares a cold signature check on each backend with the cached path that
+get_current_user takes once a token has been seen. Uses the app's .env:
+
+    python -m benchmarks.jwt_decode --iterations 50000
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import timeit
+
+from app.core import security
+from app.services.auth import _decode_token, token_cache
+
+
+def per_call_us(fn, iterations: int) -> float:
+    # Best of 3 to keep scheduler noise out of the comparison
+    return min(timeit.repeat(fn, number=iterations, repeat=3)) / iterations * 1e6
+
+
+def main(iterations: int) -> None:
+    claims = {"company_id": "8d0c3c1e-3f8e-4a55-9f8a-1d2b3c4d5e6f", "is_admin": False}
+    token = security.create_access_token("5b6f1f8e-9b7a-4c1e-8f0e-0a1b2c3d4e5f", extra_claims=claims)
+    results = {}
+
+    for name in sorted(security.JWT_BACKENDS):
+        try:
+            backend = security.get_jwt_backend(name)
+        except ImportError:
+            continue
+        results[f"{name}_decode_us"] = round(per_call_us(lambda: backend.decode(token), iterations), 2)
+
+    token_cache.clear()
+    _decode_token(token)
+    results["cached_decode_us"] = round(per_call_us(lambda: _decode_token(token), iterations), 2)
+    results["iterations"] = iterations
+    print(json.dumps(results))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=20000)
+    main(parser.parse_args().iterations)
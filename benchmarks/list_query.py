@@ -0,0 +1,64 @@
+"""Load-and-serialize cost of a task list: ORM entities vs. column rows.
+
+Reads the newest `--limit` tasks from the database in .env (seed some with
+benchmarks.seed first) and builds the GET /todos body both ways:
+
+    python -m benchmarks.seed --tenants 1 --users 1 --tasks 20000 --reset
+    python -m benchmarks.list_query --limit 10000
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import time
+import tracemalloc
+
+from sqlalchemy import select
+
+from app.core.database import LocalSession
+from app.core.responses import json_list_response
+from app.models.task import Task
+from app.schemas.task import TaskOut
+from app.services.task import TASK_OUT_COLUMNS
+
+
+def entities(db, limit: int) -> bytes:
+    stmt = select(Task).order_by(Task.created_at.desc(), Task.id.desc()).limit(limit)
+    return json_list_response(TaskOut, list(db.scalars(stmt))).body
+
+
+def rows(db, limit: int) -> bytes:
+    stmt = select(*TASK_OUT_COLUMNS).order_by(Task.created_at.desc(), Task.id.desc()).limit(limit)
+    return json_list_response(TaskOut, db.execute(stmt).all()).body
+
+
+def measure(fn, limit: int, repeat: int) -> dict:
+    wall = cpu = float("inf")
+    for _ in range(repeat):
+        # A fresh session each time, as per request
+        with LocalSession() as db:
+            started, started_cpu = time.perf_counter(), time.process_time()
+            fn(db, limit)
+            wall = min(wall, time.perf_counter() - started)
+            cpu = min(cpu, time.process_time() - started_cpu)
+    with LocalSession() as db:
+        tracemalloc.start()
+        fn(db, limit)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return {"wall_ms": round(wall * 1000, 1), "cpu_ms": round(cpu * 1000, 1), "peak_mib": round(peak / 2**20, 2)}
+
+
+def main(limit: int, repeat: int) -> None:
+    with LocalSession() as db:
+        assert entities(db, limit) == rows(db, limit), "bodies differ"
+    results = {"limit": limit, "entities": measure(entities, limit, repeat), "rows": measure(rows, limit, repeat)}
+    print(json.dumps(results))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--limit", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    main(args.limit, args.repeat)
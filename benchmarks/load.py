@@ -0,0 +1,90 @@
+"""Fixed-concurrency HTTP load driver for a running Todo API.
+
+Start the API twice, once with DB_ASYNC_ENABLED=false and once with
+DB_ASYNC_ENABLED=true, and run the same command against each:
+
+    python -m benchmarks.load --base-url http://127.0.0.1:8000 \\
+        --username admin --password admin@123 --path /todos --concurrency 64
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import statistics
+import time
+
+import httpx
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def summarize(latencies: list[float], errors: int, elapsed: float) -> dict:
+    return {
+        "requests": len(latencies) + errors,
+        "errors": errors,
+        "rps": round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+        "mean_ms": round(statistics.fmean(latencies) * 1000, 2) if latencies else 0.0,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+    }
+
+
+async def login(client: httpx.AsyncClient, username: str, password: str) -> dict:
+    resp = await client.post("/auth/login", data={"username": username, "password": password})
+    resp.raise_for_status()
+    return {"Authorization": f"Bearer {resp.json()['access_token']}"}
+
+
+async def run(base_url: str, path: str, headers: dict, concurrency: int, duration: float) -> dict:
+    latencies: list[float] = []
+    errors = 0
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(base_url=base_url, headers=headers, limits=limits, timeout=30) as client:
+        deadline = time.perf_counter() + duration
+
+        async def worker():
+            nonlocal errors
+            while time.perf_counter() < deadline:
+                start = time.perf_counter()
+                try:
+                    resp = await client.get(path)
+                    ok = resp.status_code < 400
+                except httpx.HTTPError:
+                    ok = False
+                if ok:
+                    latencies.append(time.perf_counter() - start)
+                else:
+                    errors += 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    return summarize(latencies, errors, elapsed)
+
+
+async def main(args: argparse.Namespace) -> None:
+    async with httpx.AsyncClient(base_url=args.base_url, timeout=30) as client:
+        headers = await login(client, args.username, args.password)
+    result = await run(args.base_url, args.path, headers, args.concurrency, args.duration)
+    print(json.dumps({"path": args.path, "concurrency": args.concurrency, **result}))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--username", required=True)
+    parser.add_argument("--password", required=True)
+    parser.add_argument("--path", default="/todos")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=10.0)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,99 @@
+"""Logins per second per core for each password hash setting.
+
+Times a successful login's verify on one core for bcrypt costs and argon2id
+settings (skipped without argon2-cffi), plus the one-off login that also
+rehashes an outdated hash. Each PASSWORD_HASH_WORKERS process serves about
+`logins_per_sec_per_core` logins; pick the strongest setting that still
+covers the login peak:
+
+    python -m benchmarks.password_hash --bcrypt-rounds 10,11,12,13 --argon2 1:47104:1,2:19456:1,3:65536:1
+
+argon2 settings are time_cost:memory_kib:parallelism; each concurrent
+argon2 login also holds memory_kib of RAM in its worker.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import statistics
+import time
+
+from app.core import security
+
+PASSWORD = "correct horse battery staple"
+
+
+def _name(settings: dict) -> str:
+    if settings["scheme"] == "bcrypt":
+        return f"bcrypt rounds={settings['bcrypt_rounds']}"
+    return f"argon2id t={settings['argon2_time_cost']} m={settings['argon2_memory_kib']} p={settings['argon2_parallelism']}"
+
+
+def _settings(args: argparse.Namespace) -> list[dict]:
+    settings = [{"scheme": "bcrypt", "bcrypt_rounds": rounds} for rounds in args.bcrypt_rounds]
+    for value in args.argon2:
+        time_cost, memory_kib, parallelism = (int(part) for part in value.split(":"))
+        settings.append({
+            "scheme": "argon2",
+            "argon2_time_cost": time_cost,
+            "argon2_memory_kib": memory_kib,
+            "argon2_parallelism": parallelism,
+        })
+    return settings
+
+
+def timed(fn, seconds: float, minimum: int = 3) -> list[float]:
+    # Repeat for at least `seconds` so cheap settings get enough samples
+    samples = []
+    deadline = time.perf_counter() + seconds
+    while len(samples) < minimum or time.perf_counter() < deadline:
+        started = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - started)
+    return samples
+
+
+def measure(settings: dict, seconds: float, outdated: str) -> dict:
+    context = security.get_password_context(**settings)
+    hashed = context.hash(PASSWORD)
+    verify = statistics.median(timed(lambda: context.verify(PASSWORD, hashed), seconds))
+    rehash = statistics.median(timed(lambda: context.verify_and_update(PASSWORD, outdated), seconds))
+    return {
+        "verify_ms": round(verify * 1000, 2),
+        "rehash_login_ms": round(rehash * 1000, 2),
+        "logins_per_sec_per_core": round(1 / verify, 1),
+    }
+
+
+def main(args: argparse.Namespace) -> None:
+    # A hash no setting here produces, so every one of them upgrades it
+    outdated = security.get_password_context("bcrypt", bcrypt_rounds=4).hash(PASSWORD)
+    current = _name({
+        "scheme": security.PASSWORD_HASH_SCHEME,
+        "bcrypt_rounds": security.BCRYPT_ROUNDS,
+        "argon2_time_cost": security.ARGON2_TIME_COST,
+        "argon2_memory_kib": security.ARGON2_MEMORY_KIB,
+        "argon2_parallelism": security.ARGON2_PARALLELISM,
+    })
+    results = {"cores": os.cpu_count(), "current": current, "settings": []}
+    for settings in _settings(args):
+        try:
+            result = measure(settings, args.seconds, outdated)
+        except Exception as exc:  # e.g. argon2-cffi not installed
+            result = {"error": str(exc)}
+        results["settings"].append({"setting": _name(settings), **result})
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument(
+        "--bcrypt-rounds", type=lambda value: [int(item) for item in value.split(",") if item], default=[10, 11, 12, 13],
+    )
+    parser.add_argument(
+        "--argon2", type=lambda value: [item for item in value.split(",") if item],
+        default=["1:47104:1", "2:19456:1", "3:65536:1"], help="time_cost:memory_kib:parallelism, comma separated",
+    )
+    parser.add_argument("--seconds", type=float, default=2.0, help="minimum timing per setting")
+    main(parser.parse_args())
@@ -0,0 +1,113 @@
+"""Latency of GET /todos/search queries on a large seeded data set.
+
+Runs the search service's SQL for common, mid-frequency and rare words, a
+phrase and a substring, both as a tenant admin (company-wide) and as one of
+its users, and compares them with what clients do today: download every
+visible task and filter locally. Seed 1M tasks first:
+
+    python -m benchmarks.seed --tenants 1 --users 100 --tasks 10000 --reset
+    python -m benchmarks.search --repeat 5
+
+Each case reports the best and median wall time of the first page, rows on
+it, and the indexes in the plan.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import statistics
+import time
+
+from fastapi import Response
+from sqlalchemy import select, text
+
+from app.core.database import LocalSession
+from app.models.user import User
+from app.schemas.task import TaskSearchParams
+from app.services.auth import Principal
+from app.services.task import TASK_OUT_COLUMNS, scoped_tasks, search_tasks, task_search_query
+from benchmarks.seed import VOCABULARY, admin_username, user_username
+
+CASES = {
+    "common word": ("words", VOCABULARY[0]),
+    "mid word": ("words", VOCABULARY[len(VOCABULARY) // 4]),
+    "rare word": ("words", VOCABULARY[-1]),
+    "phrase": ("words", f'"{VOCABULARY[1]} {VOCABULARY[0]}"'),
+    "two rare words": ("words", f"{VOCABULARY[-1]} {VOCABULARY[-2]}"),
+    "substring": ("substring", VOCABULARY[-1][1:-1]),
+}
+
+
+def principal(db, username: str) -> Principal:
+    return Principal.from_user(db.execute(select(User).where(User.username == username)).scalar_one())
+
+
+def plan_indexes(db, stmt) -> list[str]:
+    compiled = stmt.compile(db.get_bind(), compile_kwargs={"literal_binds": True})
+    plan = db.execute(text(f"EXPLAIN (FORMAT JSON) {compiled}")).scalar_one()
+    found = []
+
+    def walk(node):
+        if "Index Name" in node and node["Index Name"] not in found:
+            found.append(node["Index Name"])
+        for child in node.get("Plans", ()):
+            walk(child)
+
+    walk(plan[0]["Plan"])
+    return found
+
+
+def timed(fn, repeat: int) -> tuple[list[float], object]:
+    samples, result = [], None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        samples.append(time.perf_counter() - started)
+    return samples, result
+
+
+def client_side(db, user: Principal, term: str) -> int:
+    # Today's alternative: fetch every visible task, match in the client
+    term = term.strip('"').lower()
+    rows = db.execute(scoped_tasks(user, *TASK_OUT_COLUMNS)).all()
+    return sum(1 for row in rows if term in row.title.lower() or term in row.content.lower())
+
+
+def main(args: argparse.Namespace) -> None:
+    with LocalSession() as db:
+        total = db.execute(text("SELECT count(*) FROM tasks")).scalar_one()
+        scopes = {"admin": principal(db, admin_username(0)), "user": principal(db, user_username(0, 0))}
+        results = {"tasks": total, "limit": args.limit, "cases": []}
+        for scope, user in scopes.items():
+            for name, (mode, q) in CASES.items():
+                params = TaskSearchParams(q=q, mode=mode, limit=args.limit)
+                samples, rows = timed(lambda: search_tasks(db, user, params, Response()), args.repeat)
+                results["cases"].append({
+                    "scope": scope,
+                    "case": name,
+                    "q": q,
+                    "rows": len(rows),
+                    "best_ms": round(min(samples) * 1000, 2),
+                    "median_ms": round(statistics.median(samples) * 1000, 2),
+                    "indexes": plan_indexes(db, task_search_query(user, params, mode)),
+                })
+            if args.client_side:
+                samples, matches = timed(lambda: client_side(db, user, CASES["rare word"][1]), 1)
+                results["cases"].append({
+                    "scope": scope,
+                    "case": "client-side filter",
+                    "rows": matches,
+                    "best_ms": round(samples[0] * 1000, 2),
+                })
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--limit", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument(
+        "--no-client-side", dest="client_side", action="store_false",
+        help="skip the download-everything baseline, slow on large tenants",
+    )
+    main(parser.parse_args())
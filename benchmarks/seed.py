@@ -0,0 +1,161 @@
+"""Seed benchmark tenants, users and tasks into the database in .env.
+
+Every tenant is a company with an admin created by scripts/seed_admin.py,
+plus `--users` regular users that each own `--tasks` tasks:
+
+    python -m benchmarks.seed --tenants 4 --users 25 --tasks 200 --reset
+
+Usernames are `bench-t<tenant>-admin` and `bench-t<tenant>-u<user>`, all
+with the password from `--password`, so benchmarks.suite can derive them
+from the same counts. `--reset` deletes previously seeded tenants first.
+"""
+from __future__ import annotations
+
+import argparse
+import csv
+import io
+import json
+import random
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import select, text
+
+from app.core.database import LocalSession
+from app.core.security import get_password_hash
+from app.models.company import Company
+from scripts.seed_admin import seed_admin
+
+COMPANY_PREFIX = "bench-tenant-"
+DEFAULT_PASSWORD = "bench-password"
+
+# Task text is drawn from this vocabulary with Zipf-like weights, so search
+# benchmarks see common, mid-frequency and rare terms
+VOCABULARY = (
+    "review update report meeting client invoice design deploy release budget "
+    "customer contract schedule draft follow call email plan sprint bug fix "
+    "test migrate database server backup onboarding training hiring payroll "
+    "audit compliance security incident outage dashboard metrics roadmap "
+    "feedback survey campaign launch website mobile android ios checkout "
+    "payment refund shipping warehouse inventory supplier vendor procurement "
+    "legal trademark patent quarterly annual forecast revenue expense travel "
+    "conference workshop webinar newsletter translation localization "
+    "accessibility performance latency cache index query replica kubernetes "
+    "terraform certificate renewal license subscription calendar "
+    "interview offsite retrospective postmortem escalation ticket backlog "
+    "prototype wireframe mockup storyboard analytics experiment hypothesis "
+    "sandbox staging production rollback hotfix changelog documentation "
+    "tutorial glossary handbook policy privacy gdpr encryption firewall"
+).split()
+WORD_WEIGHTS = [1 / (rank + 1) for rank in range(len(VOCABULARY))]
+
+
+def words(rng: random.Random, low: int, high: int) -> str:
+    return " ".join(rng.choices(VOCABULARY, WORD_WEIGHTS, k=rng.randint(low, high)))
+
+
+RESET_SQL = [
+    "DELETE FROM tasks WHERE company_id IN (SELECT id FROM companies WHERE name LIKE :prefix)",
+    "DELETE FROM users WHERE company_id IN (SELECT id FROM companies WHERE name LIKE :prefix)",
+    "DELETE FROM companies WHERE name LIKE :prefix",
+]
+
+
+def admin_username(tenant: int) -> str:
+    return f"bench-t{tenant}-admin"
+
+
+def user_username(tenant: int, user: int) -> str:
+    return f"bench-t{tenant}-u{user}"
+
+
+def reset(db) -> None:
+    for sql in RESET_SQL:
+        db.execute(text(sql), {"prefix": f"{COMPANY_PREFIX}%"})
+    db.commit()
+
+
+def _copy(db, table: str, columns: tuple[str, ...], rows) -> None:
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(rows)
+    buffer.seek(0)
+    cursor = db.connection().connection.cursor()
+    cursor.copy_expert(f"COPY {table} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)", buffer)
+
+
+def seed_tenant(db, tenant: int, users: int, tasks: int, hashed_password: str, rng: random.Random) -> int:
+    company_id = db.execute(
+        select(Company.id).where(Company.name == f"{COMPANY_PREFIX}{tenant}")
+    ).scalar_one()
+    now = datetime.now(timezone.utc)
+
+    user_ids = [uuid.uuid4() for _ in range(users)]
+    _copy(
+        db,
+        "users",
+        ("id", "email", "username", "first_name", "last_name", "hashed_password", "is_active", "is_admin", "company_id"),
+        (
+            (user_id, f"{user_username(tenant, i)}@bench.local", user_username(tenant, i),
+             "Bench", f"User {i}", hashed_password, True, False, company_id)
+            for i, user_id in enumerate(user_ids)
+        ),
+    )
+    # Spread created_at over the last 90 days so keyset pages and filters see
+    # realistic data; updated_at is always stamped by the tasks_touch trigger
+    _copy(
+        db,
+        "tasks",
+        ("id", "title", "content", "is_completed", "created_at", "user_id", "company_id"),
+        (
+            (uuid.uuid4(), f"Task {i}: {words(rng, 2, 5)}", words(rng, 8, 30),
+             rng.random() < 0.3, now - timedelta(seconds=rng.randrange(90 * 24 * 3600)), user_id, company_id)
+            for user_id in user_ids
+            for i in range(tasks)
+        ),
+    )
+    db.commit()
+    return users * tasks
+
+
+def main(args: argparse.Namespace) -> None:
+    started = time.perf_counter()
+    rng = random.Random(args.seed)
+
+    with LocalSession() as db:
+        if args.reset:
+            reset(db)
+
+    # Regular users share one hash: bcrypt per user would dominate seeding time
+    hashed_password = get_password_hash(args.password)
+    seeded_tasks = 0
+    for tenant in range(args.tenants):
+        seed_admin(
+            company_name=f"{COMPANY_PREFIX}{tenant}",
+            company_description="Benchmark tenant",
+            admin_email=f"{admin_username(tenant)}@bench.local",
+            admin_username=admin_username(tenant),
+            admin_password=args.password,
+            admin_first_name="Bench",
+            admin_last_name="Admin",
+        )
+        with LocalSession() as db:
+            seeded_tasks += seed_tenant(db, tenant, args.users, args.tasks, hashed_password, rng)
+
+    print(json.dumps({
+        "tenants": args.tenants,
+        "users": args.tenants * args.users,
+        "tasks": seeded_tasks,
+        "seconds": round(time.perf_counter() - started, 2),
+    }))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tenants", type=int, default=2)
+    parser.add_argument("--users", type=int, default=10, help="regular users per tenant")
+    parser.add_argument("--tasks", type=int, default=100, help="tasks per regular user")
+    parser.add_argument("--password", default=DEFAULT_PASSWORD)
+    parser.add_argument("--seed", type=int, default=0, help="random seed for task data")
+    parser.add_argument("--reset", action="store_true", help="delete previously seeded tenants first")
+    main(parser.parse_args())
@@ -0,0 +1,85 @@
+"""CPU cost of serializing a task list response, per 10k tasks.
+
+Compares FastAPI's response_model path (validate, jsonable_encoder,
+json.dumps) with app.core.responses.json_list_response on the same ORM rows,
+and checks both produce the same bytes. No database needed:
+
+    python -m benchmarks.serialization --tasks 10000
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_model_field
+
+from app.core.responses import json_list_response
+from app.models.task import Task
+from app.schemas.task import TaskOut
+
+
+def make_tasks(count: int) -> list[Task]:
+    now = datetime.now(timezone.utc)
+    user_id, company_id = uuid.uuid4(), uuid.uuid4()
+    return [
+        Task(
+            id=uuid.uuid4(),
+            title=f"Task {i}",
+            content=f"Benchmark content for task {i} – ünïcode",
+            is_completed=i % 3 == 0,
+            created_at=now - timedelta(minutes=i),
+            updated_at=now,
+            user_id=user_id,
+            company_id=company_id,
+        )
+        for i in range(count)
+    ]
+
+
+def fastapi_body(field, tasks: list[Task]) -> bytes:
+    content = asyncio.run(serialize_response(field=field, response_content=tasks))
+    return JSONResponse(content).body
+
+
+def cpu_seconds(fn, repeat: int) -> float:
+    # Best of `repeat` process CPU time, so scheduler noise doesn't count
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.process_time()
+        fn()
+        best = min(best, time.process_time() - started)
+    return best
+
+
+def main(count: int, repeat: int) -> None:
+    tasks = make_tasks(count)
+    field = create_model_field("Response_list_tasks", list[TaskOut], mode="serialization")
+
+    before = fastapi_body(field, tasks)
+    after = json_list_response(TaskOut, tasks).body
+    assert before == after, "serialized bodies differ"
+
+    per_10k = 10000 / count
+    response_model_s = cpu_seconds(lambda: fastapi_body(field, tasks), repeat) * per_10k
+    optimized_s = cpu_seconds(lambda: json_list_response(TaskOut, tasks), repeat) * per_10k
+    print(json.dumps({
+        "tasks": count,
+        "body_bytes": len(after),
+        "response_model_cpu_ms_per_10k": round(response_model_s * 1000, 1),
+        "json_list_response_cpu_ms_per_10k": round(optimized_s * 1000, 1),
+        "speedup": round(response_model_s / optimized_s, 2),
+    }))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tasks", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    main(args.tasks, args.repeat)
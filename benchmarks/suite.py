@@ -0,0 +1,218 @@
+"""Mixed-endpoint load test against a running Todo API seeded by benchmarks.seed.
+
+Each virtual user logs in as a random seeded user, then keeps picking an
+operation from the weighted mix until the duration is up:
+
+    python -m benchmarks.seed --tenants 4 --users 25 --tasks 200 --reset
+    python -m benchmarks.suite --tenants 4 --users 25 --concurrency 32 \\
+        --duration 30 --output bench-$(git rev-parse --short HEAD).json
+
+Pass the same --tenants/--users as the seed. The JSON result has
+p50/p95/p99 and RPS per operation; compare two runs with benchmarks.compare.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import platform
+import random
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+
+import httpx
+
+from benchmarks.load import summarize
+from benchmarks.seed import DEFAULT_PASSWORD, admin_username, user_username
+
+OPERATIONS = ("login", "list", "get", "create", "update", "delete")
+DEFAULT_MIX = "login=2,list=40,get=30,create=12,update=10,delete=6"
+
+
+def parse_mix(value: str) -> dict[str, int]:
+    mix = {}
+    for part in value.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in OPERATIONS:
+            raise argparse.ArgumentTypeError(f"unknown operation {name!r}, expected one of {', '.join(OPERATIONS)}")
+        try:
+            mix[name] = int(weight)
+        except ValueError:
+            raise argparse.ArgumentTypeError(f"weight of {name!r} must be an integer")
+    if sum(mix.values()) <= 0:
+        raise argparse.ArgumentTypeError("the mix needs at least one positive weight")
+    return mix
+
+
+def git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+class VirtualUser:
+    """One logged-in client; remembers task ids it has seen or created."""
+
+    def __init__(self, client: httpx.AsyncClient, username: str, password: str, rng: random.Random):
+        self.client = client
+        self.username = username
+        self.password = password
+        self.rng = rng
+        self.headers: dict = {}
+        self.seen: list[str] = []
+        self.created: list[str] = []
+
+    async def login(self) -> httpx.Response:
+        resp = await self.client.post("/auth/login", data={"username": self.username, "password": self.password})
+        if resp.is_success:
+            self.headers = {"Authorization": f"Bearer {resp.json()['access_token']}"}
+        return resp
+
+    async def list(self) -> httpx.Response:
+        resp = await self.client.get("/todos", params={"limit": 50}, headers=self.headers)
+        if resp.is_success:
+            self.seen = [task["id"] for task in resp.json()]
+        return resp
+
+    async def get(self) -> httpx.Response:
+        return await self.client.get(f"/todos/{self.rng.choice(self.seen)}", headers=self.headers)
+
+    async def create(self) -> httpx.Response:
+        payload = {"title": "Bench task", "content": f"Created by {self.username}", "is_completed": False}
+        resp = await self.client.post("/todos", json=payload, headers=self.headers)
+        if resp.is_success:
+            self.created.append(resp.json()["id"])
+        return resp
+
+    async def update(self) -> httpx.Response:
+        task_id = self.rng.choice(self.created or self.seen)
+        payload = {"title": "Bench task", "content": "Updated", "is_completed": self.rng.random() < 0.5}
+        return await self.client.put(f"/todos/{task_id}", json=payload, headers=self.headers)
+
+    async def delete(self) -> httpx.Response:
+        # Only delete own new tasks so the seeded data set stays the same size
+        return await self.client.delete(f"/todos/{self.created.pop()}", headers=self.headers)
+
+    def can_run(self, operation: str) -> bool:
+        if operation == "get":
+            return bool(self.seen)
+        if operation == "update":
+            return bool(self.created or self.seen)
+        if operation == "delete":
+            return bool(self.created)
+        return True
+
+
+def pick_user(tenant_count: int, user_count: int, admin_share: float, rng: random.Random) -> str:
+    tenant = rng.randrange(tenant_count)
+    if rng.random() < admin_share:
+        return admin_username(tenant)
+    return user_username(tenant, rng.randrange(user_count))
+
+
+async def run(args: argparse.Namespace) -> dict:
+    rng = random.Random(args.seed)
+    operations, weights = zip(*args.mix.items())
+    latencies: dict[str, list[float]] = {name: [] for name in OPERATIONS}
+    errors: dict[str, int] = {name: 0 for name in OPERATIONS}
+    recording = False
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+
+    async with httpx.AsyncClient(base_url=args.base_url, limits=limits, timeout=30) as client:
+
+        async def timed(user: VirtualUser, operation: str):
+            start = time.perf_counter()
+            try:
+                resp = await getattr(user, operation)()
+                ok = resp.status_code < 400
+            except httpx.HTTPError:
+                ok = False
+            if not recording:
+                return
+            if ok:
+                latencies[operation].append(time.perf_counter() - start)
+            else:
+                errors[operation] += 1
+
+        async def worker(worker_rng: random.Random):
+            username = pick_user(args.tenants, args.users, args.admin_share, worker_rng)
+            user = VirtualUser(client, username, args.password, worker_rng)
+            await user.login()
+            while time.perf_counter() < deadline:
+                operation = worker_rng.choices(operations, weights)[0]
+                if not user.can_run(operation):
+                    # Nothing to read or delete yet: fetch or make some tasks first
+                    operation = "create" if user.seen else "list"
+                await timed(user, operation)
+
+        deadline = time.perf_counter() + args.warmup + args.duration
+        tasks = [asyncio.create_task(worker(random.Random(rng.random()))) for _ in range(args.concurrency)]
+        await asyncio.sleep(args.warmup)
+        recording = True
+        started = time.perf_counter()
+        await asyncio.gather(*tasks)
+        elapsed = time.perf_counter() - started
+
+    endpoints = {
+        name: summarize(latencies[name], errors[name], elapsed)
+        for name in OPERATIONS
+        if name in args.mix or latencies[name] or errors[name]
+    }
+    every = [sample for samples in latencies.values() for sample in samples]
+    return {
+        "meta": {
+            "commit": git_commit(),
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "base_url": args.base_url,
+            "python": platform.python_version(),
+            "concurrency": args.concurrency,
+            "duration": args.duration,
+            "warmup": args.warmup,
+            "tenants": args.tenants,
+            "users": args.users,
+            "admin_share": args.admin_share,
+            "mix": args.mix,
+            "seed": args.seed,
+        },
+        "endpoints": endpoints,
+        "total": summarize(every, sum(errors.values()), elapsed),
+    }
+
+
+def main(args: argparse.Namespace) -> None:
+    result = asyncio.run(run(args))
+    text = json.dumps(result, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    print(text)
+    print(
+        "\n".join(
+            f"{name:>7}  rps {summary['rps']:>8}  p50 {summary['p50_ms']:>8}ms  "
+            f"p95 {summary['p95_ms']:>8}ms  p99 {summary['p99_ms']:>8}ms  errors {summary['errors']}"
+            for name, summary in result["endpoints"].items()
+        ),
+        file=sys.stderr,
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--tenants", type=int, default=2, help="as passed to benchmarks.seed")
+    parser.add_argument("--users", type=int, default=10, help="as passed to benchmarks.seed")
+    parser.add_argument("--password", default=DEFAULT_PASSWORD)
+    parser.add_argument("--admin-share", type=float, default=0.1, help="fraction of virtual users logged in as admin")
+    parser.add_argument("--mix", type=parse_mix, default=parse_mix(DEFAULT_MIX), help=f"default: {DEFAULT_MIX}")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=30.0)
+    parser.add_argument("--warmup", type=float, default=5.0, help="seconds run before recording starts")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="also write the JSON result to this file")
+    main(parser.parse_args())
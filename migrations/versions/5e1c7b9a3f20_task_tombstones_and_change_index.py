@@ -0,0 +1,63 @@
+"""task tombstones and change index
+
+Revision ID: 5e1c7b9a3f20
+Revises: d4f07a3e91c5
+Create Date: 2026-10-18 20:05:41.118203
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5e1c7b9a3f20'
+down_revision: Union[str, Sequence[str], None] = 'd4f07a3e91c5'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """
+      Deleted tasks leave a tombstone so GET /todos/changes can report them.
+      A statement-level trigger covers single, bulk and cascading deletes
+      with one INSERT per statement.
+    """
+    op.create_table(
+        "task_tombstones",
+        sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column("user_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("company_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("deleted_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False),
+    )
+    op.create_index(
+        "ix_task_tombstones_company_deleted_id", "task_tombstones", ["company_id", "deleted_at", "id"]
+    )
+    op.create_index("ix_tasks_company_updated_id", "tasks", ["company_id", "updated_at", "id"])
+
+    op.execute("""
+        CREATE FUNCTION tasks_tombstone() RETURNS trigger LANGUAGE plpgsql AS $$
+        BEGIN
+            INSERT INTO task_tombstones (id, user_id, company_id)
+            SELECT id, user_id, company_id FROM deleted_tasks
+            ON CONFLICT (id) DO UPDATE SET deleted_at = excluded.deleted_at;
+            RETURN NULL;
+        END
+        $$
+    """)
+    op.execute("""
+        CREATE TRIGGER tasks_tombstone
+        AFTER DELETE ON tasks
+        REFERENCING OLD TABLE AS deleted_tasks
+        FOR EACH STATEMENT EXECUTE FUNCTION tasks_tombstone()
+    """)
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER tasks_tombstone ON tasks")
+    op.execute("DROP FUNCTION tasks_tombstone()")
+    op.drop_index("ix_tasks_company_updated_id", table_name="tasks")
+    op.drop_index("ix_task_tombstones_company_deleted_id", table_name="task_tombstones")
+    op.drop_table("task_tombstones")
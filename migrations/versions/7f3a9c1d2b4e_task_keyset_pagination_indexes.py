@@ -0,0 +1,54 @@
+"""task keyset pagination indexes
+
+Revision ID: 7f3a9c1d2b4e
+Revises: 2ceb44954441
+Create Date: 2026-10-18 09:12:40.114203
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7f3a9c1d2b4e'
+down_revision: Union[str, Sequence[str], None] = '2ceb44954441'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """
+      Keyset pagination needs non-null timestamps, align tasks with the model
+    """
+    for column in ("created_at", "updated_at"):
+        op.alter_column(
+            "tasks", column,
+            type_=sa.DateTime(timezone=True),
+            server_default=sa.func.now(),
+        )
+        op.execute(f"UPDATE tasks SET {column} = now() WHERE {column} IS NULL")
+        op.alter_column("tasks", column, nullable=False)
+
+    op.create_index(
+        "ix_tasks_company_created_id", "tasks",
+        ["company_id", "created_at", "id"], unique=False,
+    )
+    op.create_index(
+        "ix_tasks_company_user_created_id", "tasks",
+        ["company_id", "user_id", "created_at", "id"], unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_tasks_company_user_created_id", table_name="tasks")
+    op.drop_index("ix_tasks_company_created_id", table_name="tasks")
+
+    for column in ("updated_at", "created_at"):
+        op.alter_column(
+            "tasks", column,
+            type_=sa.DateTime(),
+            server_default=None,
+            nullable=True,
+        )
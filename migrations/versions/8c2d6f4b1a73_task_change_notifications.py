@@ -0,0 +1,66 @@
+"""task change notifications
+
+Revision ID: 8c2d6f4b1a73
+Revises: 5e1c7b9a3f20
+Create Date: 2026-10-18 22:14:09.530871
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8c2d6f4b1a73'
+down_revision: Union[str, Sequence[str], None] = '5e1c7b9a3f20'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+OPERATIONS = {"insert": "NEW", "update": "NEW", "delete": "OLD"}
+
+
+def upgrade() -> None:
+    """
+      Every write to tasks sends a NOTIFY on "task_events" when its transaction
+      commits, one per (company, user) and statement, listing at most 50 ids.
+      Workers LISTEN and push the events to WebSocket/SSE clients.
+    """
+    op.execute("""
+        CREATE FUNCTION tasks_notify() RETURNS trigger LANGUAGE plpgsql AS $$
+        DECLARE
+            change record;
+        BEGIN
+            FOR change IN
+                SELECT company_id, user_id, count(*) AS total, (array_agg(id))[1:50] AS ids
+                FROM changed_tasks
+                GROUP BY company_id, user_id
+            LOOP
+                PERFORM pg_notify('task_events', json_build_object(
+                    'type', CASE TG_OP
+                        WHEN 'INSERT' THEN 'tasks.created'
+                        WHEN 'UPDATE' THEN 'tasks.updated'
+                        ELSE 'tasks.deleted'
+                    END,
+                    'company_id', change.company_id,
+                    'user_id', change.user_id,
+                    'count', change.total,
+                    'ids', CASE WHEN change.total <= 50 THEN change.ids END
+                )::text);
+            END LOOP;
+            RETURN NULL;
+        END
+        $$
+    """)
+    for operation, row in OPERATIONS.items():
+        op.execute(f"""
+            CREATE TRIGGER tasks_notify_{operation}
+            AFTER {operation.upper()} ON tasks
+            REFERENCING {row} TABLE AS changed_tasks
+            FOR EACH STATEMENT EXECUTE FUNCTION tasks_notify()
+        """)
+
+
+def downgrade() -> None:
+    for operation in OPERATIONS:
+        op.execute(f"DROP TRIGGER tasks_notify_{operation} ON tasks")
+    op.execute("DROP FUNCTION tasks_notify()")
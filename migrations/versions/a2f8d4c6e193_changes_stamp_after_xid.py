@@ -0,0 +1,71 @@
+"""changes stamp after xid
+
+Revision ID: a2f8d4c6e193
+Revises: e5f2a8c4d716
+Create Date: 2026-10-19 12:41:08.559203
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a2f8d4c6e193'
+down_revision: Union[str, Sequence[str], None] = 'e5f2a8c4d716'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """
+      The GET /todos/changes watermark now only waits for transactions that
+      hold a transaction id, i.e. ones that wrote; idle or long readers such
+      as a streamed export no longer stall delta sync. For that, a task's
+      updated_at and a tombstone's deleted_at are stamped with
+      clock_timestamp() once the writing transaction has its id, instead of
+      the transaction's start time.
+    """
+    op.execute("""
+        CREATE OR REPLACE FUNCTION tasks_touch() RETURNS trigger LANGUAGE plpgsql AS $$
+        BEGIN
+            -- Assigns the transaction id first, so the watermark already
+            -- waits for this transaction when the stamp is taken
+            PERFORM txid_current();
+            NEW.updated_at := clock_timestamp();
+            RETURN NEW;
+        END
+        $$
+    """)
+    op.execute("""
+        CREATE OR REPLACE FUNCTION tasks_tombstone() RETURNS trigger LANGUAGE plpgsql AS $$
+        BEGIN
+            INSERT INTO task_tombstones (id, user_id, company_id, deleted_at)
+            SELECT id, user_id, company_id, clock_timestamp() FROM deleted_tasks
+            ON CONFLICT (id) DO UPDATE SET deleted_at = excluded.deleted_at;
+            RETURN NULL;
+        END
+        $$
+    """)
+
+
+def downgrade() -> None:
+    op.execute("""
+        CREATE OR REPLACE FUNCTION tasks_tombstone() RETURNS trigger LANGUAGE plpgsql AS $$
+        BEGIN
+            INSERT INTO task_tombstones (id, user_id, company_id)
+            SELECT id, user_id, company_id FROM deleted_tasks
+            ON CONFLICT (id) DO UPDATE SET deleted_at = excluded.deleted_at;
+            RETURN NULL;
+        END
+        $$
+    """)
+    op.execute("""
+        CREATE OR REPLACE FUNCTION tasks_touch() RETURNS trigger LANGUAGE plpgsql AS $$
+        BEGIN
+            NEW.updated_at := now();
+            RETURN NEW;
+        END
+        $$
+    """)
@@ -0,0 +1,38 @@
+"""drop replica pins
+
+Revision ID: b4e9c1f7a305
+Revises: a2f8d4c6e193
+Create Date: 2026-10-19 13:52:36.184027
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b4e9c1f7a305'
+down_revision: Union[str, Sequence[str], None] = 'a2f8d4c6e193'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """
+      Read-your-writes pins now travel with the client (a signed cookie or
+      header naming the write's transaction id) and are checked against
+      each replica's snapshot, so reads no longer look them up on the
+      primary.
+    """
+    op.drop_table("replica_pins")
+
+
+def downgrade() -> None:
+    op.create_table(
+        "replica_pins",
+        sa.Column("user_id", postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column("pinned_until", sa.DateTime(timezone=True), nullable=False),
+        prefixes=["UNLOGGED"],
+    )
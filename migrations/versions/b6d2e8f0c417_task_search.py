@@ -0,0 +1,64 @@
+"""task search
+
+Revision ID: b6d2e8f0c417
+Revises: 8c2d6f4b1a73
+Create Date: 2026-10-18 23:02:37.214590
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b6d2e8f0c417'
+down_revision: Union[str, Sequence[str], None] = '8c2d6f4b1a73'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """
+      GET /todos/search: a stored tsvector over title (weight A) and content
+      (weight B) with a GIN index. Adding the column rewrites tasks under an
+      ACCESS EXCLUSIVE lock, so run it in a maintenance window on big tables.
+
+      Substring search uses a pg_trgm GIN index when the extension can be
+      installed; without it the same ILIKE query still works, scanning the
+      caller's tasks instead.
+    """
+    op.add_column(
+        "tasks",
+        sa.Column(
+            "search",
+            postgresql.TSVECTOR(),
+            sa.Computed(
+                "setweight(to_tsvector('english'::regconfig, title), 'A') || "
+                "setweight(to_tsvector('english'::regconfig, content), 'B')",
+                persisted=True,
+            ),
+            nullable=True,
+        ),
+    )
+    op.create_index("ix_tasks_search", "tasks", ["search"], postgresql_using="gin")
+    op.execute("""
+        DO $$
+        BEGIN
+            IF EXISTS (SELECT FROM pg_available_extensions WHERE name = 'pg_trgm') THEN
+                CREATE EXTENSION IF NOT EXISTS pg_trgm;
+                CREATE INDEX ix_tasks_text_trgm ON tasks
+                    USING gin ((title || ' ' || content) gin_trgm_ops);
+            ELSE
+                RAISE NOTICE 'pg_trgm is not available: substring search runs without an index';
+            END IF;
+        END
+        $$
+    """)
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS ix_tasks_text_trgm")
+    op.drop_index("ix_tasks_search", table_name="tasks", postgresql_using="gin")
+    op.drop_column("tasks", "search")
@@ -0,0 +1,46 @@
+"""user and company timestamp defaults
+
+Revision ID: b81e4d2c6a90
+Revises: 7f3a9c1d2b4e
+Create Date: 2026-10-18 14:03:27.581902
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b81e4d2c6a90'
+down_revision: Union[str, Sequence[str], None] = '7f3a9c1d2b4e'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TABLES = ("companies", "users")
+
+
+def upgrade() -> None:
+    """
+      Writes read timestamps back via RETURNING, so the database must fill them
+    """
+    for table in TABLES:
+        for column in ("created_at", "updated_at"):
+            op.alter_column(
+                table, column,
+                type_=sa.DateTime(timezone=True),
+                server_default=sa.func.now(),
+            )
+            op.execute(f"UPDATE {table} SET {column} = now() WHERE {column} IS NULL")
+            op.alter_column(table, column, nullable=False)
+
+
+def downgrade() -> None:
+    for table in reversed(TABLES):
+        for column in ("updated_at", "created_at"):
+            op.alter_column(
+                table, column,
+                type_=sa.DateTime(),
+                server_default=None,
+                nullable=True,
+            )
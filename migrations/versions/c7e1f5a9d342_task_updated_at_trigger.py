@@ -0,0 +1,44 @@
+"""task updated_at trigger
+
+Revision ID: c7e1f5a9d342
+Revises: a4c8e2f6b913
+Create Date: 2026-10-19 09:12:44.518730
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c7e1f5a9d342'
+down_revision: Union[str, Sequence[str], None] = 'a4c8e2f6b913'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """
+      GET /todos/changes pages on updated_at behind a watermark of the oldest
+      open transaction, so updated_at must be the writing transaction's
+      now(). Any value sent by a client, an import or a bulk write used to be
+      stored as is, and a backdated row fell behind clients' since tokens.
+    """
+    op.execute("""
+        CREATE FUNCTION tasks_touch() RETURNS trigger LANGUAGE plpgsql AS $$
+        BEGIN
+            NEW.updated_at := now();
+            RETURN NEW;
+        END
+        $$
+    """)
+    op.execute("""
+        CREATE TRIGGER tasks_touch
+        BEFORE INSERT OR UPDATE ON tasks
+        FOR EACH ROW EXECUTE FUNCTION tasks_touch()
+    """)
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER tasks_touch ON tasks")
+    op.execute("DROP FUNCTION tasks_touch()")
@@ -0,0 +1,35 @@
+"""drop redundant indexes
+
+Revision ID: d4f07a3e91c5
+Revises: b81e4d2c6a90
+Create Date: 2026-10-18 16:40:12.309457
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd4f07a3e91c5'
+down_revision: Union[str, Sequence[str], None] = 'b81e4d2c6a90'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """
+      The id indexes duplicate the primary keys and ix_tasks_company_id is a
+      prefix of ix_tasks_company_created_id; each one only slows down writes
+    """
+    op.drop_index("ix_tasks_company_id", table_name="tasks")
+    op.drop_index("ix_tasks_id", table_name="tasks")
+    op.drop_index("ix_users_id", table_name="users")
+    op.drop_index("ix_companies_id", table_name="companies")
+
+
+def downgrade() -> None:
+    op.create_index("ix_companies_id", "companies", ["id"], unique=False)
+    op.create_index("ix_users_id", "users", ["id"], unique=False)
+    op.create_index("ix_tasks_id", "tasks", ["id"], unique=False)
+    op.create_index("ix_tasks_company_id", "tasks", ["company_id"], unique=False)
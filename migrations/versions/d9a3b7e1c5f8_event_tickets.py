@@ -0,0 +1,38 @@
+"""event tickets
+
+Revision ID: d9a3b7e1c5f8
+Revises: c7e1f5a9d342
+Create Date: 2026-10-19 10:03:27.904512
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd9a3b7e1c5f8'
+down_revision: Union[str, Sequence[str], None] = 'c7e1f5a9d342'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """
+      Single-use tickets for /todos/events, replacing ?token= so bearer
+      tokens stay out of URLs and access logs. Redeeming one is a DELETE by
+      primary key, so it works on any worker and only once.
+    """
+    op.create_table(
+        "event_tickets",
+        sa.Column("ticket_hash", sa.LargeBinary(), primary_key=True),
+        sa.Column("user_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("users.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("expires_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("session_expires_at", sa.DateTime(timezone=True), nullable=False),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("event_tickets")
@@ -0,0 +1,95 @@
+"""task counters
+
+Revision ID: e3a9c5d71b28
+Revises: b6d2e8f0c417
+Create Date: 2026-10-18 23:48:52.607314
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e3a9c5d71b28'
+down_revision: Union[str, Sequence[str], None] = 'b6d2e8f0c417'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Rows are upserted in key order so concurrent bulk statements lock them in
+# the same order and cannot deadlock
+APPLY_DELTAS = """
+    INSERT INTO task_counters (company_id, user_id, total, completed)
+    SELECT company_id, user_id, sum(total), sum(completed)
+    FROM ({deltas}) AS deltas
+    GROUP BY company_id, user_id
+    HAVING sum(total) <> 0 OR sum(completed) <> 0
+    ORDER BY company_id, user_id
+    ON CONFLICT (company_id, user_id) DO UPDATE
+    SET total = task_counters.total + excluded.total,
+        completed = task_counters.completed + excluded.completed;
+"""
+ADDED = "SELECT company_id, user_id, 1 AS total, (is_completed IS TRUE)::int AS completed FROM {table}"
+REMOVED = "SELECT company_id, user_id, -1 AS total, -(is_completed IS TRUE)::int AS completed FROM {table}"
+
+
+def upgrade() -> None:
+    """
+      GET /todos/stats reads per (company, user) counters instead of counting
+      tasks. Statement-level triggers apply one aggregated delta per owner and
+      statement, so bulk writes touch each counter row once and edits that
+      leave is_completed alone touch none. The counters are backfilled here;
+      scripts/reconcile_task_counters.py repairs drift (e.g. after TRUNCATE
+      or a restore with triggers disabled).
+    """
+    op.create_table(
+        "task_counters",
+        sa.Column("company_id", postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column("user_id", postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column("total", sa.BigInteger(), nullable=False, server_default="0"),
+        sa.Column("completed", sa.BigInteger(), nullable=False, server_default="0"),
+    )
+    op.execute(f"""
+        CREATE FUNCTION tasks_count() RETURNS trigger LANGUAGE plpgsql AS $$
+        BEGIN
+            IF TG_OP = 'INSERT' THEN
+                {APPLY_DELTAS.format(deltas=ADDED.format(table="new_tasks"))}
+            ELSIF TG_OP = 'DELETE' THEN
+                {APPLY_DELTAS.format(deltas=REMOVED.format(table="old_tasks"))}
+            ELSE
+                {APPLY_DELTAS.format(deltas=ADDED.format(table="new_tasks") + " UNION ALL " + REMOVED.format(table="old_tasks"))}
+            END IF;
+            RETURN NULL;
+        END
+        $$
+    """)
+    op.execute("""
+        CREATE TRIGGER tasks_count_insert AFTER INSERT ON tasks
+        REFERENCING NEW TABLE AS new_tasks
+        FOR EACH STATEMENT EXECUTE FUNCTION tasks_count()
+    """)
+    op.execute("""
+        CREATE TRIGGER tasks_count_update AFTER UPDATE ON tasks
+        REFERENCING OLD TABLE AS old_tasks NEW TABLE AS new_tasks
+        FOR EACH STATEMENT EXECUTE FUNCTION tasks_count()
+    """)
+    op.execute("""
+        CREATE TRIGGER tasks_count_delete AFTER DELETE ON tasks
+        REFERENCING OLD TABLE AS old_tasks
+        FOR EACH STATEMENT EXECUTE FUNCTION tasks_count()
+    """)
+    op.execute("""
+        INSERT INTO task_counters (company_id, user_id, total, completed)
+        SELECT company_id, user_id, count(*), count(*) FILTER (WHERE is_completed)
+        FROM tasks
+        GROUP BY company_id, user_id
+    """)
+
+
+def downgrade() -> None:
+    for operation in ("insert", "update", "delete"):
+        op.execute(f"DROP TRIGGER tasks_count_{operation} ON tasks")
+    op.execute("DROP FUNCTION tasks_count()")
+    op.drop_table("task_counters")
@@ -0,0 +1,38 @@
+"""replica pins
+
+Revision ID: e5f2a8c4d716
+Revises: d9a3b7e1c5f8
+Create Date: 2026-10-19 11:24:51.306718
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e5f2a8c4d716'
+down_revision: Union[str, Sequence[str], None] = 'd9a3b7e1c5f8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """
+      Read-your-writes pins shared by every worker: a user who committed a
+      write reads from the primary until pinned_until. Keyed by user id, so
+      the pin survives a token refresh. UNLOGGED: losing the pins in a
+      crash only sends a few reads to a replica early.
+    """
+    op.create_table(
+        "replica_pins",
+        sa.Column("user_id", postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column("pinned_until", sa.DateTime(timezone=True), nullable=False),
+        prefixes=["UNLOGGED"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("replica_pins")
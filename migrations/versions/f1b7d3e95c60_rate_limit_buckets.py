@@ -0,0 +1,57 @@
+"""rate limit buckets
+
+Revision ID: f1b7d3e95c60
+Revises: e3a9c5d71b28
+Create Date: 2026-10-19 00:37:15.882041
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f1b7d3e95c60'
+down_revision: Union[str, Sequence[str], None] = 'e3a9c5d71b28'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """
+      Shared token buckets for RATE_LIMIT_BACKEND=postgres. Each row is the
+      epoch second at which its bucket is full again; rate_limit_take spends
+      tokens in one round trip and returns 0 or the seconds to wait.
+      UNLOGGED: losing the buckets in a crash only resets the limits.
+    """
+    op.create_table(
+        "rate_limit_buckets",
+        sa.Column("key", sa.Text(), primary_key=True),
+        sa.Column("full_at", sa.Float(precision=53), nullable=False),
+        prefixes=["UNLOGGED"],
+    )
+    op.execute("""
+        CREATE FUNCTION rate_limit_take(bucket_key text, cost float8, token_interval float8, period float8)
+        RETURNS float8 LANGUAGE plpgsql AS $$
+        DECLARE
+            now_s float8 := extract(epoch FROM clock_timestamp());
+            next_full_at float8;
+        BEGIN
+            INSERT INTO rate_limit_buckets (key, full_at) VALUES (bucket_key, now_s)
+            ON CONFLICT (key) DO NOTHING;
+            SELECT greatest(full_at, now_s) + cost * token_interval INTO next_full_at
+            FROM rate_limit_buckets WHERE key = bucket_key FOR UPDATE;
+            IF next_full_at - now_s > period THEN
+                RETURN next_full_at - now_s - period;
+            END IF;
+            UPDATE rate_limit_buckets SET full_at = next_full_at WHERE key = bucket_key;
+            RETURN 0;
+        END
+        $$
+    """)
+
+
+def downgrade() -> None:
+    op.execute("DROP FUNCTION rate_limit_take(text, float8, float8, float8)")
+    op.drop_table("rate_limit_buckets")
@@ -0,0 +1,74 @@
+"""Stream a CSV or NDJSON file into POST /todos/import.
+
+    python -m scripts.import_tasks tasks.csv --base-url http://127.0.0.1:8000 \\
+        --username admin --password admin@123
+
+Upload progress goes to stderr, the import result is printed as JSON.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+import time
+from typing import Iterator
+
+import httpx
+
+CHUNK_SIZE = 1 << 20
+
+
+def file_chunks(path: str, total: int) -> Iterator[bytes]:
+    sent = 0
+    started = last_report = time.perf_counter()
+    with open(path, "rb") as f:
+        while chunk := f.read(CHUNK_SIZE):
+            sent += len(chunk)
+            yield chunk
+            now = time.perf_counter()
+            if now - last_report >= 0.5 or sent == total:
+                last_report = now
+                rate = sent / (now - started) / (1 << 20) if now > started else 0.0
+                print(
+                    f"\rsent {sent / (1 << 20):.1f}/{total / (1 << 20):.1f} MiB "
+                    f"({sent * 100 // max(total, 1)}%) {rate:.1f} MiB/s",
+                    end="", file=sys.stderr, flush=True,
+                )
+    print(file=sys.stderr)
+
+
+def import_file(base_url: str, username: str, password: str, path: str, fmt: str) -> dict:
+    with httpx.Client(base_url=base_url, timeout=None) as client:
+        resp = client.post("/auth/login", data={"username": username, "password": password})
+        resp.raise_for_status()
+        headers = {
+            "Authorization": f"Bearer {resp.json()['access_token']}",
+            "Content-Type": "text/csv" if fmt == "csv" else "application/x-ndjson",
+        }
+        resp = client.post(
+            "/todos/import",
+            params={"format": fmt},
+            content=file_chunks(path, os.path.getsize(path)),
+            headers=headers,
+        )
+        resp.raise_for_status()
+        return resp.json()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("path")
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--username", required=True)
+    parser.add_argument("--password", required=True)
+    parser.add_argument("--format", choices=["ndjson", "csv"], help="default: from the file extension")
+    args = parser.parse_args()
+
+    fmt = args.format or ("csv" if args.path.lower().endswith(".csv") else "ndjson")
+    result = import_file(args.base_url, args.username, args.password, args.path, fmt)
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
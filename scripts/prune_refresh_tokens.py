@@ -0,0 +1,15 @@
+"""Delete expired refresh tokens (REFRESH_TOKEN_EXPIRE_DAYS after issue).
+
+Run it daily, e.g. from cron:
+
+    python -m scripts.prune_refresh_tokens
+"""
+from __future__ import annotations
+
+from app.core.database import LocalSession
+from app.services.auth import prune_refresh_tokens
+
+
+if __name__ == "__main__":
+    with LocalSession() as db:
+        print(f"Pruned {prune_refresh_tokens(db)} refresh tokens")
@@ -0,0 +1,15 @@
+"""Delete task tombstones older than TASKS_TOMBSTONE_RETENTION_DAYS.
+
+Run it daily, e.g. from cron:
+
+    python -m scripts.prune_tombstones
+"""
+from __future__ import annotations
+
+from app.core.database import LocalSession
+from app.services.task import prune_tombstones
+
+
+if __name__ == "__main__":
+    with LocalSession() as db:
+        print(f"Pruned {prune_tombstones(db)} task tombstones")
@@ -0,0 +1,23 @@
+"""Recount tasks and repair drifted task_counters rows behind GET /todos/stats.
+
+The counters are kept by triggers, so drift only follows writes that bypass
+them (TRUNCATE, restores with triggers disabled). Run it after such
+maintenance or periodically, e.g. nightly from cron:
+
+    python -m scripts.reconcile_task_counters [--company-id <uuid>]
+"""
+from __future__ import annotations
+
+import argparse
+from uuid import UUID
+
+from app.core.database import LocalSession
+from app.services.task import reconcile_task_counters
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--company-id", type=UUID, help="only this company (default: all)")
+    args = parser.parse_args()
+    with LocalSession() as db:
+        print(f"Repaired {reconcile_task_counters(db, args.company_id)} task counters")
@@ -6,6 +6,12 @@ client = TestClient(app)
 
 AUTH_URL = "/auth/login"
 
+# Every test starts with full rate-limit buckets
+@pytest.fixture(autouse=True)
+def reset_rate_limits():
+    from app.core.rate_limit import buckets
+    buckets.clear()
+
 @pytest.fixture
 def test_client():
   with TestClient(app) as client:
@@ -41,4 +47,23 @@ def admin_headers(admin_token):
 
 @pytest.fixture
 def non_admin_headers(non_admin_token):
-    return {"Authorization": f"Bearer {non_admin_token}"}
\ No newline at end of file
+    return {"Authorization": f"Bearer {non_admin_token}"}
+
+# SQL statements sent by the app while the fixture is active
+@pytest.fixture
+def sql_statements():
+    from sqlalchemy import event
+    from app.core.database import async_engine, engine
+
+    statements = []
+    # With DB_ASYNC_ENABLED the async routes send theirs through async_engine
+    engines = [engine] if async_engine is None else [engine, async_engine.sync_engine]
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    for target in engines:
+        event.listen(target, "before_cursor_execute", record)
+    yield statements
+    for target in engines:
+        event.remove(target, "before_cursor_execute", record)
@@ -1,29 +1,36 @@
+import time
+
 import pytest
 from uuid import uuid4
 
-from jose import JWTError
-
+from app.core import security as security_module
+from app.core.security import InvalidTokenError, create_access_token
 from app.services import auth as auth_module
 from app.services.auth import (
     _decode_token,
     ensure_active,
     ensure_same_company,
     get_current_user,
+    principal_cache,
+    token_cache,
 )
 
 
 class StubUser:
-    def __init__(self, user_id, is_active=True, company_id=None):
+    def __init__(self, user_id, is_active=True, company_id=None, is_admin=False):
         self.id = user_id
         self.is_active = is_active
         self.company_id = company_id
+        self.is_admin = is_admin
 
 
 class StubDB:
     def __init__(self, user=None):
         self._user = user
+        self.calls = 0
 
     def get(self, model, user_id):
+        self.calls += 1
         # Return the configured stub user if ids match; else None
         if self._user and str(self._user.id) == str(user_id):
             return self._user
@@ -31,6 +38,15 @@ class StubDB:
 
 
 # Helpers / fixtures
+@pytest.fixture(autouse=True)
+def clear_auth_caches():
+    principal_cache.clear()
+    token_cache.clear()
+    yield
+    principal_cache.clear()
+    token_cache.clear()
+
+
 @pytest.fixture
 def active_user():
     return StubUser(user_id=uuid4(), is_active=True, company_id=uuid4())
@@ -52,13 +68,17 @@ def empty_db():
 
 
 def set_jwt_decode(monkeypatch, *, payload=None, error: Exception | None = None):
+    calls = []
     if error is not None:
-        def fake_decode(token, key, algorithms):
+        def fake_decode(token):
+            calls.append(token)
             raise error
     else:
-        def fake_decode(token, key, algorithms):
+        def fake_decode(token):
+            calls.append(token)
             return payload
-    monkeypatch.setattr(auth_module.jwt, "decode", fake_decode)
+    monkeypatch.setattr(auth_module, "decode_access_token", fake_decode)
+    return calls
 
 
 def test_decode_token_valid(monkeypatch):
@@ -68,13 +88,50 @@ def test_decode_token_valid(monkeypatch):
 
 
 def test_decode_token_invalid_raises_credentials(monkeypatch):
-    set_jwt_decode(monkeypatch, error=JWTError("bad token"))
+    set_jwt_decode(monkeypatch, error=InvalidTokenError("bad token"))
     with pytest.raises(Exception) as excinfo:
         _decode_token("token123")
     # HTTPException with 401 is raised (CredentialsEx)
     assert getattr(excinfo.value, "status_code", None) == 401
 
 
+def test_decode_token_caches_verified_claims(monkeypatch):
+    payload = {"sub": str(uuid4()), "exp": time.time() + 60}
+    calls = set_jwt_decode(monkeypatch, payload=payload)
+    assert _decode_token("token123") == payload
+    assert _decode_token("token123") == payload
+    assert len(calls) == 1
+    assert token_cache.snapshot()["hits"] == 1
+
+
+def test_decode_token_does_not_cache_expired_or_without_exp(monkeypatch):
+    calls = set_jwt_decode(monkeypatch, payload={"sub": str(uuid4()), "exp": time.time() - 1})
+    _decode_token("token123")
+    _decode_token("token123")
+    assert len(calls) == 2
+
+    calls = set_jwt_decode(monkeypatch, payload={"sub": str(uuid4())})
+    _decode_token("token456")
+    _decode_token("token456")
+    assert len(calls) == 2
+
+
+@pytest.mark.parametrize("backend", ["jose", "pyjwt"])
+def test_jwt_backends_round_trip(monkeypatch, backend):
+    if backend == "pyjwt":
+        pytest.importorskip("jwt")
+    monkeypatch.setattr(security_module, "jwt_backend", security_module.get_jwt_backend(backend))
+    token = create_access_token("user-1", extra_claims={"company_id": "c-1"})
+    claims = _decode_token(token)
+    assert claims["sub"] == "user-1"
+    assert claims["company_id"] == "c-1"
+    assert claims["type"] == "access"
+
+    with pytest.raises(Exception) as excinfo:
+        _decode_token(token[:-2] + "xx")
+    assert getattr(excinfo.value, "status_code", None) == 401
+
+
 def test_ensure_active_allows_active_user(active_user):
     # Should not raise
     ensure_active(active_user)
@@ -103,7 +160,31 @@ def test_get_current_user_success(monkeypatch, active_user):
     set_jwt_decode(monkeypatch, payload=payload)
     db = StubDB(user=active_user)
     current_user = get_current_user(token="token123", db=db)
-    assert current_user is active_user
+    assert current_user.id == active_user.id
+    assert current_user.company_id == active_user.company_id
+    assert current_user.is_active is True
+
+
+def test_get_current_user_uses_principal_cache(monkeypatch, active_user):
+    payload = {"sub": str(active_user.id), "company_id": str(active_user.company_id)}
+    set_jwt_decode(monkeypatch, payload=payload)
+    db = StubDB(user=active_user)
+    first = get_current_user(token="token123", db=db)
+    second = get_current_user(token="token123", db=db)
+    assert first == second
+    assert db.calls == 1
+    assert principal_cache.snapshot()["hits"] == 1
+
+
+def test_get_current_user_after_invalidate_reloads(monkeypatch, active_user, inactive_user):
+    payload = {"sub": str(active_user.id), "company_id": str(active_user.company_id)}
+    set_jwt_decode(monkeypatch, payload=payload)
+    get_current_user(token="token123", db=StubDB(user=active_user))
+
+    principal_cache.invalidate(active_user.id)
+    with pytest.raises(Exception) as excinfo:
+        get_current_user(token="token123", db=StubDB(user=inactive_user))
+    assert getattr(excinfo.value, "status_code", None) == 403
 
 
 def test_get_current_user_raises_for_missing_sub(monkeypatch, empty_db):
@@ -0,0 +1,48 @@
+from app.core import cache as cache_module
+from app.core.cache import TTLCache
+
+
+def test_get_set_and_counters():
+    cache = TTLCache(maxsize=10, ttl=60)
+    assert cache.get("a") is None
+    cache.set("a", 1)
+    assert cache.get("a") == 1
+    snapshot = cache.snapshot()
+    assert snapshot["hits"] == 1
+    assert snapshot["misses"] == 1
+    assert snapshot["size"] == 1
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = TTLCache(maxsize=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+
+
+def test_entries_expire(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(cache_module.time, "monotonic", lambda: now[0])
+    cache = TTLCache(maxsize=10, ttl=5)
+    cache.set("a", 1)
+    cache.set("b", 2, ttl=1)
+    now[0] += 2
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+    now[0] += 4
+    assert cache.get("a") is None
+
+
+def test_invalidate_and_disabled_cache():
+    cache = TTLCache(maxsize=10, ttl=60)
+    cache.set("a", 1)
+    cache.invalidate("a")
+    assert cache.get("a") is None
+
+    disabled = TTLCache(maxsize=10, ttl=0)
+    disabled.set("a", 1)
+    assert disabled.get("a") is None
@@ -0,0 +1,163 @@
+import sqlite3
+from uuid import uuid4
+
+import pytest
+from sqlalchemy import delete, exc, make_url, text
+
+import app.core.database as database
+from app.models.task import TaskTombstone
+
+def test_engine_options_follow_pool_settings(monkeypatch):
+    monkeypatch.setattr(database, "DB_POOL_SIZE", 20)
+    monkeypatch.setattr(database, "DB_POOL_PRE_PING", False)
+
+    options = database.engine_options()
+    assert options["poolclass"] is database.InstrumentedQueuePool
+    assert options["pool_size"] == 20
+    assert options["pool_pre_ping"] is False
+    assert "connect_args" not in options
+
+def test_pgbouncer_mode_disables_asyncpg_statement_caches(monkeypatch):
+    monkeypatch.setattr(database, "DB_PGBOUNCER", True)
+
+    assert "connect_args" not in database.engine_options()
+    connect_args = database.engine_options(is_async=True)["connect_args"]
+    assert connect_args["statement_cache_size"] == 0
+    assert connect_args["prepared_statement_cache_size"] == 0
+    name_func = connect_args["prepared_statement_name_func"]
+    assert name_func() != name_func()
+
+def test_pool_snapshot_tracks_checkouts_and_timeouts():
+    pool = database.InstrumentedQueuePool(
+        lambda: sqlite3.connect(":memory:"), pool_size=2, max_overflow=0, timeout=0.05,
+    )
+    conns = [pool.connect(), pool.connect()]
+    with pytest.raises(exc.TimeoutError):
+        pool.connect()
+
+    snapshot = pool.snapshot()
+    assert snapshot["checked_out"] == 2
+    assert snapshot["timeouts"] == 1
+    assert snapshot["wait"]["count"] == 3
+    assert snapshot["wait"]["max_ms"] >= 50
+
+    for conn in conns:
+        conn.close()
+    assert pool.snapshot()["checked_in"] == 2
+
+@pytest.fixture
+def replica_set(monkeypatch):
+    # The primary doubles as a replica (not in recovery, so zero lag)
+    url = make_url(database.SQLALCHEMY_DATABASE_URL).set(host="127.0.0.1")
+    replica_set = database.ReplicaSet(
+        [url.render_as_string(hide_password=False)], max_lag=5, check_interval=60, pin_seconds=60,
+    )
+    monkeypatch.setattr(database, "replicas", replica_set)
+    yield replica_set
+    for replica in replica_set.replicas:
+        replica.engine.dispose()
+
+def test_replicas_serve_reads_only_after_a_healthy_check(replica_set):
+    assert replica_set.choose(None) is None
+
+    replica_set.check()
+    replica = replica_set.replicas[0]
+    assert replica.healthy and replica.lag == 0
+    assert replica_set.choose(None) is replica
+
+    replica_set.max_lag = -1
+    replica_set.check()
+    assert replica_set.choose(None) is None
+
+def test_routing_session_sends_safe_requests_to_replica(replica_set):
+    replica_set.check()
+    replica = replica_set.replicas[0]
+
+    with database.LocalSession(info={"read_only": True, "pin": None}) as db:
+        assert db.get_bind() is replica.engine
+        assert db.execute(text("SELECT 1")).scalar() == 1
+    with database.LocalSession(info={"read_only": False, "pin": None}) as db:
+        assert db.get_bind() is database.engine
+    with database.LocalSession() as db:
+        assert db.get_bind() is database.engine
+
+def test_commit_pins_reads_until_a_replica_replays_it(replica_set):
+    replica_set.check()
+    written = {}
+
+    with database.LocalSession(info={"read_only": False, "written": written}) as db:
+        db.execute(text("SELECT pg_current_xact_id()"))
+        db.commit()
+    with database.LocalSession(info={"read_only": False, "written": written}) as db:
+        # Nothing written: no transaction id, the pin stays
+        db.execute(text("SELECT 1"))
+        db.commit()
+    xid = written["xid"]
+
+    # The replica's last check predates the write
+    with database.LocalSession(info={"read_only": True, "pin": xid}) as db:
+        assert db.get_bind() is database.engine
+    with database.LocalSession(info={"read_only": True, "pin": None}) as db:
+        assert db.get_bind() is replica_set.replicas[0].engine
+
+    replica_set.check()
+    assert replica_set.replicas[0].has_replayed(xid)
+    with database.LocalSession(info={"read_only": True, "pin": xid}) as db:
+        assert db.get_bind() is replica_set.replicas[0].engine
+
+def test_replica_snapshot_visibility():
+    replica = database.Replica.__new__(database.Replica)
+    replica.replayed = database._parse_snapshot("100:105:101,103")
+    assert [xid for xid in range(98, 107) if replica.has_replayed(xid)] == [98, 99, 100, 102, 104]
+    replica.replayed = None
+    assert not replica.has_replayed(1)
+
+def test_pins_are_signed():
+    pin = database.encode_pin(12345)
+    assert database.decode_pin(pin) == 12345
+    assert database.decode_pin(pin.replace("12345", "99999")) is None
+    assert database.decode_pin("12345") is None
+    assert database.decode_pin(None) is None
+
+def test_write_response_pins_later_reads(replica_set, sql_statements):
+    from fastapi import Depends, FastAPI
+    from fastapi.testclient import TestClient
+
+    pinned_app = FastAPI()
+    pinned_app.add_middleware(database.ReadYourWritesMiddleware)
+
+    probe = TaskTombstone(id=uuid4(), user_id=uuid4(), company_id=uuid4())
+
+    # A pending ORM change, only flushed by the commit
+    @pinned_app.post("/write")
+    def write(db=Depends(database.get_db_context)):
+        db.add(probe)
+        db.commit()
+
+    @pinned_app.get("/read")
+    def read(db=Depends(database.get_db_context)):
+        db.execute(text("SELECT 1"))
+        return {"replica": db.info["replica"] is not None}
+
+    replica_set.check()
+    with TestClient(pinned_app) as client:
+        response = client.post("/write")
+        pin = response.headers[database.PIN_HEADER]
+        assert database.decode_pin(pin) is not None
+        assert f"{database.PIN_COOKIE}={pin}" in response.headers["set-cookie"]
+
+        # The cookie comes back by itself; so would the header
+        assert client.get("/read").json() == {"replica": False}
+        client.cookies.clear()
+        assert client.get("/read", headers={database.PIN_HEADER: pin}).json() == {"replica": False}
+
+        replica_set.check()
+        sql_statements.clear()
+        assert client.get("/read").json() == {"replica": True}
+        assert client.get("/read", headers={database.PIN_HEADER: pin}).json() == {"replica": True}
+        # Routing a pinned read costs the primary nothing
+        assert sql_statements == []
+
+    with database.LocalSession() as db:
+        db.execute(delete(TaskTombstone).where(TaskTombstone.id == probe.id))
+        db.commit()
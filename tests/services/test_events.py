@@ -0,0 +1,98 @@
+import asyncio
+import json
+import math
+import time
+from types import SimpleNamespace
+
+from app.routers import events as events_router
+from app.services.events import RESYNC, TaskEvent, TaskEventHub
+
+COMPANY = "c1"
+
+def _principal(user_id: str, is_admin: bool = False):
+    return SimpleNamespace(id=user_id, company_id=COMPANY, is_admin=is_admin)
+
+def _event(user_id: str, company_id: str = COMPANY) -> TaskEvent:
+    return TaskEvent(company_id, user_id, json.dumps({"type": "tasks.created", "user_id": user_id}))
+
+def _drain(subscriber) -> list[TaskEvent]:
+    events = []
+    while not subscriber.queue.empty():
+        events.append(subscriber.queue.get_nowait())
+    return events
+
+def test_hub_routes_by_company_and_user():
+    async def scenario():
+        hub = TaskEventHub(queue_size=10)
+        alice, bob, admin = hub.subscribe(_principal("a")), hub.subscribe(_principal("b")), hub.subscribe(_principal("x", True))
+        hub.publish(_event("a"))
+        hub.publish(_event("a", company_id="other"))
+        assert [event.user_id for event in _drain(alice)] == ["a"]
+        assert _drain(bob) == []
+        assert [event.user_id for event in _drain(admin)] == ["a"]
+
+        hub.unsubscribe(alice)
+        hub.unsubscribe(bob)
+        hub.unsubscribe(admin)
+        assert hub.count() == 0 and not hub.subscribers
+    asyncio.run(scenario())
+
+def test_slow_subscriber_is_coalesced_to_one_resync():
+    async def scenario():
+        hub = TaskEventHub(queue_size=3)
+        slow = hub.subscribe(_principal("a"))
+        for _ in range(10):
+            hub.publish(_event("a"))
+        # Never more than queue_size events held, and the loss is signalled
+        assert slow.queue.qsize() <= 3
+        assert RESYNC in _drain(slow)
+        assert hub.coalesced >= 1
+    asyncio.run(scenario())
+
+def test_malformed_payload_is_ignored():
+    async def scenario():
+        hub = TaskEventHub(queue_size=3)
+        subscriber = hub.subscribe(_principal("a"))
+        hub.publish_payload("not json")
+        hub.publish_payload(json.dumps({"company_id": COMPANY}))
+        hub.publish_payload(json.dumps({"company_id": COMPANY, "user_id": "a", "type": "tasks.deleted"}))
+        assert [json.loads(event.data)["type"] for event in _drain(subscriber)] == ["tasks.deleted"]
+    asyncio.run(scenario())
+
+def test_event_stream_frames_and_heartbeats(monkeypatch):
+    hub = TaskEventHub(queue_size=3)
+    monkeypatch.setattr(events_router, "task_events", hub)
+    monkeypatch.setattr(events_router, "EVENTS_HEARTBEAT_SECONDS", 0.01)
+
+    monkeypatch.setattr(events_router, "principal_for_user", lambda user_id: _principal(user_id))
+
+    async def scenario():
+        stream = events_router._event_stream(_principal("a"), math.inf)
+        assert await anext(stream) == ": connected\n\n"
+        assert await anext(stream) == ": heartbeat\n\n"
+        event = _event("a")
+        hub.publish(event)
+        assert await anext(stream) == f"data: {event.data}\n\n"
+        await stream.aclose()
+        assert hub.count() == 0
+    asyncio.run(scenario())
+
+def test_event_stream_ends_when_access_changes(monkeypatch):
+    hub = TaskEventHub(queue_size=3)
+    monkeypatch.setattr(events_router, "task_events", hub)
+    monkeypatch.setattr(events_router, "EVENTS_HEARTBEAT_SECONDS", 0.01)
+    current = {"a": _principal("a")}
+    monkeypatch.setattr(events_router, "principal_for_user", lambda user_id: current[user_id])
+
+    async def frames(stream):
+        return [frame async for frame in stream]
+
+    async def scenario():
+        # Demoted or deactivated: the principal no longer matches
+        stream = events_router._event_stream(_principal("a", is_admin=True), math.inf)
+        assert await asyncio.wait_for(frames(stream), 1) == [": connected\n\n"]
+        # Token expiry ends a stream even while the user is unchanged
+        stream = events_router._event_stream(_principal("a"), time.time() + 0.05)
+        assert (await asyncio.wait_for(frames(stream), 1))[-1] == ": heartbeat\n\n"
+        assert hub.count() == 0
+    asyncio.run(scenario())
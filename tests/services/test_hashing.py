@@ -0,0 +1,98 @@
+import asyncio
+
+import pytest
+
+from app.core import hashing as hashing_module
+from app.core.hashing import HashingBusyError, PasswordHasher
+from app.core.security import get_password_context
+
+
+@pytest.fixture
+def fast_hash(monkeypatch):
+    # Avoid real bcrypt in unit tests; the pool mechanics are what matter here
+    monkeypatch.setattr(hashing_module, "get_password_hash", lambda password: f"hashed:{password}")
+    monkeypatch.setattr(
+        hashing_module, "verify_password", lambda plain, hashed: hashed == f"hashed:{plain}"
+    )
+
+    def verify_and_update(plain, hashed):
+        # "hashed-old:" stands for a hash of an outdated scheme or cost
+        verified = hashed in (f"hashed:{plain}", f"hashed-old:{plain}")
+        return verified, f"hashed:{plain}" if verified and hashed.startswith("hashed-old:") else None
+
+    monkeypatch.setattr(hashing_module, "verify_and_update_password", verify_and_update)
+
+
+def test_inline_hash_and_verify(fast_hash):
+    hasher = PasswordHasher(workers=0, max_pending=4)
+    hashed = hasher.hash("secret")
+    assert hasher.verify("secret", hashed) is True
+    assert hasher.verify("wrong", hashed) is False
+
+    snapshot = hasher.snapshot()
+    assert snapshot["hash"]["count"] == 1
+    assert snapshot["verify"]["count"] == 2
+    assert snapshot["pending"] == 0
+
+
+def test_inline_async_verify(fast_hash):
+    hasher = PasswordHasher(workers=0, max_pending=4)
+    assert asyncio.run(hasher.verify_async("secret", "hashed:secret")) is True
+
+
+def test_full_queue_raises_busy(fast_hash):
+    hasher = PasswordHasher(workers=0, max_pending=1)
+    hasher._acquire()  # occupy the only slot
+    with pytest.raises(HashingBusyError):
+        hasher.hash("secret")
+    assert hasher.snapshot()["rejected"] == 1
+
+    hasher._release()
+    assert hasher.hash("secret") == "hashed:secret"
+
+
+def test_process_pool_round_trip():
+    hasher = PasswordHasher(workers=1, max_pending=4)
+    try:
+        hashed = hasher.hash("secret")
+        assert hasher.verify("secret", hashed) is True
+        assert asyncio.run(hasher.verify_async("wrong", hashed)) is False
+        assert hasher.snapshot()["queue_wait"]["count"] == 3
+    finally:
+        hasher.shutdown()
+
+
+def test_inline_verify_and_update_counts_rehashes(fast_hash):
+    hasher = PasswordHasher(workers=0, max_pending=4)
+    assert hasher.verify_and_update("secret", "hashed:secret") == (True, None)
+    assert hasher.verify_and_update("secret", "hashed-old:secret") == (True, "hashed:secret")
+    assert asyncio.run(hasher.verify_and_update_async("secret", "hashed-old:secret")) == (True, "hashed:secret")
+    assert hasher.verify_and_update("wrong", "hashed-old:secret") == (False, None)
+    assert hasher.snapshot()["rehashed"] == 2
+
+
+def test_password_context_flags_other_costs_and_schemes():
+    cheap = get_password_context("bcrypt", bcrypt_rounds=4)
+    stronger = get_password_context("bcrypt", bcrypt_rounds=5)
+    hashed = cheap.hash("secret")
+    assert not cheap.needs_update(hashed)
+
+    # Lowering the cost rehashes too, not only raising it
+    assert stronger.needs_update(hashed) and cheap.needs_update(stronger.hash("secret"))
+    verified, new_hash = stronger.verify_and_update("secret", hashed)
+    assert verified and new_hash.startswith("$2b$05$")
+    assert stronger.verify_and_update("wrong", hashed) == (False, None)
+
+    with pytest.raises(ValueError):
+        get_password_context("md5")
+
+
+def test_password_context_switches_to_argon2():
+    pytest.importorskip("argon2")
+    argon2 = get_password_context("argon2", argon2_time_cost=1, argon2_memory_kib=1024, argon2_parallelism=1)
+    bcrypt_hash = get_password_context("bcrypt", bcrypt_rounds=4).hash("secret")
+
+    verified, new_hash = argon2.verify_and_update("secret", bcrypt_hash)
+    assert verified and new_hash.startswith("$argon2id$v=19$m=1024,t=1,p=1$")
+    assert not argon2.needs_update(new_hash)
+    assert get_password_context("argon2", argon2_time_cost=2, argon2_memory_kib=1024).needs_update(new_hash)
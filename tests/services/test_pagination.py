@@ -0,0 +1,24 @@
+import base64
+
+import pytest
+
+from app.services.pagination import decode_cursor, encode_cursor
+
+
+def test_cursor_round_trip():
+    payload = {"c": "2025-09-23T20:21:11.025593+00:00", "i": "10111add-9140-45ef-ae7c-97c413a8dbdb", "d": "next"}
+    cursor = encode_cursor(payload)
+    assert "=" not in cursor
+    assert decode_cursor(cursor) == payload
+
+
+@pytest.mark.parametrize("cursor", [
+    "not-a-cursor",
+    "!!!",
+    base64.urlsafe_b64encode(b"[1, 2]").decode(),
+])
+def test_decode_invalid_cursor_raises_400(cursor):
+    with pytest.raises(Exception) as excinfo:
+        decode_cursor(cursor)
+    assert getattr(excinfo.value, "status_code", None) == 400
+    assert getattr(excinfo.value, "detail", None) == "Invalid cursor"
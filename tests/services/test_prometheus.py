@@ -0,0 +1,82 @@
+import json
+import os
+
+from app.core.prometheus import Family, HttpMetrics, Registry, render
+
+def _worker_file(directory, pid: int, requests: float, in_progress: float, started: int = 1) -> str:
+    families = [
+        Family("requests_total", "counter", "Requests.").add(requests, route="/todos"),
+        Family("in_progress", "gauge", "In progress.").add(in_progress),
+    ]
+    path = os.path.join(directory, f"metrics_{pid}_{started}.json")
+    with open(path, "w") as f:
+        json.dump({"pid": pid, "families": [family.to_dict() for family in families]}, f)
+    return path
+
+def _dead_pid() -> int:
+    pid = os.fork()
+    if pid == 0:
+        os._exit(0)
+    os.waitpid(pid, 0)
+    return pid
+
+def test_http_metrics_histogram_buckets_are_cumulative():
+    metrics = HttpMetrics(buckets=(0.1, 1.0))
+    for seconds in (0.05, 0.5, 0.5, 3.0):
+        metrics.observe("GET", "/todos", 200, seconds)
+
+    text = render(metrics.families())
+    assert 'http_request_duration_seconds_bucket{method="GET",route="/todos",le="0.1"} 1' in text
+    assert 'http_request_duration_seconds_bucket{method="GET",route="/todos",le="1.0"} 3' in text
+    assert 'http_request_duration_seconds_bucket{method="GET",route="/todos",le="+Inf"} 4' in text
+    assert 'http_request_duration_seconds_sum{method="GET",route="/todos"} 4.05' in text
+    assert 'http_requests_total{method="GET",route="/todos",status="200"} 4' in text
+
+def test_registry_sums_workers_and_drops_gauges_of_exited_ones(tmp_path):
+    registry = Registry(str(tmp_path))
+    registry.register(lambda: [
+        Family("requests_total", "counter", "Requests.").add(1, route="/todos"),
+        Family("in_progress", "gauge", "In progress.").add(1),
+    ])
+    _worker_file(tmp_path, os.getppid(), requests=2, in_progress=3)
+    _worker_file(tmp_path, _dead_pid(), requests=4, in_progress=5)
+
+    families = {family.name: family for family in registry.collect_all()}
+    assert families["requests_total"].samples == [("", {"route": "/todos"}, 7.0)]
+    assert families["in_progress"].samples == [("", {}, 4.0)]
+    assert os.path.exists(registry._path())
+
+def _registry(directory) -> Registry:
+    registry = Registry(str(directory))
+    registry.register(lambda: [Family("requests_total", "counter", "Requests.").add(1, route="/todos")])
+    return registry
+
+def _requests(registry: Registry) -> float:
+    families = {family.name: family for family in registry.collect_all()}
+    return families["requests_total"].samples[0][2]
+
+def test_exited_workers_are_archived_once(tmp_path):
+    registry = _registry(tmp_path)
+    exited = [_worker_file(tmp_path, _dead_pid(), requests=4, in_progress=5) for _ in range(2)]
+
+    assert _requests(registry) == 9.0
+    assert not any(os.path.exists(path) for path in exited)
+    with open(tmp_path / "metrics_archive.json") as f:
+        archive = json.load(f)
+    assert [family["name"] for family in archive["families"]] == ["requests_total"]
+
+    # Counts never go backwards and are not folded twice
+    assert _requests(registry) == 9.0
+    assert _requests(_registry(tmp_path)) == 10.0
+
+def test_reused_pid_does_not_overwrite_an_exited_worker(tmp_path):
+    registry = _registry(tmp_path)
+    # An exited worker whose pid now belongs to a live one: it stopped writing
+    stale = _worker_file(tmp_path, os.getppid(), requests=4, in_progress=5, started=1)
+    os.utime(stale, (0, 0))
+    _worker_file(tmp_path, os.getppid(), requests=2, in_progress=3, started=2)
+
+    families = {family.name: family for family in registry.collect_all()}
+    assert families["requests_total"].samples == [("", {"route": "/todos"}, 7.0)]
+    assert families["in_progress"].samples == [("", {}, 3.0)]
+    assert not os.path.exists(stale)
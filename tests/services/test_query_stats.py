@@ -0,0 +1,48 @@
+import json
+import logging
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+
+from app.core.database import engine
+from app.core.query_stats import QueryStatsMiddleware, track_queries
+
+def test_track_queries_groups_statement_shapes():
+    with track_queries() as stats:
+        with engine.connect() as conn:
+            for i in range(3):
+                conn.execute(text("SELECT :i"), {"i": i})
+            conn.execute(text("SELECT 1"))
+
+    assert stats.count == 4
+    assert stats.seconds > 0
+    assert stats.repeated(3) == {"SELECT %(i)s": 3}
+    assert stats.repeated(4) == {}
+
+def test_queries_outside_a_tracked_context_are_ignored():
+    with track_queries() as stats:
+        pass
+    with engine.connect() as conn:
+        conn.execute(text("SELECT 1"))
+    assert stats.count == 0
+
+def test_middleware_flags_repeated_statements(caplog):
+    app = FastAPI()
+    app.add_middleware(QueryStatsMiddleware, repeat_threshold=3)
+
+    @app.get("/loop")
+    def loop():
+        with engine.connect() as conn:
+            return [conn.execute(text("SELECT :i"), {"i": i}).scalar() for i in range(3)]
+
+    with caplog.at_level(logging.INFO, logger="app.sql"):
+        response = TestClient(app).get("/loop")
+
+    assert response.status_code == 200
+    assert 'desc="queries=3"' in response.headers["server-timing"]
+    record = json.loads(caplog.records[-1].getMessage())
+    assert caplog.records[-1].levelno == logging.WARNING
+    assert record["path"] == "/loop"
+    assert record["queries"] == 3
+    assert record["repeated"] == {"SELECT %(i)s": 3}
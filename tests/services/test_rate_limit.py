@@ -0,0 +1,70 @@
+import pytest
+
+from app.core.database import engine
+from app.core.rate_limit import Budget, LocalBuckets, PostgresBuckets, parse_route_budgets
+
+def test_budget_parsing():
+    assert Budget.parse("60/30") == Budget(60, 30.0)
+    assert Budget.parse("10") == Budget(10, 1.0)
+    assert Budget.parse(" off ") is None
+    assert Budget(60, 30).interval == 0.5
+    for invalid in ("", "0/60", "10/0", "ten/60", "-1/60"):
+        with pytest.raises(ValueError):
+            Budget.parse(invalid)
+
+    assert parse_route_budgets("post /auth/login=60/60, GET /todos/search=off,") == {
+        "POST /auth/login": Budget(60, 60.0),
+        "GET /todos/search": None,
+    }
+
+def test_local_bucket_allows_burst_then_refills(monkeypatch):
+    clock = [1000.0]
+    monkeypatch.setattr("app.core.rate_limit.time.monotonic", lambda: clock[0])
+    buckets, budget = LocalBuckets(max_keys=100), Budget(3, 3)
+
+    assert [buckets.take("k", budget) for _ in range(3)] == [0, 0, 0]
+    assert buckets.take("k", budget) == pytest.approx(1.0)
+    assert buckets.wait("k", budget) == pytest.approx(1.0)
+    # Refused requests spend nothing, other keys are independent
+    assert buckets.take("k", budget) == pytest.approx(1.0)
+    assert buckets.take("other", budget) == 0
+
+    clock[0] += 1
+    assert buckets.wait("k", budget) == 0
+    assert buckets.take("k", budget) == 0
+    assert buckets.take("k", budget) > 0
+
+    buckets.reset("k")
+    assert buckets.take("k", budget) == 0
+
+def test_local_buckets_evict_full_buckets_first(monkeypatch):
+    clock = [1000.0]
+    monkeypatch.setattr("app.core.rate_limit.time.monotonic", lambda: clock[0])
+    buckets, budget = LocalBuckets(max_keys=10), Budget(1, 60)
+
+    buckets.take("busy", budget)
+    for index in range(5):
+        buckets.take(f"idle-{index}", Budget(100, 1))
+    clock[0] += 1
+    for index in range(5):
+        buckets.take(f"new-{index}", budget)
+
+    assert len(buckets._full_at) <= 10
+    assert not any(key.startswith("idle-") for key in buckets._full_at)
+    assert buckets.take("busy", budget) > 0
+
+def test_postgres_buckets_are_shared():
+    budget = Budget(2, 60)
+    first, second = PostgresBuckets(engine), PostgresBuckets(engine)
+    key = "test|postgres-buckets"
+    first.reset(key)
+    try:
+        assert first.take(key, budget) == 0
+        assert second.take(key, budget) == 0
+        assert 0 < first.take(key, budget) <= 30
+        assert 0 < second.wait(key, budget) <= 30
+        second.reset(key)
+        assert first.wait(key, budget) == 0
+        assert first.take(key, budget) == 0
+    finally:
+        first.reset(key)
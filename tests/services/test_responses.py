@@ -0,0 +1,41 @@
+import asyncio
+
+from fastapi import Response
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_model_field
+
+from sqlalchemy import select
+
+from app.core.database import LocalSession
+from app.core.responses import json_list_response
+from app.models.task import Task
+from app.schemas.task import TaskOut
+from app.services.task import TASK_OUT_COLUMNS
+from benchmarks.serialization import make_tasks
+
+def test_json_list_response_matches_response_model_bytes():
+    tasks = make_tasks(25)
+    field = create_model_field("Response_list_tasks", list[TaskOut], mode="serialization")
+    expected = JSONResponse(asyncio.run(serialize_response(field=field, response_content=tasks))).body
+
+    response = json_list_response(TaskOut, tasks)
+    assert response.body == expected
+    assert response.media_type == "application/json"
+
+def test_column_rows_serialize_like_entities():
+    with LocalSession() as db:
+        entities = list(db.scalars(select(Task).order_by(Task.id).limit(20)))
+        rows = db.execute(select(*TASK_OUT_COLUMNS).order_by(Task.id).limit(20)).all()
+
+    assert rows
+    assert json_list_response(TaskOut, rows).body == json_list_response(TaskOut, entities).body
+
+def test_json_list_response_keeps_headers_set_on_the_injected_response():
+    injected = Response()
+    injected.headers["X-Next-Cursor"] = "abc"
+
+    response = json_list_response(TaskOut, [], injected)
+    assert response.body == b"[]"
+    assert response.headers["x-next-cursor"] == "abc"
+    assert response.headers["content-length"] == "2"
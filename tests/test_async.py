@@ -0,0 +1,99 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.core import database
+from app.core.config import ASYNC_SQLALCHEMY_DATABASE_URL
+from app.routers import aio
+
+from .conftest import AUTH_URL
+
+TODOS_URL = "/todos"
+
+# The aio routers on an app of their own, so they are tested whether or not
+# DB_ASYNC_ENABLED mounted them in app.main. One client (one event loop) for
+# the whole module: asyncpg connections cannot move between loops
+@pytest.fixture(scope="module")
+def async_client():
+    async_engine = database.async_engine or create_async_engine(
+        ASYNC_SQLALCHEMY_DATABASE_URL, **database.engine_options(is_async=True),
+    )
+    aio_app = FastAPI()
+    aio_app.include_router(aio.router)
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        monkeypatch.setattr(database, "async_engine", async_engine)
+        with TestClient(aio_app) as client:
+            yield client
+            client.portal.call(async_engine.dispose)
+
+def _login(client, username, password):
+    return client.post(AUTH_URL, data={"username": username, "password": password})
+
+@pytest.fixture
+def async_headers(async_client):
+    response = _login(async_client, "khoi.vuongdinh", "Kh@ivuong3101")
+    assert response.status_code == 200, response.text
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+def test_async_login(async_client):
+    response = _login(async_client, "admin", "admin@123")
+    assert response.status_code == 200
+    assert response.json()["token_type"] == "bearer"
+    assert response.json()["refresh_token"]
+
+    assert _login(async_client, "admin", "wrong").status_code == 401
+    assert _login(async_client, "nobody", "admin@123").status_code == 401
+
+def test_async_task_crud(async_client, async_headers):
+    me = async_client.get("/users/me", headers=async_headers).json()
+
+    response = async_client.post(
+        TODOS_URL, json={"title": "Async task", "content": "Through the aio router"}, headers=async_headers,
+    )
+    assert response.status_code == 201
+    task = response.json()
+    assert task["user_id"] == me["id"]
+    assert task["company_id"] == me["company_id"]
+    assert task["is_completed"] is False
+    url = f"{TODOS_URL}/{task['id']}"
+
+    try:
+        response = async_client.get(url, headers=async_headers)
+        assert response.status_code == 200
+        assert response.json()["title"] == "Async task"
+
+        response = async_client.put(
+            url, json={"title": "Async task done", "content": "Through the aio router", "is_completed": True},
+            headers=async_headers,
+        )
+        assert response.status_code == 200
+        assert response.json()["title"] == "Async task done"
+        assert response.json()["is_completed"] is True
+        assert response.json()["updated_at"] >= task["updated_at"]
+    finally:
+        assert async_client.delete(url, headers=async_headers).status_code == 204
+    assert async_client.get(url, headers=async_headers).status_code == 404
+
+def test_async_list_tasks(async_client, async_headers):
+    created = [
+        async_client.post(TODOS_URL, json={"title": f"Async list {i}", "content": "Paged"}, headers=async_headers).json()
+        for i in range(3)
+    ]
+    try:
+        response = async_client.get(TODOS_URL, params={"limit": 2}, headers=async_headers)
+        assert response.status_code == 200
+        # Newest first, keyset paginated
+        assert [task["id"] for task in response.json()] == [created[2]["id"], created[1]["id"]]
+
+        cursor = response.headers["X-Next-Cursor"]
+        response = async_client.get(TODOS_URL, params={"limit": 2, "cursor": cursor}, headers=async_headers)
+        assert response.status_code == 200
+        assert response.json()[0]["id"] == created[0]["id"]
+    finally:
+        for task in created:
+            async_client.delete(f"{TODOS_URL}/{task['id']}", headers=async_headers)
+
+def test_async_requires_token(async_client):
+    assert async_client.get(TODOS_URL).status_code == 401
+    assert async_client.get(TODOS_URL, headers={"Authorization": "Bearer invalid"}).status_code == 401
@@ -1,5 +1,10 @@
+import pytest
+
 from .conftest import AUTH_URL
 
+REFRESH_URL = "/auth/refresh"
+REVOKE_URL = "/auth/revoke"
+
 def test_login_success(test_client):
     data = {"username": "admin", "password": "admin@123"}
     response = test_client.post(AUTH_URL, data=data)
@@ -21,4 +26,89 @@ def test_login_invalid_password(test_client):
     response = test_client.post(AUTH_URL, data=data)
     
     assert response.status_code == 401
-    assert response.json() == {"detail": "Incorrect credentials"}
\ No newline at end of file
+    assert response.json() == {"detail": "Incorrect credentials"}
+
+def _login(test_client, username="khoi.vuongdinh", password="Kh@ivuong3101"):
+    response = test_client.post(AUTH_URL, data={"username": username, "password": password})
+    assert response.status_code == 200, response.text
+    return response.json()
+
+def _refresh(test_client, refresh_token):
+    return test_client.post(REFRESH_URL, json={"refresh_token": refresh_token})
+
+def test_login_issues_refresh_token(test_client):
+    tokens = _login(test_client)
+    assert tokens["refresh_token"]
+    assert tokens["expires_in"] > 0
+
+def test_refresh_rotates_without_password_hash(test_client, monkeypatch):
+    from app.core.hashing import password_hasher
+
+    tokens = _login(test_client)
+    monkeypatch.setattr(password_hasher, "verify_and_update", lambda *args: pytest.fail("refresh verified a password"))
+    response = _refresh(test_client, tokens["refresh_token"])
+    assert response.status_code == 200, response.text
+    renewed = response.json()
+    assert renewed["refresh_token"] != tokens["refresh_token"]
+
+    me = test_client.get("/users/me", headers={"Authorization": f"Bearer {renewed['access_token']}"})
+    assert me.status_code == 200
+    assert me.json()["username"] == "khoi.vuongdinh"
+    assert _refresh(test_client, renewed["refresh_token"]).status_code == 200
+
+def test_reused_refresh_token_revokes_session(test_client):
+    tokens = _login(test_client)
+    renewed = _refresh(test_client, tokens["refresh_token"]).json()
+
+    response = _refresh(test_client, tokens["refresh_token"])
+    assert response.status_code == 401
+    assert response.json() == {"detail": "Invalid refresh token"}
+    # The copy's holder and the owner both have to log in again
+    assert _refresh(test_client, renewed["refresh_token"]).status_code == 401
+    # Other sessions of the user are unaffected
+    assert _refresh(test_client, _login(test_client)["refresh_token"]).status_code == 200
+
+def test_revoke_and_unknown_refresh_tokens(test_client):
+    tokens = _login(test_client)
+    assert test_client.post(REVOKE_URL, json={"refresh_token": tokens["refresh_token"]}).status_code == 204
+    assert _refresh(test_client, tokens["refresh_token"]).status_code == 401
+
+    assert test_client.post(REVOKE_URL, json={"refresh_token": "unknown"}).status_code == 204
+    assert _refresh(test_client, "unknown").status_code == 401
+    assert _refresh(test_client, "").status_code == 422
+
+def test_password_change_revokes_refresh_tokens(test_client):
+    tokens = _login(test_client)
+    headers = {"Authorization": f"Bearer {tokens['access_token']}"}
+    me = test_client.get("/users/me", headers=headers).json()
+
+    # Same password again: any password update ends existing sessions
+    response = test_client.put(f"/users/{me['id']}", json={"password": "Kh@ivuong3101"}, headers=headers)
+    assert response.status_code == 200, response.text
+    assert _refresh(test_client, tokens["refresh_token"]).status_code == 401
+
+def test_login_rehashes_outdated_password_hash(test_client):
+    from sqlalchemy import select, update
+
+    from app.core.database import LocalSession
+    from app.core.security import get_password_context, pwd_context
+    from app.models.user import User
+
+    username, password = "khoi.vuongdinh", "Kh@ivuong3101"
+    with LocalSession() as db:
+        original = db.execute(select(User.hashed_password).where(User.username == username)).scalar_one()
+        outdated = get_password_context("bcrypt", bcrypt_rounds=4).hash(password)
+        db.execute(update(User).where(User.username == username).values(hashed_password=outdated))
+        db.commit()
+    try:
+        _login(test_client, username, password)
+        with LocalSession() as db:
+            stored = db.execute(select(User.hashed_password).where(User.username == username)).scalar_one()
+        assert stored != outdated
+        assert not pwd_context.needs_update(stored)
+        assert pwd_context.verify(password, stored)
+        _login(test_client, username, password)
+    finally:
+        with LocalSession() as db:
+            db.execute(update(User).where(User.username == username).values(hashed_password=original))
+            db.commit()
@@ -0,0 +1,78 @@
+from app.services.auth import principal_cache
+
+TODOS_URL = "/todos"
+
+def _create_task(test_client, headers, title="ETag Task"):
+    response = test_client.post(
+        TODOS_URL, json={"title": title, "content": "Cached", "is_completed": False}, headers=headers
+    )
+    assert response.status_code == 201
+    return response.json()
+
+def test_task_not_modified_skips_loading_the_row(test_client, non_admin_headers, sql_statements):
+    task = _create_task(test_client, non_admin_headers)
+    url = f"{TODOS_URL}/{task['id']}"
+
+    response = test_client.get(url, headers=non_admin_headers)
+    etag = response.headers["etag"]
+    assert etag.startswith('"') and etag.endswith('"')
+
+    principal_cache.clear()
+    test_client.get("/users/me", headers=non_admin_headers)
+    sql_statements.clear()
+    response = test_client.get(url, headers={**non_admin_headers, "If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["etag"] == etag
+    # One version-only query: no content columns are read
+    assert len(sql_statements) == 1
+    assert "tasks.title" not in sql_statements[0]
+
+    # Weak and list forms match too
+    response = test_client.get(url, headers={**non_admin_headers, "If-None-Match": f'"other", W/{etag}'})
+    assert response.status_code == 304
+
+def test_task_etag_changes_on_update(test_client, non_admin_headers):
+    task = _create_task(test_client, non_admin_headers)
+    url = f"{TODOS_URL}/{task['id']}"
+    etag = test_client.get(url, headers=non_admin_headers).headers["etag"]
+
+    test_client.put(url, json={"title": "Changed", "content": "Cached", "is_completed": True}, headers=non_admin_headers)
+    response = test_client.get(url, headers={**non_admin_headers, "If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.json()["title"] == "Changed"
+    assert response.headers["etag"] != etag
+
+def test_not_modified_requires_access(test_client, admin_headers, non_admin_headers):
+    task = _create_task(test_client, admin_headers, title="Admin ETag Task")
+    url = f"{TODOS_URL}/{task['id']}"
+    etag = test_client.get(url, headers=admin_headers).headers["etag"]
+
+    response = test_client.get(url, headers={**non_admin_headers, "If-None-Match": etag})
+    assert response.status_code == 403
+
+def test_task_list_etag_tracks_page_contents(test_client, non_admin_headers):
+    params = {"limit": 5}
+    response = test_client.get(TODOS_URL, params=params, headers=non_admin_headers)
+    etag = response.headers["etag"]
+    conditional = {**non_admin_headers, "If-None-Match": etag}
+
+    response = test_client.get(TODOS_URL, params=params, headers=conditional)
+    assert response.status_code == 304
+    assert response.headers.get("x-next-cursor") == test_client.get(
+        TODOS_URL, params=params, headers=non_admin_headers
+    ).headers.get("x-next-cursor")
+
+    _create_task(test_client, non_admin_headers, title="Newest ETag Task")
+    response = test_client.get(TODOS_URL, params=params, headers=conditional)
+    assert response.status_code == 200
+    assert response.json()[0]["title"] == "Newest ETag Task"
+    assert response.headers["etag"] != etag
+
+def test_profile_company_and_user_list_etags(test_client, admin_headers):
+    for url in ("/users/me", "/users", "/companies/me"):
+        response = test_client.get(url, headers=admin_headers)
+        assert response.status_code == 200
+        etag = response.headers["etag"]
+        response = test_client.get(url, headers={**admin_headers, "If-None-Match": etag})
+        assert response.status_code == 304, url
@@ -0,0 +1,77 @@
+from datetime import timedelta
+
+import pytest
+from starlette.websockets import WebSocketDisconnect
+
+from app.core.security import create_access_token
+
+TODOS_URL = "/todos"
+EVENTS_URL = "/todos/events"
+TICKETS_URL = "/todos/events/tickets"
+
+PAYLOAD = {"title": "Pushed", "content": "Event", "is_completed": False}
+
+def _ticket(test_client, headers) -> str:
+    response = test_client.post(TICKETS_URL, headers=headers)
+    assert response.status_code == 201, response.text
+    assert response.json()["expires_in"] > 0
+    return response.json()["ticket"]
+
+def test_websocket_pushes_own_task_changes(test_client, non_admin_headers):
+    with test_client.websocket_connect(f"{EVENTS_URL}?ticket={_ticket(test_client, non_admin_headers)}") as websocket:
+        task = test_client.post(TODOS_URL, json=PAYLOAD, headers=non_admin_headers).json()
+        test_client.put(f"{TODOS_URL}/{task['id']}", json={**PAYLOAD, "is_completed": True}, headers=non_admin_headers)
+        test_client.delete(f"{TODOS_URL}/{task['id']}", headers=non_admin_headers)
+
+        events = [websocket.receive_json() for _ in range(3)]
+    assert [event["type"] for event in events] == ["tasks.created", "tasks.updated", "tasks.deleted"]
+    assert all(event["ids"] == [task["id"]] and event["count"] == 1 for event in events)
+    assert events[0]["user_id"] == task["user_id"]
+
+def test_websocket_skips_other_users_tasks(test_client, admin_headers, non_admin_headers):
+    with test_client.websocket_connect(EVENTS_URL, headers=non_admin_headers) as websocket:
+        other = test_client.post(TODOS_URL, json=PAYLOAD, headers=admin_headers).json()
+        own = test_client.post(TODOS_URL, json=PAYLOAD, headers=non_admin_headers).json()
+
+        # Events arrive in commit order, so the admin's task was filtered out
+        assert websocket.receive_json()["ids"] == [own["id"]]
+    test_client.delete(f"{TODOS_URL}/{other['id']}", headers=admin_headers)
+    test_client.delete(f"{TODOS_URL}/{own['id']}", headers=non_admin_headers)
+
+def test_admin_websocket_sees_the_whole_company(test_client, admin_headers, non_admin_headers):
+    with test_client.websocket_connect(f"{EVENTS_URL}?ticket={_ticket(test_client, admin_headers)}") as websocket:
+        task = test_client.post(TODOS_URL, json=PAYLOAD, headers=non_admin_headers).json()
+        assert websocket.receive_json()["ids"] == [task["id"]]
+    test_client.delete(f"{TODOS_URL}/{task['id']}", headers=non_admin_headers)
+
+@pytest.mark.parametrize("url", [EVENTS_URL, f"{EVENTS_URL}?ticket=invalid"])
+def test_websocket_requires_a_valid_token(test_client, url):
+    with pytest.raises(WebSocketDisconnect) as exc:
+        with test_client.websocket_connect(url) as websocket:
+            websocket.receive_json()
+    assert exc.value.code == 1008
+
+def test_event_stream_requires_a_token(test_client):
+    assert test_client.get(EVENTS_URL).status_code == 401
+
+def test_tickets_are_single_use_and_tokens_stay_out_of_urls(test_client, non_admin_token, non_admin_headers):
+    ticket = _ticket(test_client, non_admin_headers)
+    with test_client.websocket_connect(f"{EVENTS_URL}?ticket={ticket}"):
+        pass
+    for url in (f"{EVENTS_URL}?ticket={ticket}", f"{EVENTS_URL}?token={non_admin_token}"):
+        with pytest.raises(WebSocketDisconnect) as exc:
+            with test_client.websocket_connect(url) as websocket:
+                websocket.receive_json()
+        assert exc.value.code == 1008
+    assert test_client.get(EVENTS_URL, params={"token": non_admin_token}).status_code == 401
+    assert test_client.post(TICKETS_URL).status_code == 401
+
+def test_websocket_closes_when_the_token_expires(test_client, non_admin_headers):
+    me = test_client.get("/users/me", headers=non_admin_headers).json()
+    token = create_access_token(
+        me["id"], expires_delta=timedelta(seconds=2), extra_claims={"company_id": me["company_id"], "is_admin": False},
+    )
+    with pytest.raises(WebSocketDisconnect) as exc:
+        with test_client.websocket_connect(EVENTS_URL, headers={"Authorization": f"Bearer {token}"}) as websocket:
+            websocket.receive_json()
+    assert exc.value.code == 1008
@@ -1,3 +1,59 @@
+import threading
+
+import app.services.health as health_service
+from app.services.health import readiness
+
 def test_health_check(test_client):
     resp = test_client.get("/health")
     assert resp.status_code == 200
+
+def test_runtime_metrics(test_client):
+    resp = test_client.get("/health/metrics")
+    assert resp.status_code == 200
+    assert "password_hashing" in resp.json()
+
+def test_db_pool_metrics(test_client, admin_headers):
+    test_client.get("/users/me", headers=admin_headers)
+    pool = test_client.get("/health/metrics").json()["db_pool"]["sync"]
+    assert pool["size"] >= 1
+    assert pool["checked_out"] >= 0
+    assert pool["wait"]["count"] >= 1
+
+def test_liveness(test_client):
+    resp = test_client.get("/health/live")
+    assert resp.status_code == 200
+    assert resp.json() == {"status": "alive"}
+
+def test_readiness_pings_database_and_caches(test_client):
+    readiness.shutdown()
+    readiness._checked_at = 0.0
+
+    resp = test_client.get("/health/ready")
+    assert resp.status_code == 200
+    data = resp.json()
+    assert data["status"] == "ready"
+    assert data["cached"] is False
+    assert data["checks"]["database"]["ok"] is True
+    assert data["pool"]["sync"]["capacity"] >= 1
+
+    resp = test_client.get("/health/ready")
+    assert resp.json()["cached"] is True
+    assert resp.json()["checked_at"] == data["checked_at"]
+
+def test_readiness_times_out_on_wedged_database(test_client, monkeypatch):
+    release = threading.Event()
+    monkeypatch.setattr(health_service, "_ping_sync", lambda timeout: release.wait(5))
+    monkeypatch.setattr(readiness, "timeout", 0.05)
+    readiness.shutdown()
+    readiness._checked_at = 0.0
+
+    try:
+        resp = test_client.get("/health/ready")
+        assert resp.status_code == 503
+        database = resp.json()["checks"]["database"]
+        assert database["ok"] is False
+        assert database["error"] == "timed out after 0.05s"
+    finally:
+        release.set()
+        readiness.shutdown()
+        readiness._checked_at = 0.0
@@ -0,0 +1,37 @@
+import re
+
+METRICS_URL = "/metrics"
+
+def _sample(text: str, name: str, **labels) -> float | None:
+    label_text = ",".join(f'{key}="{value}"' for key, value in labels.items())
+    match = re.search(rf"^{re.escape(name)}{{{re.escape(label_text)}}} (\S+)$", text, re.M)
+    return float(match.group(1)) if match else None
+
+def test_metrics_label_requests_by_route_template(test_client, non_admin_headers):
+    task_id = test_client.get("/todos", headers=non_admin_headers).json()[0]["id"]
+    test_client.get(f"/todos/{task_id}", headers=non_admin_headers)
+    test_client.get("/no-such-path/123")
+
+    response = test_client.get(METRICS_URL)
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    text = response.text
+
+    assert _sample(text, "http_requests_total", method="GET", route="/todos/{task_id}", status="200") >= 1
+    assert _sample(text, "http_requests_total", method="GET", route="unmatched", status="404") >= 1
+    # Raw paths never become label values
+    assert task_id not in text
+    assert "/no-such-path" not in text
+    assert _sample(
+        text, "http_request_duration_seconds_bucket", method="GET", route="/todos/{task_id}", le="+Inf"
+    ) == _sample(text, "http_request_duration_seconds_count", method="GET", route="/todos/{task_id}")
+
+def test_metrics_include_pool_hashing_and_auth(test_client, non_admin_headers):
+    test_client.get("/users/me", headers=non_admin_headers)
+    text = test_client.get(METRICS_URL).text
+
+    assert _sample(text, "db_pool_size", engine="primary") is not None
+    assert _sample(text, "db_pool_checkout_seconds_count", engine="primary") > 0
+    assert _sample(text, "password_hash_seconds_count", op="verify") >= 1
+    assert _sample(text, "cache_lookups_total", cache="jwt", result="hit") >= 1
+    assert "# TYPE jwt_decode_seconds summary" in text
@@ -0,0 +1,50 @@
+from .utils import assert_query_budget, query_count
+
+TODOS_URL = "/todos"
+
+# Every budget allows one extra query for loading the caller on a principal cache miss
+
+def test_read_endpoints_query_budget(test_client, admin_headers, non_admin_headers):
+    response = test_client.get(TODOS_URL, headers=non_admin_headers)
+    assert response.status_code == 200
+    assert_query_budget(response, 2)
+    task_id = response.json()[0]["id"]
+
+    # Budgets only mean something on the success path, not a 403/404
+    reads = [
+        (f"{TODOS_URL}/{task_id}", non_admin_headers),
+        ("/users/me", non_admin_headers),
+        ("/users", admin_headers),
+        ("/companies/me", non_admin_headers),
+    ]
+    for url, headers in reads:
+        response = test_client.get(url, headers=headers)
+        assert response.status_code == 200, url
+        assert_query_budget(response, 2)
+
+def test_write_endpoints_query_budget(test_client, non_admin_headers):
+    payload = {"title": "Budget Task", "content": "Counted", "is_completed": False}
+    response = test_client.post(TODOS_URL, json=payload, headers=non_admin_headers)
+    assert_query_budget(response, 2)
+    task_id = response.json()["id"]
+
+    response = test_client.put(f"{TODOS_URL}/{task_id}", json=payload, headers=non_admin_headers)
+    assert_query_budget(response, 3)
+    response = test_client.delete(f"{TODOS_URL}/{task_id}", headers=non_admin_headers)
+    assert_query_budget(response, 3)
+
+def test_bulk_endpoints_query_budget_is_independent_of_batch_size(test_client, non_admin_headers):
+    payload = [{"title": f"Budget Bulk {i}", "content": "Counted"} for i in range(25)]
+    response = test_client.post(f"{TODOS_URL}/bulk", json=payload, headers=non_admin_headers)
+    assert_query_budget(response, 2)
+    ids = [item["id"] for item in response.json()]
+
+    response = test_client.post(f"{TODOS_URL}/bulk/complete", json={"ids": ids}, headers=non_admin_headers)
+    assert_query_budget(response, 3)
+    response = test_client.post(f"{TODOS_URL}/bulk/delete", json={"ids": ids}, headers=non_admin_headers)
+    assert_query_budget(response, 3)
+
+def test_server_timing_without_queries(test_client):
+    response = test_client.get("/health/live")
+    assert query_count(response) == 0
+    assert "total;dur=" in response.headers["server-timing"]
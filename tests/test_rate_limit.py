@@ -0,0 +1,86 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from app.core.hashing import password_hasher
+from app.core.rate_limit import Budget, limiter, login_guard
+
+from .conftest import AUTH_URL
+
+TODOS_URL = "/todos"
+
+def test_route_budget_is_per_caller(test_client, monkeypatch, admin_headers, non_admin_headers):
+    monkeypatch.setitem(limiter.routes, "GET /todos/{task_id}", Budget(2, 60))
+    url = f"{TODOS_URL}/00000000-0000-0000-0000-000000000000"
+    rejected = limiter.rejected
+
+    assert [test_client.get(url, headers=admin_headers).status_code for _ in range(2)] == [404, 404]
+    response = test_client.get(url, headers=admin_headers)
+    assert response.status_code == 429
+    assert response.json() == {"detail": "Too many requests"}
+    assert 1 <= int(response.headers["retry-after"]) <= 30
+    assert limiter.rejected == rejected + 1
+
+    # Another user has their own bucket; other routes are on the default budget
+    assert test_client.get(url, headers=non_admin_headers).status_code == 404
+    assert test_client.get(TODOS_URL, headers=admin_headers).status_code == 200
+
+def test_default_budget_keys_anonymous_callers_by_ip(test_client, monkeypatch):
+    monkeypatch.setattr(limiter, "default", Budget(1, 60))
+    assert test_client.get(TODOS_URL).status_code == 401
+    assert test_client.get(TODOS_URL, headers={"Authorization": "Bearer invalid"}).status_code == 429
+
+def test_health_is_never_limited(test_client, monkeypatch):
+    monkeypatch.setattr(limiter, "default", Budget(1, 60))
+    assert all(test_client.get("/health").status_code == 200 for _ in range(3))
+
+def test_login_locked_after_failures(test_client, monkeypatch):
+    username = "khoi.vuongdinh"
+    for _ in range(login_guard.budget.burst):
+        response = test_client.post(AUTH_URL, data={"username": username, "password": "wrong"})
+        assert response.status_code == 401
+
+    verified = []
+    monkeypatch.setattr(password_hasher, "verify_and_update", lambda *args: verified.append(args) or (True, None))
+    response = test_client.post(AUTH_URL, data={"username": username.upper(), "password": "Kh@ivuong3101"})
+    assert response.status_code == 429
+    assert response.json() == {"detail": "Too many failed logins, try again later"}
+    assert int(response.headers["retry-after"]) >= 1
+    assert verified == []
+
+    # Other usernames are unaffected
+    monkeypatch.undo()
+    response = test_client.post(AUTH_URL, data={"username": "admin", "password": "admin@123"})
+    assert response.status_code == 200
+
+def test_successful_login_resets_failures(test_client):
+    data = {"username": "admin", "password": "admin@123"}
+    for _ in range(login_guard.budget.burst - 1):
+        assert test_client.post(AUTH_URL, data={**data, "password": "wrong"}).status_code == 401
+    assert test_client.post(AUTH_URL, data=data).status_code == 200
+    for _ in range(login_guard.budget.burst - 1):
+        assert test_client.post(AUTH_URL, data={**data, "password": "wrong"}).status_code == 401
+    assert test_client.post(AUTH_URL, data=data).status_code == 200
+
+def test_parallel_failed_logins_cannot_outrun_the_lockout(test_client, monkeypatch):
+    verified = []
+
+    def slow_wrong_password(*args):
+        # Every request is in flight before any of them fails
+        verified.append(args)
+        time.sleep(0.2)
+        return False, None
+
+    async def slow_wrong_password_async(*args):
+        return await asyncio.to_thread(slow_wrong_password, *args)
+
+    # Both login paths, whichever DB_ASYNC_ENABLED mounted
+    monkeypatch.setattr(password_hasher, "verify_and_update", slow_wrong_password)
+    monkeypatch.setattr(password_hasher, "verify_and_update_async", slow_wrong_password_async)
+    data = {"username": "khoi.vuongdinh", "password": "wrong"}
+    attempts = login_guard.budget.burst * 3
+    with ThreadPoolExecutor(max_workers=attempts) as pool:
+        statuses = list(pool.map(lambda _: test_client.post(AUTH_URL, data=data).status_code, range(attempts)))
+
+    assert len(verified) == login_guard.budget.burst
+    assert sorted(statuses) == [401] * login_guard.budget.burst + [429] * (attempts - login_guard.budget.burst)
@@ -1,3 +1,6 @@
+import csv
+import io
+import json
 from uuid import uuid4
 
 USERS_URL = '/users'
@@ -198,4 +201,264 @@ def test_delete_task_not_found(test_client, non_admin_headers):
     response = test_client.delete(f"{TODOS_URL}/{non_existing_task_id}", headers=non_admin_headers)
     
     assert response.status_code == 404 
-    assert response.json()["detail"] == "Task not found"
\ No newline at end of file
+    assert response.json()["detail"] == "Task not found"
+
+def test_list_tasks_keyset_pagination(test_client, non_admin_headers):
+    """Task list is paginated newest first with opaque next/prev cursors."""
+    created = []
+    for i in range(3):
+        payload = {"title": f"Page Task {i}", "content": "Paginated task", "is_completed": False}
+        response = test_client.post(TODOS_URL, json=payload, headers=non_admin_headers)
+        assert response.status_code == 201
+        created.append(response.json())
+
+    params = {"limit": 2, "created_after": created[0]["created_at"]}
+    response = test_client.get(TODOS_URL, params=params, headers=non_admin_headers)
+    assert response.status_code == 200
+    first_page = [item["id"] for item in response.json()]
+    assert first_page == [created[2]["id"], created[1]["id"]]
+    assert "X-Prev-Cursor" not in response.headers
+    next_cursor = response.headers["X-Next-Cursor"]
+
+    response = test_client.get(TODOS_URL, params={**params, "cursor": next_cursor}, headers=non_admin_headers)
+    assert response.status_code == 200
+    assert [item["id"] for item in response.json()] == [created[0]["id"]]
+    assert "X-Next-Cursor" not in response.headers
+    prev_cursor = response.headers["X-Prev-Cursor"]
+
+    response = test_client.get(TODOS_URL, params={**params, "cursor": prev_cursor}, headers=non_admin_headers)
+    assert response.status_code == 200
+    assert [item["id"] for item in response.json()] == first_page
+
+def test_list_tasks_filter_completed(test_client, non_admin_headers):
+    """Task list can be filtered by completion status."""
+    response = test_client.get(TODOS_URL, params={"is_completed": True}, headers=non_admin_headers)
+    assert response.status_code == 200
+    assert all(item["is_completed"] for item in response.json())
+
+def test_list_tasks_invalid_cursor(test_client, non_admin_headers):
+    """A malformed cursor returns 400."""
+    response = test_client.get(TODOS_URL, params={"cursor": "garbage"}, headers=non_admin_headers)
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Invalid cursor"
+
+def test_bulk_create_update_complete_delete(test_client, non_admin_headers):
+    """Non-admin can create, update, complete and delete tasks in bulk."""
+    payload = [
+        {"title": f"Bulk Task {i}", "content": "Bulk created task", "is_completed": False}
+        for i in range(3)
+    ]
+    response = test_client.post(f"{TODOS_URL}/bulk", json=payload, headers=non_admin_headers)
+    assert response.status_code == 201
+    results = response.json()
+    assert [item["status"] for item in results] == [201, 201, 201]
+    assert [item["task"]["title"] for item in results] == ["Bulk Task 0", "Bulk Task 1", "Bulk Task 2"]
+    ids = [item["id"] for item in results]
+
+    missing_id = str(uuid4())
+    update_payload = [
+        {"id": ids[0], "title": "Bulk Updated", "content": "Updated", "is_completed": True},
+        {"id": missing_id, "title": "Missing", "content": "Missing", "is_completed": True},
+    ]
+    response = test_client.put(f"{TODOS_URL}/bulk", json=update_payload, headers=non_admin_headers)
+    assert response.status_code == 200
+    results = response.json()
+    assert results[0]["status"] == 200
+    assert results[0]["task"]["title"] == "Bulk Updated"
+    assert results[0]["task"]["is_completed"] == True
+    assert results[1] == {"id": missing_id, "status": 404, "detail": "Task not found", "task": None}
+
+    response = test_client.post(f"{TODOS_URL}/bulk/complete", json={"ids": ids[1:]}, headers=non_admin_headers)
+    assert response.status_code == 200
+    assert all(item["task"]["is_completed"] for item in response.json())
+
+    response = test_client.post(f"{TODOS_URL}/bulk/delete", json={"ids": ids}, headers=non_admin_headers)
+    assert response.status_code == 200
+    assert [item["status"] for item in response.json()] == [204, 204, 204]
+
+    response = test_client.get(f"{TODOS_URL}/{ids[0]}", headers=non_admin_headers)
+    assert response.status_code == 404
+
+def test_bulk_update_other_users_task_forbidden(test_client, admin_headers, non_admin_headers):
+    """Non-admin bulk updates are rejected per item for tasks they don't own."""
+    payload = [{"title": "Admin Task", "content": "Owned by admin", "is_completed": False}]
+    response = test_client.post(f"{TODOS_URL}/bulk", json=payload, headers=admin_headers)
+    assert response.status_code == 201
+    task_id = response.json()[0]["id"]
+
+    response = test_client.post(f"{TODOS_URL}/bulk/delete", json={"ids": [task_id]}, headers=non_admin_headers)
+    assert response.status_code == 200
+    assert response.json()[0]["status"] == 403
+    assert response.json()[0]["detail"] == "Not allowed"
+
+    response = test_client.get(f"{TODOS_URL}/{task_id}", headers=admin_headers)
+    assert response.status_code == 200
+
+def test_bulk_endpoints_reject_duplicate_ids(test_client, non_admin_headers):
+    """Every bulk endpoint refuses a repeated id with 422 and changes nothing."""
+    payload = [{"title": "Duplicate Task", "content": "Bulk created task", "is_completed": False}]
+    response = test_client.post(f"{TODOS_URL}/bulk", json=payload, headers=non_admin_headers)
+    assert response.status_code == 201
+    task_id = response.json()[0]["id"]
+
+    update_item = {"id": task_id, "title": "Changed", "content": "Changed", "is_completed": True}
+    requests = [
+        ("put", f"{TODOS_URL}/bulk", [update_item, update_item]),
+        ("post", f"{TODOS_URL}/bulk/complete", {"ids": [task_id, task_id]}),
+        ("post", f"{TODOS_URL}/bulk/delete", {"ids": [task_id, task_id]}),
+    ]
+    for method, url, body in requests:
+        response = test_client.request(method, url, json=body, headers=non_admin_headers)
+        assert response.status_code == 422, url
+        assert response.json()["detail"] == "Duplicate task ids"
+
+    response = test_client.get(f"{TODOS_URL}/{task_id}", headers=non_admin_headers)
+    assert response.status_code == 200
+    assert response.json()["title"] == "Duplicate Task"
+    assert response.json()["is_completed"] is False
+    test_client.delete(f"{TODOS_URL}/{task_id}", headers=non_admin_headers)
+
+def test_export_tasks_ndjson(test_client, non_admin_headers):
+    """Export streams every visible task as one JSON object per line."""
+    response = test_client.post(
+        TODOS_URL,
+        json={"title": "Export Task", "content": "Exported", "is_completed": False},
+        headers=non_admin_headers,
+    )
+    assert response.status_code == 201
+    task_id = response.json()["id"]
+
+    response = test_client.get(f"{TODOS_URL}/export", headers=non_admin_headers)
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert task_id in [row["id"] for row in rows]
+    assert all(row["user_id"] == rows[0]["user_id"] for row in rows)
+    created = [row["created_at"] for row in rows]
+    assert created == sorted(created)
+
+    test_client.delete(f"{TODOS_URL}/{task_id}", headers=non_admin_headers)
+
+def test_export_tasks_csv(test_client, admin_headers):
+    """CSV export has a header row and honours the list filters."""
+    response = test_client.get(
+        f"{TODOS_URL}/export", params={"format": "csv", "is_completed": True}, headers=admin_headers,
+    )
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/csv")
+    assert response.text.splitlines()[0] == "title,content,is_completed,created_at,updated_at,id,user_id,company_id"
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert all(row["is_completed"] == "True" for row in rows)
+
+    response = test_client.get(f"{TODOS_URL}/export", params={"format": "xml"}, headers=admin_headers)
+    assert response.status_code == 422
+
+def _delete_tasks_titled(prefix):
+    from sqlalchemy import delete
+    from app.core.database import LocalSession
+    from app.models.task import Task
+
+    with LocalSession() as db:
+        db.execute(delete(Task).where(Task.title.startswith(prefix)))
+        db.commit()
+
+def test_import_tasks_ndjson(test_client, non_admin_headers):
+    """Valid rows are imported for the caller, invalid rows are reported by line."""
+    body = "\n".join([
+        json.dumps({"title": "Imported NDJSON 1", "content": "From another system"}),
+        json.dumps({"title": "Imported NDJSON 2", "content": "Done", "is_completed": True}),
+        "",
+        json.dumps({"title": "", "content": "Missing title"}),
+        "not json",
+    ])
+    response = test_client.post(
+        f"{TODOS_URL}/import", content=body.encode(), headers=non_admin_headers,
+    )
+    assert response.status_code == 200
+    data = response.json()
+    assert (data["rows"], data["imported"], data["failed"]) == (4, 2, 2)
+    assert [error["line"] for error in data["errors"]] == [4, 5]
+    assert data["errors"][0]["detail"].startswith("title:")
+
+    response = test_client.get(f"{TODOS_URL}/export", headers=non_admin_headers)
+    titles = {json.loads(line)["title"]: json.loads(line) for line in response.text.splitlines()}
+    assert titles["Imported NDJSON 2"]["is_completed"] == True
+    assert titles["Imported NDJSON 1"]["created_at"] is not None
+
+    _delete_tasks_titled("Imported NDJSON")
+
+def test_import_tasks_csv_round_trip(test_client, non_admin_headers):
+    """A CSV export can be imported back, keeping its creation dates."""
+    rows = [
+        "title,content,is_completed,created_at,id",
+        "Imported CSV 1,\"Multi\nline\",true,2024-01-02T03:04:05+00:00,ignored",
+        "Imported CSV 2,Plain,,,",
+        ",No title,false,,",
+    ]
+    response = test_client.post(
+        f"{TODOS_URL}/import", params={"format": "csv"},
+        content="\n".join(rows).encode(), headers=non_admin_headers,
+    )
+    assert response.status_code == 200
+    data = response.json()
+    assert (data["rows"], data["imported"], data["failed"]) == (3, 2, 1)
+    assert data["errors"][0]["line"] == 5
+
+    response = test_client.get(
+        f"{TODOS_URL}/export", params={"created_before": "2024-01-03T00:00:00Z"}, headers=non_admin_headers,
+    )
+    imported = [json.loads(line) for line in response.text.splitlines()]
+    assert [(t["title"], t["content"], t["is_completed"]) for t in imported] == [
+        ("Imported CSV 1", "Multi\nline", True),
+    ]
+    assert imported[0]["created_at"] == "2024-01-02T03:04:05Z"
+    # Stamped with the import time, so delta sync picks it up
+    assert imported[0]["updated_at"] > imported[0]["created_at"]
+
+    _delete_tasks_titled("Imported CSV")
+
+def test_import_csv_with_byte_order_mark(test_client, non_admin_headers):
+    """CSVs saved by Excel start with a BOM, which must not hide the first header."""
+    rows = ["title,content", "Imported BOM 1,From Excel"]
+    response = test_client.post(
+        f"{TODOS_URL}/import", params={"format": "csv"},
+        content=("\ufeff" + "\r\n".join(rows)).encode(), headers=non_admin_headers,
+    )
+    assert response.status_code == 200
+    data = response.json()
+    assert (data["rows"], data["imported"], data["failed"]) == (1, 1, 0)
+
+    response = test_client.get(f"{TODOS_URL}/export", headers=non_admin_headers)
+    titles = [json.loads(line)["title"] for line in response.text.splitlines()]
+    assert "Imported BOM 1" in titles
+
+    _delete_tasks_titled("Imported BOM")
+
+def test_import_reports_nul_characters_per_row(test_client, non_admin_headers):
+    """NUL cannot be stored in Postgres text: such rows fail alone, not the upload."""
+    body = "\n".join([
+        json.dumps({"title": "Imported NUL 1", "content": "Fine"}),
+        json.dumps({"title": "Imported NUL 2", "content": "Bad\u0000byte"}),
+        json.dumps({"title": "Imported NUL\u0000 3", "content": "Fine"}),
+    ])
+    response = test_client.post(f"{TODOS_URL}/import", content=body.encode(), headers=non_admin_headers)
+    assert response.status_code == 200
+    data = response.json()
+    assert (data["rows"], data["imported"], data["failed"]) == (3, 1, 2)
+    assert [error["line"] for error in data["errors"]] == [2, 3]
+    assert data["errors"][0]["detail"] == "content: Value error, must not contain NUL characters"
+    assert data["errors"][1]["detail"].startswith("title:")
+
+    _delete_tasks_titled("Imported NUL")
+
+def test_import_rejects_invalid_utf8(test_client, non_admin_headers):
+    body = "\n".join([
+        json.dumps({"title": "Imported Latin-1 1", "content": "Fine"}),
+        json.dumps({"title": "Imported Latin-1 2", "content": "Caf\u00e9"}, ensure_ascii=False),
+    ]).encode("latin-1")
+    response = test_client.post(f"{TODOS_URL}/import", content=body, headers=non_admin_headers)
+    assert response.status_code == 400
+    assert response.json() == {"detail": "Line 2 is not valid UTF-8"}
+
+    response = test_client.get(f"{TODOS_URL}/export", headers=non_admin_headers)
+    assert "Imported Latin-1" not in response.text
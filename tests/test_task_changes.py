@@ -0,0 +1,145 @@
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import text, update
+
+from app.core.database import LocalSession, engine
+from app.models.task import Task, TaskTombstone
+from app.services.pagination import decode_cursor, encode_cursor
+from app.services.task import prune_tombstones
+
+TODOS_URL = "/todos"
+CHANGES_URL = "/todos/changes"
+
+def _sync_all(test_client, headers, since=None):
+    """Follow has_more to the end; returns (changed ids, deleted ids, next token)."""
+    changed, deleted = [], []
+    while True:
+        params = {"limit": 200, **({"since": since} if since else {})}
+        response = test_client.get(CHANGES_URL, params=params, headers=headers)
+        assert response.status_code == 200
+        body = response.json()
+        changed += [task["id"] for task in body["changed"]]
+        deleted += body["deleted"]
+        since = body["next"]
+        if not body["has_more"]:
+            return changed, deleted, since
+
+def test_changes_report_creates_updates_and_deletes(test_client, non_admin_headers):
+    _, _, since = _sync_all(test_client, non_admin_headers)
+
+    payload = {"title": "Synced", "content": "Delta", "is_completed": False}
+    created = test_client.post(TODOS_URL, json=payload, headers=non_admin_headers).json()
+    removed = test_client.post(TODOS_URL, json=payload, headers=non_admin_headers).json()
+    changed, deleted, since = _sync_all(test_client, non_admin_headers, since)
+    assert changed == [created["id"], removed["id"]]
+    assert deleted == []
+
+    test_client.put(f"{TODOS_URL}/{created['id']}", json={**payload, "is_completed": True}, headers=non_admin_headers)
+    test_client.delete(f"{TODOS_URL}/{removed['id']}", headers=non_admin_headers)
+    changed, deleted, since = _sync_all(test_client, non_admin_headers, since)
+    assert changed == [created["id"]]
+    assert deleted == [removed["id"]]
+
+    # Nothing new: an empty delta
+    assert _sync_all(test_client, non_admin_headers, since)[:2] == ([], [])
+
+def test_changes_pages_match_the_full_list(test_client, non_admin_headers):
+    response = test_client.get(CHANGES_URL, params={"limit": 1}, headers=non_admin_headers)
+    body = response.json()
+    assert len(body["changed"]) == 1 and body["has_more"]
+
+    changed, _, _ = _sync_all(test_client, non_admin_headers)
+    listed = []
+    cursor = None
+    while True:
+        params = {"limit": 200, **({"cursor": cursor} if cursor else {})}
+        response = test_client.get(TODOS_URL, params=params, headers=non_admin_headers)
+        listed += [task["id"] for task in response.json()]
+        cursor = response.headers.get("x-next-cursor")
+        if not cursor:
+            break
+    assert sorted(changed) == sorted(listed)
+
+def test_bulk_delete_leaves_tombstones(test_client, non_admin_headers):
+    payload = [{"title": f"Bulk Sync {i}", "content": "Delta"} for i in range(3)]
+    ids = [item["id"] for item in test_client.post(f"{TODOS_URL}/bulk", json=payload, headers=non_admin_headers).json()]
+    _, _, since = _sync_all(test_client, non_admin_headers)
+
+    test_client.post(f"{TODOS_URL}/bulk/delete", json={"ids": ids}, headers=non_admin_headers)
+    _, deleted, _ = _sync_all(test_client, non_admin_headers, since)
+    assert sorted(deleted) == sorted(ids)
+
+def test_invalid_and_expired_since(test_client, non_admin_headers):
+    response = test_client.get(CHANGES_URL, params={"since": "not-a-token"}, headers=non_admin_headers)
+    assert response.status_code == 400
+
+    _, _, since = _sync_all(test_client, non_admin_headers)
+    payload = decode_cursor(since)
+    payload["h"] = (datetime.now(timezone.utc) - timedelta(days=365)).isoformat()
+    response = test_client.get(CHANGES_URL, params={"since": encode_cursor(payload)}, headers=non_admin_headers)
+    assert response.status_code == 410
+
+def test_prune_tombstones_keeps_recent_ones(test_client, non_admin_headers):
+    task = test_client.post(
+        TODOS_URL, json={"title": "Pruned", "content": "Delta"}, headers=non_admin_headers
+    ).json()
+    test_client.delete(f"{TODOS_URL}/{task['id']}", headers=non_admin_headers)
+
+    with LocalSession() as db:
+        prune_tombstones(db)
+        assert db.get(TaskTombstone, task["id"]) is not None
+        prune_tombstones(db, retention_days=-1)
+        assert db.get(TaskTombstone, task["id"]) is None
+
+def test_backdated_writes_still_reach_changes(test_client, non_admin_headers):
+    _, _, since = _sync_all(test_client, non_admin_headers)
+
+    old = "2001-01-01T00:00:00Z"
+    payload = {"title": "Backdated", "content": "Delta", "is_completed": False, "created_at": old, "updated_at": old}
+    created = test_client.post(TODOS_URL, json=payload, headers=non_admin_headers).json()
+    bulk = test_client.post(f"{TODOS_URL}/bulk", json=[payload], headers=non_admin_headers).json()
+    assert created["updated_at"] > old and created["created_at"] > old
+    # Even a direct write cannot backdate updated_at
+    with LocalSession() as db:
+        db.execute(update(Task).where(Task.id == created["id"]).values(updated_at=datetime(2001, 1, 1, tzinfo=timezone.utc)))
+        db.commit()
+
+    ids = [created["id"], bulk[0]["id"]]
+    try:
+        changed, _, _ = _sync_all(test_client, non_admin_headers, since)
+        assert sorted(changed) == sorted(ids)
+    finally:
+        for task_id in ids:
+            test_client.delete(f"{TODOS_URL}/{task_id}", headers=non_admin_headers)
+
+def test_open_reader_does_not_hold_back_changes(test_client, non_admin_headers):
+    _, _, since = _sync_all(test_client, non_admin_headers)
+    payload = {"title": "Behind a reader", "content": "Delta", "is_completed": False}
+
+    # A reader idle in its transaction, like a streamed export
+    with engine.connect() as reader:
+        reader.execute(text("SELECT count(*) FROM tasks"))
+        created = test_client.post(TODOS_URL, json=payload, headers=non_admin_headers).json()
+        try:
+            changed, _, _ = _sync_all(test_client, non_admin_headers, since)
+            assert changed == [created["id"]]
+        finally:
+            test_client.delete(f"{TODOS_URL}/{created['id']}", headers=non_admin_headers)
+        reader.rollback()
+
+def test_open_writer_holds_back_changes_until_commit(test_client, non_admin_headers):
+    payload = {"title": "Behind a writer", "content": "Delta", "is_completed": False}
+    created = test_client.post(TODOS_URL, json=payload, headers=non_admin_headers).json()
+    _, _, since = _sync_all(test_client, non_admin_headers)
+
+    try:
+        with engine.connect() as writer:
+            writer.execute(update(Task).where(Task.id == created["id"]).values(is_completed=True))
+            # Not committed: skipping past it now would lose the update
+            changed, _, token = _sync_all(test_client, non_admin_headers, since)
+            assert changed == []
+            writer.commit()
+        changed, _, _ = _sync_all(test_client, non_admin_headers, token)
+        assert changed == [created["id"]]
+    finally:
+        test_client.delete(f"{TODOS_URL}/{created['id']}", headers=non_admin_headers)
@@ -0,0 +1,76 @@
+import uuid
+
+import pytest
+
+TODOS_URL = "/todos"
+SEARCH_URL = "/todos/search"
+
+@pytest.fixture
+def searchable(test_client, admin_headers, non_admin_headers):
+    """Tasks with a unique marker word, one of them owned by the admin."""
+    marker = f"zq{uuid.uuid4().hex[:10]}"
+    specs = [
+        (non_admin_headers, f"Renew {marker} certificate", "Before it expires"),
+        (non_admin_headers, "Quarterly report", f"Mention {marker} in the summary"),
+        (non_admin_headers, "Unrelated", "Nothing to see"),
+        (admin_headers, f"Admin {marker}", "Company wide"),
+    ]
+    created = [
+        (headers, test_client.post(
+            TODOS_URL, json={"title": title, "content": content, "is_completed": False}, headers=headers
+        ).json())
+        for headers, title, content in specs
+    ]
+    yield marker, [task for _, task in created]
+    for headers, task in created:
+        test_client.delete(f"{TODOS_URL}/{task['id']}", headers=headers)
+
+def _search(test_client, headers, **params):
+    response = test_client.get(SEARCH_URL, params=params, headers=headers)
+    assert response.status_code == 200, response.text
+    return response
+
+def test_search_ranks_title_matches_first(test_client, non_admin_headers, searchable):
+    marker, tasks = searchable
+    response = _search(test_client, non_admin_headers, q=marker)
+    assert response.headers["x-search-mode"] == "words"
+    # Scoped like GET /todos: the admin's task is not visible to this user
+    assert [task["id"] for task in response.json()] == [tasks[0]["id"], tasks[1]["id"]]
+
+def test_search_matches_stems_and_phrases(test_client, non_admin_headers, searchable):
+    marker, tasks = searchable
+    assert [task["id"] for task in _search(test_client, non_admin_headers, q=f"{marker} renewing").json()] == [tasks[0]["id"]]
+    assert [task["id"] for task in _search(test_client, non_admin_headers, q=f'"{marker} certificate"').json()] == [tasks[0]["id"]]
+    assert _search(test_client, non_admin_headers, q=f"{marker} -certificate").json()[0]["id"] == tasks[1]["id"]
+
+def test_admin_searches_the_whole_company(test_client, admin_headers, searchable):
+    marker, tasks = searchable
+    found = {task["id"] for task in _search(test_client, admin_headers, q=marker).json()}
+    assert found == {tasks[0]["id"], tasks[1]["id"], tasks[3]["id"]}
+
+def test_search_falls_back_to_substring(test_client, non_admin_headers, searchable):
+    marker, tasks = searchable
+    # A fragment is no word match: auto mode retries as a substring search
+    response = _search(test_client, non_admin_headers, q=marker[2:8].upper())
+    assert response.headers["x-search-mode"] == "substring"
+    assert [task["id"] for task in response.json()] == [tasks[1]["id"], tasks[0]["id"]]
+
+    assert _search(test_client, non_admin_headers, q=marker[2:8], mode="words").json() == []
+    # LIKE wildcards are matched literally
+    assert _search(test_client, non_admin_headers, q="%", mode="substring").json() == []
+
+@pytest.mark.parametrize("mode", ["words", "substring"])
+def test_search_pages_with_a_cursor(test_client, non_admin_headers, searchable, mode):
+    marker, tasks = searchable
+    first = _search(test_client, non_admin_headers, q=marker, mode=mode, limit=1)
+    second = _search(test_client, non_admin_headers, q=marker, mode=mode, limit=1, cursor=first.headers["x-next-cursor"])
+    assert "x-next-cursor" not in second.headers
+    assert {first.json()[0]["id"], second.json()[0]["id"]} == {tasks[0]["id"], tasks[1]["id"]}
+
+def test_search_rejects_bad_input(test_client, non_admin_headers, searchable):
+    marker, _ = searchable
+    assert test_client.get(SEARCH_URL, params={"q": ""}, headers=non_admin_headers).status_code == 422
+    assert test_client.get(SEARCH_URL, params={"q": marker, "cursor": "bad"}, headers=non_admin_headers).status_code == 400
+    cursor = _search(test_client, non_admin_headers, q=marker, mode="words", limit=1).headers["x-next-cursor"]
+    response = test_client.get(SEARCH_URL, params={"q": marker, "mode": "substring", "cursor": cursor}, headers=non_admin_headers)
+    assert response.status_code == 400
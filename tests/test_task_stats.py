@@ -0,0 +1,69 @@
+from sqlalchemy import delete, update
+
+from app.core.database import LocalSession
+from app.models.task import TaskCounter
+from app.services.task import reconcile_task_counters
+
+TODOS_URL = "/todos"
+STATS_URL = "/todos/stats"
+
+def _stats(test_client, headers):
+    response = test_client.get(STATS_URL, headers=headers)
+    assert response.status_code == 200, response.text
+    return response.json()
+
+def _counted(test_client, headers):
+    """(total, completed) by paging through GET /todos, as dashboards did."""
+    total = completed = 0
+    cursor = None
+    while True:
+        params = {"limit": 200, **({"cursor": cursor} if cursor else {})}
+        response = test_client.get(TODOS_URL, params=params, headers=headers)
+        total += len(response.json())
+        completed += sum(task["is_completed"] for task in response.json())
+        cursor = response.headers.get("x-next-cursor")
+        if not cursor:
+            return total, completed
+
+def test_stats_follow_task_writes(test_client, non_admin_headers):
+    before = _stats(test_client, non_admin_headers)
+    assert (before["total"], before["completed"]) == _counted(test_client, non_admin_headers)
+    assert before["open"] == before["total"] - before["completed"]
+    assert [user["total"] for user in before["users"]] == [before["total"]]
+
+    payload = {"title": "Counted", "content": "Stats", "is_completed": False}
+    task = test_client.post(TODOS_URL, json=payload, headers=non_admin_headers).json()
+    test_client.put(f"{TODOS_URL}/{task['id']}", json={**payload, "is_completed": True}, headers=non_admin_headers)
+    after = _stats(test_client, non_admin_headers)
+    assert (after["total"], after["open"], after["completed"]) == (
+        before["total"] + 1, before["open"], before["completed"] + 1
+    )
+
+    test_client.delete(f"{TODOS_URL}/{task['id']}", headers=non_admin_headers)
+    assert _stats(test_client, non_admin_headers) == before
+
+def test_admin_stats_cover_the_company(test_client, admin_headers, non_admin_headers):
+    stats = _stats(test_client, admin_headers)
+    assert (stats["total"], stats["completed"]) == _counted(test_client, admin_headers)
+    assert stats["total"] == sum(user["total"] for user in stats["users"])
+    own = _stats(test_client, non_admin_headers)["users"][0]
+    assert own in stats["users"]
+
+def test_reconcile_repairs_drift(test_client, non_admin_headers):
+    expected = _stats(test_client, non_admin_headers)
+    me = test_client.get("/users/me", headers=non_admin_headers).json()
+    user_id, company_id = me["id"], me["company_id"]
+    with LocalSession() as db:
+        db.execute(update(TaskCounter).where(TaskCounter.user_id == user_id).values(total=TaskCounter.total + 7))
+        db.commit()
+        assert _stats(test_client, non_admin_headers)["total"] == expected["total"] + 7
+
+        assert reconcile_task_counters(db, company_id) == 1
+        assert _stats(test_client, non_admin_headers) == expected
+
+        # A lost row is recreated
+        db.execute(delete(TaskCounter).where(TaskCounter.user_id == user_id))
+        db.commit()
+        assert reconcile_task_counters(db) == 1
+        assert reconcile_task_counters(db) == 0
+    assert _stats(test_client, non_admin_headers) == expected
@@ -188,3 +188,33 @@ def test_admin_delete_user(test_client, admin_headers):
     response = test_client.get(f"{USERS_URL}/{user_id}", headers=admin_headers)
     assert response.status_code == 404
     assert response.json()["detail"] == "User not found"
+
+def test_deactivated_user_rejected_immediately(test_client, admin_headers):
+    """Test that deactivating a user takes effect on their very next request."""
+    username = random_string(8)
+    password = random_string(8)
+    payload = {
+        "username": username,
+        "email": random_string(5) + "@test.com",
+        "password": password,
+        "is_active": True,
+        "is_admin": False
+    }
+    response = test_client.post(USERS_URL, json=payload, headers=admin_headers)
+    assert response.status_code == 201
+    user_id = response.json()["id"]
+
+    response = test_client.post("/auth/login", data={"username": username, "password": password})
+    assert response.status_code == 200
+    user_headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+    # Warm the principal cache
+    response = test_client.get(f"{USERS_URL}/me", headers=user_headers)
+    assert response.status_code == 200
+
+    response = test_client.put(f"{USERS_URL}/{user_id}", json={"is_active": False}, headers=admin_headers)
+    assert response.status_code == 200
+
+    response = test_client.get(f"{USERS_URL}/me", headers=user_headers)
+    assert response.status_code == 403
+    assert response.json()["detail"] == "Inactive user"
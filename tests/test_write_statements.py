@@ -0,0 +1,129 @@
+from app.core.database import LocalSession
+from app.models.company import Company
+from app.models.user import User
+from app.services.auth import principal_cache
+from .utils import random_string
+
+COMPANY_URL = "/companies"
+USERS_URL = "/users"
+TODOS_URL = "/todos"
+
+def _writes(statements):
+    return [s.split()[0].upper() for s in statements]
+
+def _warm_up(test_client, headers):
+    """Load the caller's principal so auth doesn't add statements."""
+    # A fresh entry, so it can't expire between the warm-up and the write
+    principal_cache.clear()
+    response = test_client.get(f"{COMPANY_URL}/me", headers=headers)
+    assert response.status_code == 200
+    return response.json()
+
+def test_task_writes_skip_refresh(test_client, non_admin_headers, sql_statements):
+    """Create is one INSERT, update is a lookup plus one UPDATE; timestamps come back via RETURNING."""
+    _warm_up(test_client, non_admin_headers)
+
+    sql_statements.clear()
+    response = test_client.post(
+        TODOS_URL,
+        json={"title": "Statements", "content": "Counted", "is_completed": False},
+        headers=non_admin_headers,
+    )
+    assert response.status_code == 201
+    created = response.json()
+    assert created["created_at"] is not None
+    assert _writes(sql_statements) == ["INSERT"]
+    assert "RETURNING" in sql_statements[0]
+
+    sql_statements.clear()
+    response = test_client.put(
+        f"{TODOS_URL}/{created['id']}",
+        json={"title": "Statements", "content": "Counted", "is_completed": True},
+        headers=non_admin_headers,
+    )
+    assert response.status_code == 200
+    assert response.json()["updated_at"] >= created["updated_at"]
+    assert _writes(sql_statements) == ["SELECT", "UPDATE"]
+    assert "RETURNING" in sql_statements[1]
+
+    test_client.delete(f"{TODOS_URL}/{created['id']}", headers=non_admin_headers)
+
+def test_company_writes_skip_refresh(test_client, admin_headers, sql_statements):
+    """Company create and update send no follow-up SELECT."""
+    company = _warm_up(test_client, admin_headers)
+
+    sql_statements.clear()
+    response = test_client.post(
+        COMPANY_URL,
+        json={"name": random_string(10), "description": random_string(20)},
+        headers=admin_headers,
+    )
+    assert response.status_code == 201
+    assert _writes(sql_statements) == ["INSERT"]
+
+    with LocalSession() as db:
+        db.delete(db.get(Company, response.json()["id"]))
+        db.commit()
+
+    sql_statements.clear()
+    response = test_client.put(
+        f"{COMPANY_URL}/{company['id']}",
+        json={"description": random_string(20)},
+        headers=admin_headers,
+    )
+    assert response.status_code == 200
+    assert _writes(sql_statements) == ["SELECT", "UPDATE"]
+
+    test_client.put(
+        f"{COMPANY_URL}/{company['id']}",
+        json={"description": company["description"]},
+        headers=admin_headers,
+    )
+
+def test_user_writes_skip_refresh(test_client, admin_headers, sql_statements):
+    """User create and update send no follow-up SELECT."""
+    _warm_up(test_client, admin_headers)
+
+    sql_statements.clear()
+    response = test_client.post(
+        USERS_URL,
+        json={
+            "username": random_string(8),
+            "email": random_string(5) + "@test.com",
+            "first_name": random_string(10),
+            "last_name": random_string(10),
+            "password": random_string(8),
+            "is_active": True,
+            "is_admin": False,
+        },
+        headers=admin_headers,
+    )
+    assert response.status_code == 201
+    user_id = response.json()["id"]
+    assert _writes(sql_statements) == ["INSERT"]
+
+    sql_statements.clear()
+    response = test_client.put(
+        f"{USERS_URL}/{user_id}",
+        json={"first_name": "Counted"},
+        headers=admin_headers,
+    )
+    assert response.status_code == 200
+    assert response.json()["first_name"] == "Counted"
+    assert _writes(sql_statements) == ["SELECT", "UPDATE"]
+
+    with LocalSession() as db:
+        db.delete(db.get(User, user_id))
+        db.commit()
+
+def test_token_refresh_is_one_update_and_one_insert(test_client, non_admin_headers, sql_statements):
+    """The refresh token is claimed by primary key; no user lookup or password hash."""
+    _warm_up(test_client, non_admin_headers)
+    response = test_client.post("/auth/login", data={"username": "khoi.vuongdinh", "password": "Kh@ivuong3101"})
+    refresh_token = response.json()["refresh_token"]
+
+    sql_statements.clear()
+    response = test_client.post("/auth/refresh", json={"refresh_token": refresh_token})
+    assert response.status_code == 200, response.text
+    assert _writes(sql_statements) == ["UPDATE", "INSERT"]
+    assert "refresh_tokens.token_hash = " in sql_statements[0]
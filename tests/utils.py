@@ -1,6 +1,20 @@
+import re
 import random
 import string
 
 def random_string(length=8):
     letters = string.ascii_letters
-    return ''.join(random.choice(letters) for i in range(length))
\ No newline at end of file
+    return ''.join(random.choice(letters) for i in range(length))
+
+def query_count(response) -> int:
+    """SQL statements the request issued, read from its Server-Timing header."""
+    match = re.search(r'db;dur=[\d.]+;desc="queries=(\d+)"', response.headers["server-timing"])
+    assert match, f"no db entry in Server-Timing: {response.headers['server-timing']}"
+    return int(match.group(1))
+
+def assert_query_budget(response, max_queries: int):
+    count = query_count(response)
+    request = response.request
+    assert count <= max_queries, (
+        f"{request.method} {request.url.path} issued {count} queries, budget is {max_queries}"
+    )